@@ -5,8 +5,8 @@ Run this script to update all blueprint files with Swagger documentation.
 import os
 import re
 
-IMPORT_STATEMENT = 'from flasgger import swag_from\nfrom utils.swagger_docs import (\n'
-IMPORT_CLOSING = ')\n'
+# The specs are named, not imported; utils.docs resolves them on first use
+IMPORT_STATEMENT = 'from utils.docs import swag_from\n'
 
 def get_route_name(line):
     """Extract the route name from a Flask route decorator."""
@@ -63,7 +63,7 @@ def add_swagger_to_file(file_path):
         lines = f.readlines()
     
     # Check if Swagger is already imported
-    if any('from flasgger import swag_from' in line for line in lines):
+    if any('from utils.docs import swag_from' in line for line in lines):
         print(f"Swagger already imported in {file_path}")
         return
     
@@ -86,7 +86,6 @@ def add_swagger_to_file(file_path):
     
     # Find all route declarations
     route_declarations = []
-    swagger_imports = []
     
     for i, line in enumerate(lines):
         if f'@{bp_name}_bp.route' in line:
@@ -110,15 +109,10 @@ def add_swagger_to_file(file_path):
                     
                     # Create Swagger variable name
                     swagger_var = f"{bp_name.upper()}{route_suffix.upper()}_{method}"
-                    swagger_imports.append(swagger_var)
                     
                     # Add swag_from decorator after the route and auth decorators
                     route_declarations.append((j, func_name, swagger_var))
     
-    # Prepare import statement
-    imports_wrapped = [f"    {imp}" for imp in swagger_imports]
-    import_statement = IMPORT_STATEMENT + ',\n'.join(imports_wrapped) + IMPORT_CLOSING
-    
     # Find where to insert import
     import_pos = 0
     for i, line in enumerate(lines):
@@ -128,12 +122,12 @@ def add_swagger_to_file(file_path):
             break
     
     # Insert import statement
-    lines.insert(import_pos, import_statement)
+    lines.insert(import_pos, IMPORT_STATEMENT)
     
     # Add swag_from decorators
     # We need to process from bottom to top to keep line numbers correct
     for func_pos, func_name, swagger_var in sorted(route_declarations, reverse=True):
-        lines.insert(func_pos, f"@swag_from({swagger_var})\n")
+        lines.insert(func_pos, f"@swag_from('{swagger_var}')\n")
     
     # Write the updated file
     with open(file_path, 'w') as f:
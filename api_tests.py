@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 # api_tests.py - Comprehensive API tests for LawnMate backend
 
+import base64
 import requests
+import time
 import unittest
 import os
 import json
 import random
 import string
+import tempfile
+from unittest import mock
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # Try to load environment variables from .env file
 load_dotenv(".env.test")
@@ -239,6 +243,60 @@ class LawnMateAPITests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.json(), list)
     
+    def test_12a_get_appointments_paginated(self):
+        """Test keyset pagination of the appointment list"""
+        response = requests.get(
+            f"{BASE_URL}/appointments",
+            headers=self.get_headers(self.admin_token),
+            params={"limit": 1}
+        )
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertLessEqual(len(page.get("items")), 1)
+        self.assertIn("next_cursor", page)
+        
+        if page.get("next_cursor"):
+            response = requests.get(
+                f"{BASE_URL}/appointments",
+                headers=self.get_headers(self.admin_token),
+                params={"limit": 1, "cursor": page["next_cursor"]}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.json()["items"][0]["id"], page["items"][0]["id"])
+    
+    def test_12b_get_appointments_sparse_fields(self):
+        """Test selecting a sparse fieldset from the appointment list"""
+        response = requests.get(
+            f"{BASE_URL}/appointments",
+            headers=self.get_headers(self.admin_token),
+            params={"fields": "id,start_time,status,location_id"}
+        )
+        self.assertEqual(response.status_code, 200)
+        for appointment in response.json():
+            self.assertEqual(set(appointment), {"id", "start_time", "status", "location_id"})
+        
+        response = requests.get(
+            f"{BASE_URL}/appointments",
+            headers=self.get_headers(self.admin_token),
+            params={"fields": "id,not_a_field"}
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_12c_get_appointments_not_modified(self):
+        """Test conditional GET of the appointment list with an ETag"""
+        response = requests.get(
+            f"{BASE_URL}/appointments",
+            headers=self.get_headers(self.admin_token)
+        )
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+        
+        headers = self.get_headers(self.admin_token)
+        headers["If-None-Match"] = etag
+        response = requests.get(f"{BASE_URL}/appointments", headers=headers)
+        self.assertEqual(response.status_code, 304)
+    
     def test_13_get_appointment(self):
         """Test getting a specific appointment"""
         appointment_id = self.test_data.get("appointment_id")
@@ -389,6 +447,7 @@ class LawnMateAPITests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.json(), list)
         self.assertTrue(len(response.json()) > 0, "No items found for the invoice")
+        self.assertIsInstance(response.json()[0].get("service_id"), int)
     
     # --- Equipment API Tests ---
     def test_19_create_equipment(self):
@@ -538,6 +597,17 @@ class LawnMateAPITests(unittest.TestCase):
         self.assertIsInstance(response.json(), list)
     
     # --- Photos API Tests ---
+    def test_24a_get_timelogs_streamed(self):
+        """Test streaming the full time log list"""
+        response = requests.get(
+            f"{BASE_URL}/timelogs",
+            headers=self.get_headers(self.admin_token),
+            params={"stream": "true"},
+            stream=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json(), list)
+    
     def test_25_upload_photo(self):
         """Test uploading a photo (mock)"""
         # Since we can't easily upload a real file in this test, we'll mock it
@@ -855,6 +925,207 @@ class LawnMateAPITests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIsInstance(response.json(), list)
     
+    # --- Admin Diagnostics Tests ---
+    def test_44_db_pool_diagnostics(self):
+        """Test the connection pool diagnostics endpoint"""
+        response = requests.get(
+            f"{BASE_URL}/admin/diagnostics/db-pool",
+            headers=self.get_headers(self.admin_token)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("stats", response.json().get("pool", {}))
+        self.assertIn("max_app_connections", response.json().get("capacity", {}))
+        
+        response = requests.get(
+            f"{BASE_URL}/admin/diagnostics/db-pool",
+            headers=self.get_headers(self.lead_token)
+        )
+        self.assertEqual(response.status_code, 403)
+    
+    def test_45_metrics(self):
+        """Test the Prometheus metrics endpoint"""
+        token = os.getenv("METRICS_TOKEN")
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = requests.get(f"{BASE_URL}/metrics", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("http_requests_total", response.text)
+        self.assertIn("http_request_duration_seconds_bucket", response.text)
+    
+    def test_46_compressed_response(self):
+        """Test that large responses are compressed when the client accepts it"""
+        response = requests.get(
+            f"{BASE_URL}/apispec.json",
+            headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        self.assertIn("paths", response.json())
+    
+    def test_47_bulk_create_locations(self):
+        """Test creating several locations in one request"""
+        customer_id = self.test_data.get("customer_id")
+        if not customer_id:
+            self.skipTest("No customer created")
+        response = requests.post(
+            f"{BASE_URL}/locations/bulk",
+            headers=self.get_headers(self.lead_token),
+            json=[
+                {"customer_id": customer_id, "address": "1 Bulk St"},
+                {"customer_id": customer_id, "address": "2 Bulk St"},
+                {"customer_id": customer_id}
+            ]
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json().get("created"), 2)
+        results = response.json().get("results", [])
+        self.assertEqual([r["status"] for r in results], ["created", "created", "error"])
+        
+        for result in results[:2]:
+            requests.delete(
+                f"{BASE_URL}/locations/{result['item']['id']}",
+                headers=self.get_headers(self.admin_token)
+            )
+    
+    def test_48_import_customers_csv(self):
+        """Test importing customers from a CSV upload"""
+        email = f"import-{self.generate_random_string().lower()}@example.com"
+        csv_body = f"name,email,address\nImported Customer,{email},1 Import Rd\n,missing-name@example.com,\n"
+        response = requests.post(
+            f"{BASE_URL}/customers/import",
+            headers={"Authorization": f"Bearer {self.admin_token}"},
+            files={"file": ("customers.csv", csv_body, "text/csv")}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json().get("customers_created"), 1)
+        self.assertEqual(response.json().get("locations_created"), 1)
+        self.assertEqual(response.json().get("failed_rows"), 1)
+    
+    def test_49_export_invoices(self):
+        """Test streaming the invoices export as CSV and NDJSON"""
+        response = requests.get(
+            f"{BASE_URL}/export/invoices",
+            headers=self.get_headers(self.admin_token),
+            params={"start_date": "2000-01-01"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers.get("Content-Type", "").startswith("text/csv"))
+        self.assertTrue(response.text.startswith("id,invoice_number,"))
+        
+        response = requests.get(
+            f"{BASE_URL}/export/invoices",
+            headers=self.get_headers(self.admin_token),
+            params={"format": "ndjson"}
+        )
+        self.assertEqual(response.status_code, 200)
+        for line in response.text.splitlines():
+            self.assertIn("customer_name", json.loads(line))
+        
+        response = requests.get(
+            f"{BASE_URL}/export/invoices",
+            headers=self.get_headers(self.lead_token)
+        )
+        self.assertEqual(response.status_code, 403)
+    
+    def test_50_logout(self):
+        """Test that logout revokes the access and refresh tokens"""
+        response = requests.post(
+            f"{BASE_URL}/auth/login",
+            json={"email": self.admin_email, "password": self.admin_password}
+        )
+        self.assertEqual(response.status_code, 200)
+        access_token = response.json()["access_token"]
+        refresh_token = response.json()["refresh_token"]
+        
+        response = requests.post(
+            f"{BASE_URL}/auth/logout",
+            headers=self.get_headers(access_token),
+            json={"refresh_token": refresh_token}
+        )
+        self.assertEqual(response.status_code, 200)
+        
+        response = requests.get(f"{BASE_URL}/customers/", headers=self.get_headers(access_token))
+        self.assertEqual(response.status_code, 401)
+        response = requests.post(f"{BASE_URL}/auth/refresh", headers=self.get_headers(refresh_token))
+        self.assertEqual(response.status_code, 401)
+        
+        # Other sessions of the same user are unaffected
+        response = requests.get(f"{BASE_URL}/customers/", headers=self.get_headers(self.admin_token))
+        self.assertEqual(response.status_code, 200)
+    
+    def test_51_login_rate_limit(self):
+        """Test that repeated logins for one email are throttled with 429"""
+        email = f"ratelimit_{self.generate_random_string()}@example.com"
+        statuses = []
+        for _ in range(11):
+            response = requests.post(
+                f"{BASE_URL}/auth/login",
+                json={"email": email, "password": "wrong"}
+            )
+            statuses.append(response.status_code)
+        self.assertEqual(statuses[:10], [401] * 10)
+        self.assertEqual(statuses[10], 429)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+    
+    def test_52_available_employees(self):
+        """Test the available employees lookup for a time window"""
+        response = requests.get(
+            f"{BASE_URL}/appointments/available-employees",
+            headers=self.get_headers(self.employee_token),
+            params={"start_time": "2099-01-01T08:00:00", "end_time": "2099-01-01T10:00:00"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json(), list)
+        self.assertTrue(all("id" in employee for employee in response.json()))
+        
+        response = requests.get(
+            f"{BASE_URL}/appointments/available-employees",
+            headers=self.get_headers(self.employee_token),
+            params={"start_time": "2099-01-01T10:00:00", "end_time": "2099-01-01T08:00:00"}
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_53_availability_grid(self):
+        """Test the day availability grid for the dispatch board"""
+        response = requests.get(
+            f"{BASE_URL}/appointments/availability-grid",
+            headers=self.get_headers(self.employee_token),
+            params={"date": "2099-01-01", "slot": "30m"}
+        )
+        self.assertEqual(response.status_code, 200)
+        grid = response.json()
+        self.assertEqual(grid["slots"], 48)
+        self.assertTrue(grid["employees"])
+        for employee in grid["employees"]:
+            self.assertEqual(len(employee["available"]), 48)
+            self.assertTrue(set(employee["available"]) <= {"0", "1"})
+        
+        response = requests.get(
+            f"{BASE_URL}/appointments/availability-grid",
+            headers=self.get_headers(self.employee_token),
+            params={"date": "2099-01-01", "slot": "7m"}
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_54_bulk_appointments_malformed_ids(self):
+        """Test that bulk appointment rows with non-integer ids are rejected per row"""
+        response = requests.post(
+            f"{BASE_URL}/appointments/bulk",
+            headers=self.get_headers(self.lead_token),
+            json=[
+                {"location_id": [1], "start_time": "2099-01-01T09:00:00", "end_time": "2099-01-01T10:00:00"},
+                {"location_id": "1", "start_time": "2099-01-01T09:00:00", "end_time": "2099-01-01T10:00:00"},
+                {"location_id": True, "start_time": "2099-01-01T09:00:00", "end_time": "2099-01-01T10:00:00"},
+                {"location_id": 1, "employee_id": {"id": 1},
+                 "start_time": "2099-01-01T09:00:00", "end_time": "2099-01-01T10:00:00"}
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+        results = response.json().get("results", [])
+        self.assertEqual([r["status"] for r in results], ["error"] * 4)
+        self.assertEqual(results[0]["error"], "location_id must be an integer")
+        self.assertEqual(results[2]["error"], "location_id must be an integer")
+        self.assertEqual(results[3]["error"], "employee_id must be an integer")
+    
     # --- Cleanup Tests ---
     def test_90_delete_payment(self):
         """Test deleting a payment"""
@@ -978,5 +1249,418 @@ class LawnMateAPITests(unittest.TestCase):
             self.assertEqual(response.status_code, 200)
 
 
+class LawnMateAppTests(unittest.TestCase):
+    """Tests that need the app in this process, on a scratch SQLite database"""
+    
+    @classmethod
+    def setUpClass(cls):
+        from app import create_app
+        from models import db, Employee
+        from utils.passwords import hash_password
+        cls.db_dir = tempfile.TemporaryDirectory()
+        env = {
+            "DATABASE_URL": f"sqlite:///{os.path.join(cls.db_dir.name, 'app.db')}",
+            "AUTO_CREATE_TABLES": "false",
+            "RATE_LIMIT_BACKEND": "local",
+            "TRUSTED_PROXY_COUNT": "1",
+            "FLASK_ENV": "production",
+        }
+        with mock.patch.dict(os.environ, env):
+            cls.app = create_app()
+        with cls.app.app_context():
+            db.create_all()
+            admin = Employee(name="App Admin", email="app-admin@example.com", role="admin",
+                             password_hash=hash_password("app-admin-password"))
+            db.session.add(admin)
+            db.session.commit()
+        response = cls.app.test_client().post(
+            "/api/auth/login", json={"email": "app-admin@example.com", "password": "app-admin-password"}
+        )
+        cls.admin_headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+    
+    @classmethod
+    def tearDownClass(cls):
+        from models import db
+        with cls.app.app_context():
+            db.engine.dispose()
+        cls.db_dir.cleanup()
+    
+    def test_conditional_get_until_write(self):
+        """Test that a matching If-None-Match gets 304 until the table is written"""
+        client = self.app.test_client()
+        response = client.get("/api/employees/", headers=self.admin_headers)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers.get("ETag")
+        self.assertTrue(etag)
+        
+        response = client.get("/api/employees/", headers={**self.admin_headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers.get("ETag"), etag)
+        
+        response = client.post("/api/employees/", headers=self.admin_headers, json={
+            "name": "Etag Employee", "email": "etag-employee@example.com",
+            "password": "password123", "role": "employee"
+        })
+        self.assertEqual(response.status_code, 201)
+        
+        response = client.get("/api/employees/", headers={**self.admin_headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers.get("ETag"), etag)
+        self.assertIn("etag-employee@example.com", [e["email"] for e in response.get_json()])
+    
+    def test_conditional_get_matches_negotiated_encoding(self):
+        """Test that a compressed ETag only gets 304 while its encoding is still accepted"""
+        client = self.app.test_client()
+        response = client.get("/api/employees/?_=encoding", headers=self.admin_headers)
+        self.assertEqual(response.status_code, 200)
+        gzip_etag = f'"{response.get_etag()[0]}-gzip"'
+        
+        response = client.get("/api/employees/?_=encoding", headers={
+            **self.admin_headers, "If-None-Match": gzip_etag, "Accept-Encoding": "gzip"
+        })
+        self.assertEqual(response.status_code, 304)
+        
+        for accept_encoding in ("identity", "br;q=1, gzip;q=0"):
+            response = client.get("/api/employees/?_=encoding", headers={
+                **self.admin_headers, "If-None-Match": gzip_etag, "Accept-Encoding": accept_encoding
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers.get("Content-Encoding"), "gzip")
+    
+    def test_cached_response_until_write(self):
+        """Test that a cached GET is served again unchanged and dropped when its table is written"""
+        from sqlalchemy import text
+        from models import db, Employee
+        client = self.app.test_client()
+        cache = self.app.extensions["response_cache"]
+        with self.app.app_context():
+            employee = Employee(name="Cached Employee", email="cached-employee@example.com", role="employee",
+                                password_hash="unused")
+            db.session.add(employee)
+            db.session.commit()
+            employee_id = employee.id
+        url = f"/api/employees/{employee_id}"
+        
+        first = client.get(url, headers=self.admin_headers)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json()["name"], "Cached Employee")
+        cached_entries = len(cache.local)
+        self.assertGreater(cached_entries, 0)
+        
+        # A write that skips the ORM bumps no version, so only the cache can answer with the old name
+        with self.app.app_context():
+            db.session.execute(text("UPDATE employees SET name = 'Changed Behind' WHERE id = :id"), {"id": employee_id})
+            db.session.commit()
+        second = client.get(url, headers=self.admin_headers)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(len(cache.local), cached_entries)
+        
+        response = client.put(url, headers=self.admin_headers, json={"name": "Renamed Employee"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("employees" in entry[1] for entry in cache.local._entries.values()))
+        third = client.get(url, headers=self.admin_headers)
+        self.assertEqual(third.get_json()["name"], "Renamed Employee")
+    
+    def test_metrics_need_token_in_production(self):
+        """Test that /api/metrics is refused in production until METRICS_TOKEN is set"""
+        client = self.app.test_client()
+        self.assertTrue(self.app.config["METRICS_REQUIRE_TOKEN"])
+        self.assertEqual(client.get("/api/metrics").status_code, 403)
+        
+        self.app.config["METRICS_TOKEN"] = "metrics-secret"
+        try:
+            self.assertEqual(client.get("/api/metrics").status_code, 401)
+            response = client.get("/api/metrics", headers={"Authorization": "Bearer wrong"})
+            self.assertEqual(response.status_code, 401)
+            response = client.get("/api/metrics", headers={"Authorization": "Bearer metrics-secret"})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b"http_requests_total", response.data)
+        finally:
+            self.app.config["METRICS_TOKEN"] = None
+    
+    def test_streamed_response_counts_its_queries(self):
+        """Test that a streamed list is recorded with the queries it runs while sending its body"""
+        from utils.metrics import DB_QUERIES
+        client = self.app.test_client()
+        counter = DB_QUERIES.labels("employees.get_employees")
+        
+        # The first authenticated request also loads the revocation list
+        client.get("/api/employees/?_=warm", headers=self.admin_headers)
+        
+        # The same listing unstreamed, under a URL the response cache has not seen
+        before = counter._value.get()
+        response = client.get("/api/employees/?_=plain", headers=self.admin_headers)
+        self.assertEqual(response.status_code, 200)
+        plain = counter._value.get() - before
+        
+        before = counter._value.get()
+        response = client.get("/api/employees/?stream=true", headers=self.admin_headers)
+        self.assertTrue(response.is_streamed)
+        self.assertNotIn("X-Query-Count", response.headers)
+        # Nothing is recorded until the body has been sent
+        self.assertEqual(counter._value.get(), before)
+        self.assertIn(b"app-admin@example.com", response.get_data())
+        response.close()
+        self.assertEqual(counter._value.get() - before, plain)
+    
+    def test_csv_import_matches_email_case_insensitively(self):
+        """Test that an imported row finds an existing customer whose email differs only in case"""
+        from models import db, Customer
+        client = self.app.test_client()
+        with self.app.app_context():
+            db.session.add(Customer(name="Mixed Case", email="Mixed.Case@Example.com"))
+            db.session.commit()
+        
+        response = client.post("/api/customers/import", headers={**self.admin_headers, "Content-Type": "text/csv"},
+                               data="name,email,address\nMixed Case,mixed.case@example.com,1 Elm St\n")
+        self.assertEqual(response.status_code, 200)
+        report = response.get_json()
+        self.assertEqual(report["customers_matched"], 1)
+        self.assertEqual(report["customers_created"], 0)
+        self.assertEqual(report["locations_created"], 1)
+        with self.app.app_context():
+            self.assertEqual(Customer.query.filter(db.func.lower(Customer.email) == "mixed.case@example.com").count(), 1)
+    
+    def test_login_rehashes_legacy_password(self):
+        """Test that logging in rewrites a hash made with another method using the configured one"""
+        from werkzeug.security import generate_password_hash
+        from models import db, Employee
+        from utils.passwords import needs_rehash
+        client = self.app.test_client()
+        with self.app.app_context():
+            db.session.add(Employee(name="Legacy Hash", email="legacy-hash@example.com", role="employee",
+                                    password_hash=generate_password_hash("legacy-password", "pbkdf2:sha256:1000")))
+            db.session.commit()
+        
+        response = client.post("/api/auth/login", json={"email": "legacy-hash@example.com", "password": "legacy-password"})
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            password_hash = Employee.query.filter_by(email="legacy-hash@example.com").one().password_hash
+            self.assertFalse(password_hash.startswith("pbkdf2:sha256:1000$"))
+            self.assertFalse(needs_rehash(password_hash))
+        response = client.post("/api/auth/login", json={"email": "legacy-hash@example.com", "password": "legacy-password"})
+        self.assertEqual(response.status_code, 200)
+    
+    def test_login_survives_failed_rehash_commit(self):
+        """Test that a login still succeeds when storing the rehashed password fails"""
+        from sqlalchemy.exc import OperationalError
+        from sqlalchemy.orm import Session
+        from werkzeug.security import generate_password_hash
+        from models import db, Employee
+        client = self.app.test_client()
+        legacy_hash = generate_password_hash("legacy-password", "pbkdf2:sha256:1000")
+        with self.app.app_context():
+            db.session.add(Employee(name="Rehash Fails", email="rehash-fails@example.com", role="employee",
+                                    password_hash=legacy_hash))
+            db.session.commit()
+        
+        with mock.patch.object(Session, "commit", side_effect=OperationalError("COMMIT", {}, Exception("database is locked"))):
+            response = client.post("/api/auth/login",
+                                   json={"email": "rehash-fails@example.com", "password": "legacy-password"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.get_json())
+        with self.app.app_context():
+            self.assertEqual(Employee.query.filter_by(email="rehash-fails@example.com").one().password_hash, legacy_hash)
+    
+    def test_needs_rehash(self):
+        """Test that only hashes made with another method than the configured one need a rehash"""
+        from werkzeug.security import generate_password_hash
+        from utils.passwords import hash_password, needs_rehash
+        with self.app.app_context():
+            self.assertFalse(needs_rehash(hash_password("password")))
+            self.assertTrue(needs_rehash(generate_password_hash("password", "pbkdf2:sha256:1000")))
+            # Werkzeug fills in the parameters a configured method leaves out
+            with mock.patch.dict(self.app.config, {"PASSWORD_HASH_METHOD": "pbkdf2"}):
+                self.assertFalse(needs_rehash(generate_password_hash("password", "pbkdf2")))
+                self.assertTrue(needs_rehash(generate_password_hash("password", "pbkdf2:sha256:1000")))
+    
+    def _admin_token(self, **kwargs):
+        from flask_jwt_extended import create_access_token
+        from models import Employee
+        with self.app.app_context():
+            admin = Employee.query.filter_by(email="app-admin@example.com").one()
+            return create_access_token(identity=str(admin.id), **kwargs,
+                                       additional_claims={"user_type": "employee", "user_role": admin.role})
+    
+    def test_cached_jwt_matches_uncached_decode(self):
+        """Test that a token served from the decode cache has the claims a full decode gives"""
+        from flask_jwt_extended import JWTManager, decode_token
+        token = self._admin_token()
+        manager = self.app.extensions["flask-jwt-extended"]
+        with self.app.app_context():
+            uncached = JWTManager._decode_jwt_from_config(manager, token)
+            hits = manager.token_cache.hits
+            first = decode_token(token)
+            second = decode_token(token)
+        self.assertEqual(manager.token_cache.hits, hits + 1)
+        self.assertEqual(first, uncached)
+        self.assertEqual(second, uncached)
+        # Callers get copies, so changing one cannot change the cached claims
+        first["user_role"] = "customer"
+        with self.app.app_context():
+            self.assertEqual(decode_token(token), uncached)
+    
+    def test_cached_jwt_rejected_once_expired(self):
+        """Test that a cached token is refused once it has expired"""
+        token = self._admin_token(expires_delta=timedelta(seconds=1))
+        client = self.app.test_client()
+        headers = {"Authorization": f"Bearer {token}"}
+        self.assertEqual(client.get("/api/employees/?_=expiring", headers=headers).status_code, 200)
+        self.assertEqual(client.get("/api/employees/?_=expiring", headers=headers).status_code, 200)
+        time.sleep(2)
+        response = client.get("/api/employees/?_=expiring", headers=headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("expired", response.get_json()["msg"].lower())
+    
+    def test_tampered_jwt_not_served_from_cache(self):
+        """Test that a token altered after its original was cached is verified and refused"""
+        token = self._admin_token()
+        client = self.app.test_client()
+        self.assertEqual(client.get("/api/employees/?_=tamper", headers={"Authorization": f"Bearer {token}"}).status_code, 200)
+        cache = self.app.extensions["flask-jwt-extended"].token_cache
+        
+        header, payload, signature = token.split(".")
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        claims["user_role"] = "owner"
+        forged_payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+        forged_signature = signature[:-4] + ("AAAA" if signature[-4:] != "AAAA" else "BBBB")
+        for tampered in (f"{header}.{forged_payload}.{signature}", f"{header}.{payload}.{forged_signature}"):
+            entries = cache.stats()["entries"]
+            response = client.get("/api/employees/?_=tamper", headers={"Authorization": f"Bearer {tampered}"})
+            self.assertIn(response.status_code, (401, 422))
+            self.assertEqual(cache.stats()["entries"], entries)
+    
+    def test_appointment_without_status_blocks_employee(self):
+        """Test that an appointment with a NULL status books its employee and a cancelled one does not"""
+        from models import db, Appointment, Customer, CustomerLocation, Employee
+        client = self.app.test_client()
+        with self.app.app_context():
+            customer = Customer(name="Null Status", email="null-status@example.com")
+            location = CustomerLocation(customer=customer, address="2 Null St")
+            booked = Employee(name="Null Booked", email="null-booked@example.com", role="employee",
+                              password_hash="unused")
+            cancelled = Employee(name="Cancelled Booked", email="cancelled-booked@example.com", role="employee",
+                                 password_hash="unused")
+            db.session.add_all([location, booked, cancelled])
+            db.session.flush()
+            start = datetime(2031, 5, 6, 9, 0)
+            appointments = [Appointment(customer_id=customer.id, customer_location_id=location.id,
+                                        employee_id=employee.id, status=status, arrival_datetime=start,
+                                        departure_datetime=start + timedelta(hours=2))
+                            for employee, status in ((booked, "scheduled"), (cancelled, "cancelled"))]
+            db.session.add_all(appointments)
+            db.session.commit()
+            # On insert the column default would replace None
+            appointments[0].status = None
+            db.session.commit()
+            self.assertEqual(Appointment.query.filter(Appointment.employee_id == booked.id,
+                                                      Appointment.status.is_(None)).count(), 1)
+        
+        response = client.get("/api/appointments/available-employees", headers=self.admin_headers,
+                              query_string={"start_time": "2031-05-06T10:00:00", "end_time": "2031-05-06T11:00:00"})
+        self.assertEqual(response.status_code, 200)
+        emails = [employee["email"] for employee in response.get_json()]
+        self.assertNotIn("null-booked@example.com", emails)
+        self.assertIn("cancelled-booked@example.com", emails)
+    
+    def test_login_limits_charge_together(self):
+        """Test that a login refused by one of its rate limits is not charged to the other"""
+        client = self.app.test_client()
+        
+        def login(email, address):
+            return client.post("/api/auth/login", json={"email": email, "password": "wrong"},
+                               environ_base={"REMOTE_ADDR": address}).status_code
+        
+        # Use up 10.0.0.1's 60 per minute with different emails
+        for i in range(60):
+            self.assertEqual(login(f"spread-{i}@example.com", "10.0.0.1"), 401)
+        # Refused by the address limit, so the email's 10 per minute is untouched
+        for _ in range(10):
+            self.assertEqual(login("target@example.com", "10.0.0.1"), 429)
+        self.assertEqual(login("target@example.com", "10.0.0.2"), 401)
+        
+        # Use up an email's 10 per minute; refusals for it leave 10.0.0.3's budget alone
+        for _ in range(9):
+            self.assertEqual(login("target@example.com", "10.0.0.3"), 401)
+        for _ in range(20):
+            self.assertEqual(login("target@example.com", "10.0.0.3"), 429)
+        for i in range(51):
+            self.assertEqual(login(f"other-{i}@example.com", "10.0.0.3"), 401)
+        self.assertEqual(login("last@example.com", "10.0.0.3"), 429)
+    
+    def test_login_limit_keys_on_forwarded_client(self):
+        """Test that behind a trusted proxy each client address has its own login budget"""
+        client = self.app.test_client()
+        
+        def login(email, forwarded_for):
+            return client.post("/api/auth/login", json={"email": email, "password": "wrong"},
+                               environ_base={"REMOTE_ADDR": "10.1.0.1"},
+                               headers={"X-Forwarded-For": forwarded_for}).status_code
+        
+        for i in range(60):
+            self.assertEqual(login(f"proxied-{i}@example.com", "203.0.113.5"), 401)
+        self.assertEqual(login("proxied-last@example.com", "203.0.113.5"), 429)
+        # Same proxy, another client
+        self.assertEqual(login("proxied-last@example.com", "203.0.113.6"), 401)
+        # Only the address the trusted proxy appended counts; one the client made up does not
+        self.assertEqual(login("proxied-last@example.com", "198.51.100.1, 203.0.113.5"), 429)
+    
+    def test_webhook_limit_keys_on_verified_identity(self):
+        """Test that the webhook's per-caller budget follows the token's user, not the token string"""
+        client = self.app.test_client()
+        first, second = self._admin_token(), self._admin_token(expires_delta=timedelta(minutes=5))
+        
+        def webhook(token):
+            return client.post("/api/integrations/webhook", json={"event": "limit-test"},
+                               headers={"Authorization": f"Bearer {token}", "X-API-KEY": "webhook-key"}).status_code
+        
+        with mock.patch.dict(os.environ, {"API_KEY": "webhook-key"}):
+            for _ in range(30):
+                self.assertEqual(webhook(first), 200)
+            # A second token for the same user shares the budget
+            self.assertEqual(webhook(second), 429)
+            # Made-up tokens are refused by the view, not given buckets of their own
+            self.assertIn(webhook(first[:-4] + "AAAA"), (401, 422))
+    
+    def test_revocation_refresh_sees_out_of_order_commits(self):
+        """Test that a refresh picks up a revocation committed after a newer one"""
+        from models import db, RevokedToken
+        from utils.revocation import RevocationList
+        with self.app.app_context():
+            revocation = RevocationList(refresh_seconds=0)
+            revocation.refresh()
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            
+            # Id 1 is assigned (and stamped) first but commits after id 2
+            db.session.add(RevokedToken(id=2, jti="committed-first", token_type="access", revoked_at=now))
+            db.session.commit()
+            revocation.refresh()
+            db.session.add(RevokedToken(id=1, jti="committed-second", token_type="access",
+                                        revoked_at=now - timedelta(seconds=1)))
+            db.session.commit()
+            revocation.refresh()
+            
+            self.assertTrue(revocation.is_revoked("committed-first"))
+            self.assertTrue(revocation.is_revoked("committed-second"))
+            self.assertFalse(revocation.is_revoked("never-revoked"))
+            # Re-reading the overlap does not add a jti twice
+            revocation.refresh()
+            self.assertEqual(revocation.stats()["entries"], 2)
+    
+    def test_revoked_at_comes_from_the_database(self):
+        """Test that revocations are stamped with the database clock, not the worker's"""
+        from sqlalchemy import func, select, text
+        from models import db, RevokedToken
+        with self.app.app_context():
+            # Plain SQL bypasses every Python-side default
+            db.session.execute(text("INSERT INTO revoked_tokens (jti, token_type) VALUES ('database-clock', 'access')"))
+            db.session.commit()
+            stamped = db.session.execute(
+                select(func.count()).where(RevokedToken.jti == "database-clock", RevokedToken.revoked_at <= func.now())
+            ).scalar()
+            self.assertEqual(stamped, 1)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2) 
\ No newline at end of file
@@ -1,6 +1,6 @@
 # app.py
 from flask import Flask
-from flask_jwt_extended import JWTManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 from models import db
 from flask_migrate import Migrate
 from flask_cors import CORS
@@ -18,17 +18,32 @@ from blueprints.timelogs import timelogs_bp
 from blueprints.customer_portal import customer_portal_bp
 from blueprints.integrations import integrations_bp
 from blueprints.payments import payments_bp
+from blueprints.admin import admin_bp
+from blueprints.export import export_bp
 from flask import jsonify
 import os
 from dotenv import load_dotenv
 import sys 
-from flasgger import Swagger
+from utils.docs import init_docs
+from utils.cache import init_response_cache
+from utils.db_pool import engine_options_from_env
+from utils.metrics import init_metrics, metrics_response
+from utils.query_stats import init_query_stats
+from utils.json_provider import OrjsonProvider
+from utils.compression import init_compression
+from utils.passwords import DEFAULT_METHOD as DEFAULT_PASSWORD_HASH_METHOD
+from utils.jwt_cache import CachingJWTManager
+from utils.revocation import init_revocation
+from utils.ratelimit import init_rate_limiter
+from utils.availability import init_availability
 
 # Load environment variables from .env file
 load_dotenv()
 
 def create_app():
     app = Flask(__name__)
+    # orjson-backed encoding for every jsonify call
+    app.json = OrjsonProvider(app)
     
     # Configure CORS - with security improvements
     CORS(app, 
@@ -51,15 +66,74 @@ def create_app():
     DB_PORT = os.getenv('POSTGRES_PORT')
     DB_NAME = os.getenv('POSTGRES_DB')
 
-    # Configuration from environment variables
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # Configuration from environment variables; DATABASE_URL overrides the POSTGRES_* settings
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL') or f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Connection pool sizing (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, ...)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env()
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', "vpkhHIuKR7IvvZIZ23EqJYYyW5aR0wKgPg8zTdeJkqnVhbk7XCp/fRut")
     app.config['JWT_TOKEN_LOCATION'] = ['headers', 'cookies']
     app.config['JWT_HEADER_NAME'] = 'Authorization'
     app.config['JWT_HEADER_TYPE'] = 'Bearer'
     app.config['JWT_REFRESH_COOKIE_PATH'] = '/api/auth/refresh'
     app.config['JWT_COOKIE_SECURE'] = True
+    # Verified tokens kept per worker so repeat requests skip signature checks (0 disables)
+    app.config['JWT_DECODE_CACHE_SIZE'] = int(os.getenv('JWT_DECODE_CACHE_SIZE', 1024))
+
+    # Response cache for read-heavy GET routes ('memory', 'file', 'local' or 'none')
+    app.config['RESPONSE_CACHE_BACKEND'] = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 512))
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    if os.getenv('RESPONSE_CACHE_DIR'):
+        app.config['RESPONSE_CACHE_DIR'] = os.getenv('RESPONSE_CACHE_DIR')
+
+    # Compiled OpenAPI spec (python manage.py build-apispec); defaults to apispec.json next to app.py
+    if os.getenv('APISPEC_FILE'):
+        app.config['APISPEC_FILE'] = os.getenv('APISPEC_FILE')
+
+    # /api/metrics needs a Bearer METRICS_TOKEN; without one it is only served outside production
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['METRICS_REQUIRE_TOKEN'] = os.getenv('FLASK_ENV', 'production') == 'production'
+
+    # Per-request query counting; X-Query-Count/X-DB-Time headers unless FLASK_ENV=production
+    # (the Docker setup leaves FLASK_ENV unset)
+    app.config['QUERY_STATS_HEADERS'] = os.getenv(
+        'QUERY_STATS_HEADERS', str(os.getenv('FLASK_ENV') != 'production')
+    ).lower() in ('1', 'true', 'yes')
+    app.config['QUERY_COUNT_WARN_THRESHOLD'] = int(os.getenv('QUERY_COUNT_WARN_THRESHOLD', 30))
+    app.config['N_PLUS_ONE_THRESHOLD'] = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+
+    # Response compression, in order of preference (br needs brotli, zstd needs zstandard)
+    app.config['COMPRESS_ALGORITHMS'] = os.getenv('COMPRESS_ALGORITHMS', 'zstd,br,gzip')
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    app.config['COMPRESS_STREAMS'] = os.getenv('COMPRESS_STREAMS', 'true').lower() in ('1', 'true', 'yes')
+
+    # Password hashing method for new hashes (older ones are rehashed on login) and verification threads
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', DEFAULT_PASSWORD_HASH_METHOD)
+    app.config['PASSWORD_HASH_THREADS'] = int(os.getenv('PASSWORD_HASH_THREADS', 0))
+
+    # Per-worker Bloom filter in front of the revoked_tokens table (see utils.revocation)
+    app.config['REVOCATION_BLOOM_CAPACITY'] = int(os.getenv('REVOCATION_BLOOM_CAPACITY', 100000))
+    app.config['REVOCATION_BLOOM_ERROR_RATE'] = float(os.getenv('REVOCATION_BLOOM_ERROR_RATE', 0.001))
+    app.config['REVOCATION_REFRESH_SECONDS'] = float(os.getenv('REVOCATION_REFRESH_SECONDS', 2))
+    app.config['REVOCATION_OVERLAP_SECONDS'] = float(os.getenv('REVOCATION_OVERLAP_SECONDS', 30))
+
+    # Where the login/registration/webhook rate limit buckets live (see utils.ratelimit)
+    app.config['RATE_LIMIT_BACKEND'] = os.getenv('RATE_LIMIT_BACKEND', 'shared')
+    app.config['RATE_LIMIT_SLOTS'] = int(os.getenv('RATE_LIMIT_SLOTS', 65536))
+    if os.getenv('RATE_LIMIT_FILE'):
+        app.config['RATE_LIMIT_FILE'] = os.getenv('RATE_LIMIT_FILE')
+    if os.getenv('RATE_LIMIT_REDIS_URL'):
+        app.config['RATE_LIMIT_REDIS_URL'] = os.getenv('RATE_LIMIT_REDIS_URL')
+    # Reverse proxies in front of the app whose X-Forwarded-* headers are trusted, so
+    # request.remote_addr (and the per-address limits) see the real client; 0 trusts none
+    app.config['TRUSTED_PROXY_COUNT'] = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+
+    # Run db.create_all() in create_app; off in production, where every worker would pay for it
+    app.config['AUTO_CREATE_TABLES'] = os.getenv(
+        'AUTO_CREATE_TABLES', str(os.getenv('FLASK_ENV', 'production') != 'production')
+    ).lower() in ('1', 'true', 'yes')
 
     print(app.config['JWT_SECRET_KEY'])
     
@@ -104,10 +178,21 @@ def create_app():
         ]
     }
     
+    if app.config['TRUSTED_PROXY_COUNT'] > 0:
+        proxies = app.config['TRUSTED_PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
     # Initialize extensions
     db.init_app(app)
     migrate = Migrate(app, db)
-    jwt = JWTManager(app)
+    jwt = CachingJWTManager(app)
+    init_revocation(app, jwt)
+    init_rate_limiter(app)
+    init_availability(app)
+    init_response_cache(app)
+    init_metrics(app)
+    init_query_stats(app)
+    init_compression(app)
     
     # Initialize Swagger after all blueprints are registered
     # Register Blueprints
@@ -125,10 +210,12 @@ def create_app():
     app.register_blueprint(customer_portal_bp, url_prefix='/api/customer_portal')
     app.register_blueprint(integrations_bp, url_prefix='/api/integrations')
     app.register_blueprint(payments_bp, url_prefix='/api/payments')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(export_bp, url_prefix='/api/export')
     #app.register_blueprint(docs_bp, url_prefix='/api/docs')
     
-    # Initialize Swagger after all blueprints have been registered
-    swg = Swagger(app, config=swagger_config, template=swagger_template)
+    # Register the API docs after all blueprints; Flasgger itself loads on the first docs request
+    init_docs(app, swagger_config, swagger_template)
     
     # CORS preflight options for all routes
     @app.after_request
@@ -161,9 +248,36 @@ def create_app():
         """
         return jsonify({"status": "healthy"}), 200
     
-    # Create database tables (for development; use migrations in production)
-    with app.app_context():
+    # Prometheus metrics endpoint
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        """
+        Prometheus Metrics Endpoint
+        ---
+        description: "Request counts, latency, response size and DB time per endpoint, aggregated across all workers. Requires a Bearer METRICS_TOKEN; without one it is disabled in production."
+        produces:
+          - text/plain
+        responses:
+          200:
+            description: Metrics in the Prometheus text exposition format
+          401:
+            description: Missing or wrong metrics token
+          403:
+            description: METRICS_TOKEN is not set (production)
+        """
+        return metrics_response()
+    
+    # Create missing tables straight from the models (migrations do this too)
+    @app.cli.command('create-tables')
+    def create_tables():
         db.create_all()
+        print('Database tables created')
+    
+    # Create database tables on startup (for development; production relies on
+    # migrations so workers do no schema work while booting)
+    if app.config['AUTO_CREATE_TABLES']:
+        with app.app_context():
+            db.create_all()
         
     return app
 
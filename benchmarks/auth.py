@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Measure the per-request cost of the authorization decorators.
+
+Times a view protected by each role decorator inside a request context that
+carries a valid access token, with:
+
+* ``before`` - Flask-JWT-Extended's plain ``JWTManager`` and the decorators
+  as they were (``verify_jwt_in_request()``, ``get_jwt()`` and chained
+  ``==`` role comparisons), copied below;
+* ``after`` - ``CachingJWTManager`` and the ``claims_required`` decorators
+  from ``blueprints.auth``.
+
+Only the decorator and the view call are timed, not routing or the
+response. No database is needed.
+
+    python -m benchmarks.auth
+    python -m benchmarks.auth --calls 50000 --repeat 7 --json
+"""
+import argparse
+import json
+import statistics
+import time
+from functools import wraps
+
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt, verify_jwt_in_request
+
+from blueprints.auth import admin_required, customer_required, employee_required, lead_required
+from utils.jwt_cache import CachingJWTManager
+
+SECRET = 'benchmark-secret-key-that-is-long-enough-for-hs256'
+
+
+def legacy_employee_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        claims = get_jwt()
+        if claims.get("user_type") != "employee":
+            return jsonify({'msg': 'Unauthorized - employee token required'}), 403
+        if not (claims.get("user_role") == "admin" or claims.get("user_role") == "lead" or claims.get("user_role") == "employee"):
+            return jsonify({'msg': 'Unauthorized - admin, lead, or employee token required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def legacy_lead_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        claims = get_jwt()
+        if claims.get("user_type") != "employee":
+            return jsonify({'msg': 'Unauthorized - employee token required'}), 403
+        if not (claims.get("user_role") == "admin" or claims.get("user_role") == "lead"):
+            return jsonify({'msg': 'Unauthorized - admin, lead, or employee token required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def legacy_admin_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        claims = get_jwt()
+        if claims.get("user_type") != "employee":
+            return jsonify({'msg': 'Unauthorized - employee token required'}), 403
+        if not (claims.get("user_role") == "admin"):
+            return jsonify({'msg': 'Unauthorized - admin, lead, or employee token required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def legacy_customer_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        claims = get_jwt()
+        if claims.get("user_type") != "customer":
+            return jsonify({'msg': 'Unauthorized - customer token required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+# decorator name -> (before, after, claims of a token it admits)
+DECORATORS = {
+    'employee_required': (legacy_employee_required, employee_required, {'user_type': 'employee', 'user_role': 'employee'}),
+    'lead_required': (legacy_lead_required, lead_required, {'user_type': 'employee', 'user_role': 'lead'}),
+    'admin_required': (legacy_admin_required, admin_required, {'user_type': 'employee', 'user_role': 'admin'}),
+    'customer_required': (legacy_customer_required, customer_required, {'user_type': 'customer'}),
+}
+
+
+def make_app(manager_class):
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = SECRET
+    app.config['JWT_TOKEN_LOCATION'] = ['headers', 'cookies']
+    manager_class(app)
+    return app
+
+
+def view():
+    return None
+
+
+def time_calls(app, decorator, claims, calls, repeat):
+    protected = decorator(view)
+    with app.app_context():
+        token = create_access_token(identity='1', additional_claims=claims)
+    samples = []
+    with app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+        if protected() is not None:
+            raise SystemExit(f'{decorator.__name__} rejected its own token')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(calls):
+                protected()
+            samples.append((time.perf_counter() - started) / calls * 1e6)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000, help='calls per timed run')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    before_app, after_app = make_app(JWTManager), make_app(CachingJWTManager)
+    results = {}
+    for name, (before, after, claims) in DECORATORS.items():
+        before_us = time_calls(before_app, before, claims, args.calls, args.repeat)
+        after_us = time_calls(after_app, after, claims, args.calls, args.repeat)
+        results[name] = {'before_us': before_us, 'after_us': after_us, 'speedup': round(before_us / after_us, 2)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'microseconds per call, median of {args.repeat} runs of {args.calls}')
+    print(f"{'decorator':<20} {'before':>9} {'after':>9} {'speedup':>8}")
+    for name, result in results.items():
+        print(f"{name:<20} {result['before_us']:>9.2f} {result['after_us']:>9.2f} {result['speedup']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
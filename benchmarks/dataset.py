@@ -0,0 +1,342 @@
+"""
+Synthetic, referentially consistent dataset at a chosen scale factor.
+
+``generate`` fills a scratch database (never production) with employees,
+customers and their locations, appointments spread over five years, invoices
+with items, payments for the paid ones, time logs, photos, and equipment
+with its assignments and consumable usage. Scale 1 is about 5M rows (10k
+customers, 500k appointments, 2M time logs); ``scaled_counts`` lists them.
+
+Rows are streamed in batches. PostgreSQL gets them through ``COPY ... FROM
+STDIN``; other databases through executemany inserts, so nothing goes
+through the ORM. New ids start after the highest existing one in each
+table, so an existing admin account or earlier rows are left alone.
+
+Every generated employee and customer can log in with ``PASSWORD``. The
+hash is computed once and shared, so seeding stays fast.
+
+    python manage.py generate-data --scale 2
+"""
+import csv
+import datetime
+import io
+import random
+import time
+
+from sqlalchemy import insert, select, text, func
+from werkzeug.security import generate_password_hash
+
+from utils.versioning import bump_versions
+from models import (
+    Customer, CustomerLocation, Employee, Service, Appointment, Invoice, InvoiceItem,
+    Payment, TimeLog, Photo, EquipmentCategory, Equipment, EquipmentAssignment, ConsumableUsage
+)
+
+BATCH_SIZE = 10000
+COPY_BATCH_SIZE = 100000
+EPOCH = datetime.datetime(2020, 1, 1, 7, 0)
+SPAN = datetime.timedelta(days=365 * 5)
+PASSWORD = 'bench-password'
+
+# Rows per table at scale 1
+BASE_COUNTS = {
+    'employees': 50,
+    'customers': 10000,
+    'locations': 12000,
+    'services': 20,
+    'appointments': 500000,
+    'invoice_items': 1000000,
+    'timelogs': 2000000,
+    'equipment': 200,
+    'equipment_assignments': 1000,
+    'consumable_usage': 100000,
+}
+
+# Tables in load order, so foreign keys always point at rows already there
+TABLES = [
+    Employee.__table__, Customer.__table__, CustomerLocation.__table__, Service.__table__,
+    Appointment.__table__, Invoice.__table__, InvoiceItem.__table__, Payment.__table__,
+    TimeLog.__table__, Photo.__table__, EquipmentCategory.__table__, Equipment.__table__,
+    EquipmentAssignment.__table__, ConsumableUsage.__table__
+]
+
+EQUIPMENT_CATEGORIES = ['Mowers', 'Trimmers', 'Blowers', 'Trailers', 'Hand tools']
+CONSUMABLE_TYPES = ['Gas', 'Oil', 'Diesel']
+TEAMS = ['North', 'South', 'East', 'West']
+
+
+def employee_email(employee_id):
+    return f'bench-employee-{employee_id}@example.com'
+
+
+def customer_email(customer_id):
+    return f'bench-customer-{customer_id}@example.com'
+
+
+def employee_role(employee_id):
+    """Employee 1 is the admin, every tenth one a lead."""
+    if employee_id == 1:
+        return 'admin'
+    return 'lead' if employee_id % 10 == 0 else 'employee'
+
+
+def service_price(service_number):
+    return 25.0 + 5.0 * service_number
+
+
+def scaled_counts(scale=1.0, **overrides):
+    """Row counts for ``scale``; keyword arguments replace single entries."""
+    counts = {name: max(1, int(count * scale)) for name, count in BASE_COUNTS.items()}
+    # A handful of each is enough; these describe the business, not its volume
+    counts['employees'] = max(10, counts['employees'])
+    counts['services'] = BASE_COUNTS['services']
+    counts.update(overrides)
+    counts['locations'] = max(counts['locations'], counts['customers'])
+    return counts
+
+
+def _python_defaults(table):
+    # COPY skips SQLAlchemy's client-side defaults, so rows carry them explicitly
+    defaults = {}
+    for column in table.columns:
+        if column.default is None or column.primary_key:
+            continue
+        if column.default.is_scalar:
+            defaults[column.key] = column.default.arg
+        elif column.default.is_callable:
+            defaults[column.key] = column.default.arg(None)
+    return defaults
+
+
+def _copy_rows(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # An unquoted empty field is NULL in COPY's csv format
+        writer.writerow(['' if row[key] is None else row[key] for key in columns])
+    buffer.seek(0)
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(statement, buffer)
+    else:
+        # psycopg 3
+        with cursor.copy(statement) as copy:
+            copy.write(buffer.getvalue())
+
+
+def _load(engine, table, rows):
+    """Stream ``rows`` (dicts) into ``table``; COPY on PostgreSQL, executemany elsewhere."""
+    defaults = _python_defaults(table)
+    loaded = 0
+    if engine.dialect.name == 'postgresql':
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            batch, columns = [], None
+            for row in rows:
+                row = {**defaults, **row}
+                columns = columns or list(row)
+                batch.append(row)
+                if len(batch) >= COPY_BATCH_SIZE:
+                    _copy_rows(cursor, table, columns, batch)
+                    loaded += len(batch)
+                    batch = []
+            if batch:
+                _copy_rows(cursor, table, columns, batch)
+                loaded += len(batch)
+            raw.commit()
+        finally:
+            raw.close()
+        return loaded
+
+    batch = []
+    with engine.begin() as conn:
+        for row in rows:
+            batch.append({**defaults, **row})
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(insert(table), batch)
+                loaded += len(batch)
+                batch = []
+        if batch:
+            conn.execute(insert(table), batch)
+            loaded += len(batch)
+    return loaded
+
+
+def _reset_sequences(engine, tables):
+    # Explicit ids leave Postgres sequences behind; move them past the new rows
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        for table in tables:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+            ))
+
+
+def arrival(number, appointments):
+    """Start time of the ``number``-th generated appointment; evenly spread over SPAN."""
+    return EPOCH + datetime.timedelta(hours=number * 24 * 365 * 5 // appointments)
+
+
+def generate(engine, counts, progress=None):
+    """Insert ``counts`` rows per table and return how many went into each.
+
+    ``progress`` is called with ``(table_name, rows, seconds)`` after each table.
+    """
+    with engine.connect() as conn:
+        base = {table.name: conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+                for table in TABLES}
+    rng = random.Random(42)
+    password_hash = generate_password_hash(PASSWORD)
+    n = counts
+    employee, customer, location, service, appointment, invoice = (
+        base['employees'], base['customers'], base['customer_locations'], base['services'],
+        base['appointments'], base['invoices']
+    )
+    equipment, category = base['equipment'], base['equipment_categories']
+    items_per_invoice = max(1, n['invoice_items'] // n['appointments'])
+
+    def location_customer(number):
+        # The first locations belong to one customer each, the rest are second sites
+        return customer + (number - 1) % n['customers'] + 1
+
+    def item_service(item_number):
+        return (item_number * 7) % n['services'] + 1
+
+    def invoice_subtotal(number):
+        first = (number - 1) * items_per_invoice
+        return sum(service_price(item_service(j)) for j in range(first, first + items_per_invoice))
+
+    def invoice_paid(number):
+        return number % 10 < 7
+
+    def employees():
+        for i in range(1, n['employees'] + 1):
+            yield {'id': employee + i, 'name': f'Employee {employee + i}', 'email': employee_email(employee + i),
+                   'password_hash': password_hash, 'role': employee_role(i), 'team': TEAMS[i % len(TEAMS)]}
+
+    def customers():
+        for i in range(1, n['customers'] + 1):
+            yield {'id': customer + i, 'name': f'Customer {customer + i}', 'email': customer_email(customer + i),
+                   'phone': f'555-{i % 10000:04d}', 'password_hash': password_hash, 'created_datetime': EPOCH}
+
+    def locations():
+        for i in range(1, n['locations'] + 1):
+            yield {'id': location + i, 'customer_id': location_customer(i), 'address': f'{i} Main St',
+                   'property_type': 'Business' if i % 5 == 0 else 'Residential'}
+
+    def services():
+        for i in range(1, n['services'] + 1):
+            yield {'id': service + i, 'name': f'Service {i}', 'description': f'Synthetic service priced at {service_price(i)}'}
+
+    def appointments():
+        for i in range(1, n['appointments'] + 1):
+            start = arrival(i, n['appointments'])
+            location_number = rng.randint(1, n['locations'])
+            yield {'id': appointment + i, 'customer_id': location_customer(location_number),
+                   'customer_location_id': location + location_number,
+                   'employee_id': employee + rng.randint(1, n['employees']), 'arrival_datetime': start,
+                   'departure_datetime': start + datetime.timedelta(hours=rng.randint(1, 3)),
+                   'status': rng.choice(['scheduled', 'completed', 'completed', 'cancelled']),
+                   'team': TEAMS[i % len(TEAMS)], 'created_datetime': start - datetime.timedelta(days=14)}
+
+    def invoices():
+        for i in range(1, n['appointments'] + 1):
+            subtotal = invoice_subtotal(i)
+            paid = invoice_paid(i)
+            created = arrival(i, n['appointments'])
+            yield {'id': invoice + i, 'appointment_id': appointment + i, 'subtotal': subtotal, 'total': subtotal,
+                   'tax_rate': 0.0, 'paid': 'paid' if paid else 'unpaid', 'status': 'paid' if paid else 'sent',
+                   'amount_paid': subtotal if paid else 0.0, 'balance': 0.0 if paid else subtotal,
+                   'due_date': (created + datetime.timedelta(days=30)).date(), 'created_date': created}
+
+    def invoice_items():
+        for j in range(n['appointments'] * items_per_invoice):
+            yield {'id': base['invoice_items'] + j + 1, 'invoice_id': invoice + j // items_per_invoice + 1,
+                   'service_id': service + item_service(j), 'cost': service_price(item_service(j))}
+
+    def payments():
+        payment = base['payments']
+        for i in range(1, n['appointments'] + 1):
+            if invoice_paid(i):
+                payment += 1
+                paid_at = arrival(i, n['appointments']) + datetime.timedelta(days=i % 30)
+                yield {'id': payment, 'invoice_id': invoice + i, 'amount': invoice_subtotal(i),
+                       'payment_date': paid_at, 'payment_method': rng.choice(['cash', 'check', 'creditCard']),
+                       'status': 'completed', 'created_at': paid_at}
+
+    def timelogs():
+        for i in range(1, n['timelogs'] + 1):
+            number = (i - 1) * n['appointments'] // n['timelogs'] + 1
+            time_in = arrival(number, n['appointments']) + datetime.timedelta(minutes=i % 15)
+            hours = rng.choice([0.5, 1.0, 1.5, 2.0])
+            yield {'id': base['timelogs'] + i, 'appointment_id': appointment + number,
+                   'employee_id': employee + rng.randint(1, n['employees']), 'time_in': time_in,
+                   'time_out': time_in + datetime.timedelta(hours=hours), 'total_time': hours}
+
+    def photos():
+        for i in range(1, n['appointments'] + 1):
+            yield {'id': base['photos'] + i, 'appointment_id': appointment + i, 'file_path': f'/photos/{i}.jpg',
+                   'show_to_customer': i % 3 == 0, 'datetime': arrival(i, n['appointments'])}
+
+    def categories():
+        for i, name in enumerate(EQUIPMENT_CATEGORIES, start=1):
+            yield {'id': category + i, 'name': name}
+
+    def equipment_rows():
+        for i in range(1, n['equipment'] + 1):
+            yield {'id': equipment + i, 'name': f'Equipment {i}',
+                   'equipment_category_id': category + i % len(EQUIPMENT_CATEGORIES) + 1,
+                   'purchased_date': (EPOCH + datetime.timedelta(days=i % 365)).date(),
+                   'purchased_condition': 'New' if i % 4 else 'Used', 'purchase_price': 100.0 + i % 50 * 20,
+                   'purchased_by': employee + 1, 'created_date': EPOCH}
+
+    def assignments():
+        for i in range(1, n['equipment_assignments'] + 1):
+            yield {'id': base['equipment_assignments'] + i, 'equipment_id': equipment + (i - 1) % n['equipment'] + 1,
+                   'team': TEAMS[i % len(TEAMS)],
+                   'assigned_date': (EPOCH + datetime.timedelta(days=i * SPAN.days // n['equipment_assignments'])).date()}
+
+    def consumable_usage():
+        for i in range(1, n['consumable_usage'] + 1):
+            yield {'id': base['consumable_usage'] + i, 'equipment_id': equipment + rng.randint(1, n['equipment']),
+                   'consumable_type': rng.choice(CONSUMABLE_TYPES), 'amount_used': round(rng.uniform(0.5, 20), 2),
+                   'cost_per_liter': 1.5,
+                   'date_recorded': (EPOCH + datetime.timedelta(days=i * SPAN.days // n['consumable_usage'])).date()}
+
+    plan = [
+        (Employee.__table__, employees), (Customer.__table__, customers), (CustomerLocation.__table__, locations),
+        (Service.__table__, services), (Appointment.__table__, appointments), (Invoice.__table__, invoices),
+        (InvoiceItem.__table__, invoice_items), (Payment.__table__, payments), (TimeLog.__table__, timelogs),
+        (Photo.__table__, photos), (EquipmentCategory.__table__, categories), (Equipment.__table__, equipment_rows),
+        (EquipmentAssignment.__table__, assignments), (ConsumableUsage.__table__, consumable_usage),
+    ]
+    loaded = {}
+    for table, rows in plan:
+        started = time.perf_counter()
+        loaded[table.name] = _load(engine, table, rows())
+        if progress:
+            progress(table.name, loaded[table.name], time.perf_counter() - started)
+
+    _reset_sequences(engine, TABLES)
+    # Conditional GETs and the response cache must not keep serving the old data
+    with engine.begin() as conn:
+        bump_versions(conn, [table.name for table in TABLES])
+    if engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('ANALYZE'))
+    return loaded
+
+
+def seed(engine, customers, appointments, employees=50, timelogs=None):
+    """Generate a dataset of this size unless an equally large one is already there."""
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Appointment.__table__)).scalar() >= appointments:
+            return
+    scale = appointments / BASE_COUNTS['appointments']
+    overrides = {'customers': customers, 'appointments': appointments, 'employees': employees}
+    if timelogs is not None:
+        overrides['timelogs'] = timelogs
+    generate(engine, scaled_counts(scale, **overrides))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Compare JSON encode time of Flask's stdlib provider and the orjson provider.
+
+Builds a list of synthetic appointments (50,000 by default) and times
+``app.json.response`` - the call behind ``jsonify`` - with each provider.
+Both payload shapes are measured: the dicts produced by
+``appointment_to_dict`` (datetimes already turned into strings) and the same
+rows with ``datetime`` values left for the encoder (the stdlib provider writes
+those as HTTP dates, so its output differs there). No database is needed.
+
+    python -m benchmarks.json_encode
+    python -m benchmarks.json_encode --appointments 200000 --repeat 10
+"""
+import argparse
+import datetime
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from blueprints.appointments import appointment_to_dict
+from utils.json_provider import OrjsonProvider
+
+EPOCH = datetime.datetime(2024, 1, 1, 7, 0)
+STATUSES = ['Scheduled', 'In Progress', 'Completed', 'Cancelled']
+
+
+def appointments(count):
+    """Appointment-like objects with the attributes ``appointment_to_dict`` reads."""
+    rows = []
+    for i in range(count):
+        arrival = EPOCH + datetime.timedelta(minutes=37 * i)
+        rows.append(SimpleNamespace(
+            id=i + 1,
+            customer_id=i % 5000 + 1,
+            employee_id=i % 50 + 1,
+            customer_location_id=i % 8000 + 1,
+            description=f'Mowing and edging, zone {i % 12}',
+            arrival_datetime=arrival,
+            departure_datetime=arrival + datetime.timedelta(hours=1, minutes=30),
+            status=STATUSES[i % len(STATUSES)],
+            notes='Gate code 4411. Dog in back yard.' if i % 3 == 0 else None,
+            created_datetime=arrival - datetime.timedelta(days=14)
+        ))
+    return rows
+
+
+def native_dict(appointment):
+    """``appointment_to_dict`` without the manual ``isoformat()`` calls."""
+    return {
+        'id': appointment.id,
+        'customer_id': appointment.customer_id,
+        'employee_id': appointment.employee_id,
+        'location_id': appointment.customer_location_id,
+        'description': appointment.description,
+        'start_time': appointment.arrival_datetime,
+        'end_time': appointment.departure_datetime,
+        'status': appointment.status,
+        'notes': appointment.notes,
+        'created_datetime': appointment.created_datetime
+    }
+
+
+def time_response(app, payload, repeat):
+    samples = []
+    size = 0
+    with app.app_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = app.json.response(payload)
+            samples.append((time.perf_counter() - started) * 1000)
+            size = response.content_length
+    return {'median_ms': round(statistics.median(samples), 2), 'min_ms': round(min(samples), 2), 'bytes': size}
+
+
+def make_app(provider_class):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--appointments', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    rows = appointments(args.appointments)
+    payloads = {
+        'appointment_to_dict': [appointment_to_dict(row) for row in rows],
+        'native datetimes': [native_dict(row) for row in rows],
+    }
+    providers = {'stdlib': DefaultJSONProvider, 'orjson': OrjsonProvider}
+
+    results = {}
+    for payload_name, payload in payloads.items():
+        for provider_name, provider_class in providers.items():
+            results[f'{payload_name} / {provider_name}'] = time_response(make_app(provider_class), payload, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{args.appointments} appointments, median of {args.repeat} runs')
+    for name, result in results.items():
+        print(f"{name:<36} {result['median_ms']:>10.2f} ms  {result['bytes']:>12} bytes")
+
+
+if __name__ == '__main__':
+    main()
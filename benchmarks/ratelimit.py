@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Measure the rate limiter's cost per check and its accuracy across processes.
+
+Forks ``--processes`` workers that each call ``hit`` ``--checks`` times on
+``--keys`` keys, all against one limit, with:
+
+* ``local`` - ``LocalBackend``, one bucket table per process (what every
+  worker would enforce on its own without a shared backend);
+* ``shared`` - ``SharedMemoryBackend`` over a scratch file in ``--dir``.
+
+Reports checks per second summed over the workers, and how many checks were
+allowed compared with the limit's burst per key (the limit is set so that
+almost nothing refills during the run). With ``shared`` the allowed count
+matches the limit however many processes there are. With ``local`` it is
+multiplied by the process count.
+
+    python -m benchmarks.ratelimit
+    python -m benchmarks.ratelimit --processes 8 --checks 50000 --keys 1000 --json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from utils.ratelimit import Limit, LocalBackend, SharedMemoryBackend
+
+LIMIT = '100/day'
+
+
+def worker(backend, keys, checks, queue):
+    limit = Limit.parse(LIMIT)
+    names = [f'bench|remote_address|10.0.{i // 256}.{i % 256}' for i in range(keys)]
+    allowed = 0
+    started = time.perf_counter()
+    for i in range(checks):
+        allowed += backend.hit([(names[i % keys], limit)])[0]
+    queue.put((allowed, time.perf_counter() - started))
+
+
+def run(backend, processes, keys, checks):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    workers = [context.Process(target=worker, args=(backend, keys, checks, queue)) for _ in range(processes)]
+    for process in workers:
+        process.start()
+    results = [queue.get() for _ in workers]
+    for process in workers:
+        process.join()
+    allowed = sum(result[0] for result in results)
+    return {
+        'checks_per_second': round(sum(checks / result[1] for result in results)),
+        'allowed': allowed,
+        'limit': Limit.parse(LIMIT).burst * keys,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--checks', type=int, default=20000, help='checks per process')
+    parser.add_argument('--keys', type=int, default=100, help='distinct identities')
+    parser.add_argument('--slots', type=int, default=65536, help='RATE_LIMIT_SLOTS')
+    parser.add_argument('--dir', default=tempfile.gettempdir(), help='where to put the shared file')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    path = os.path.join(args.dir, f'dolg-ratelimit-bench-{os.getpid()}')
+    try:
+        results = {
+            'local': run(LocalBackend(), args.processes, args.keys, args.checks),
+            'shared': run(SharedMemoryBackend(path, args.slots), args.processes, args.keys, args.checks),
+        }
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{args.processes} processes x {args.checks} checks over {args.keys} keys, limit {LIMIT}')
+    print(f"{'backend':<8} {'checks/s':>10} {'allowed':>9} {'limit':>7}")
+    for name, result in results.items():
+        print(f"{name:<8} {result['checks_per_second']:>10} {result['allowed']:>9} {result['limit']:>7}")
+
+
+if __name__ == '__main__':
+    main()
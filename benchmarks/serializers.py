@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Compare the per-row cost of the compiled serializers with the old helpers.
+
+Seeds an in-memory SQLite database (or ``--database-url``) with the
+synthetic dataset, loads appointments, customers and invoices both as ORM
+instances and as plain ``Row`` tuples, and times three ways of turning each
+row into its response dict:
+
+* ``hand-written`` - the ``*_to_dict`` functions as they were before
+  ``utils.serializers`` (copied below);
+* ``getattr loop`` - the generic ``{name: to_json(getattr(obj, attr))}``
+  serializer that ``?fields=`` used;
+* ``compiled`` - ``model_serializer`` from ``utils.serializers``.
+
+Only the serialization is timed, not the query or the JSON encoding.
+
+    python -m benchmarks.serializers
+    python -m benchmarks.serializers --rows 100000 --repeat 7 --json
+"""
+import argparse
+import datetime
+import json
+import statistics
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from benchmarks.dataset import seed
+from blueprints.appointments import appointment_to_dict
+from blueprints.customers import customer_to_dict
+from blueprints.invoices import invoice_to_dict
+from models import db, Appointment, Customer, Invoice
+
+
+def legacy_appointment_to_dict(appointment):
+    if not appointment:
+        return None
+
+    start_time = appointment.arrival_datetime
+    end_time = appointment.departure_datetime
+    if hasattr(appointment, 'start_time') and callable(getattr(appointment, 'start_time')):
+        start_time = appointment.start_time
+    if hasattr(appointment, 'end_time') and callable(getattr(appointment, 'end_time')):
+        end_time = appointment.end_time
+
+    return {
+        'id': appointment.id,
+        'customer_id': appointment.customer_id,
+        'employee_id': appointment.employee_id,
+        'location_id': appointment.customer_location_id,
+        'description': appointment.description,
+        'start_time': start_time.isoformat() if start_time else None,
+        'end_time': end_time.isoformat() if end_time else None,
+        'status': appointment.status,
+        'notes': appointment.notes,
+        'created_datetime': appointment.created_datetime.isoformat() if appointment.created_datetime else None,
+        'scheduled_start_datetime': start_time.isoformat() if start_time else None,
+        'scheduled_end_datetime': end_time.isoformat() if end_time else None,
+        'service_type': appointment.description
+    }
+
+
+def legacy_customer_to_dict(cust):
+    if not cust:
+        return None
+    return {
+        'id': cust.id,
+        'name': cust.name,
+        'phone': cust.phone,
+        'email': cust.email,
+        'notes': cust.notes,
+        'created_datetime': cust.created_datetime.isoformat() if cust.created_datetime else None
+    }
+
+
+def legacy_invoice_to_dict(inv):
+    return {
+        'id': inv.id,
+        'appointment_id': inv.appointment_id,
+        'subtotal': inv.subtotal,
+        'total': inv.total,
+        'tax_rate': inv.tax_rate,
+        'paid': inv.paid,
+        'attempt': inv.attempt,
+        'due_date': inv.due_date.isoformat(),
+        'created_date': inv.created_date.isoformat()
+    }
+
+
+def _to_json(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def getattr_serializer(compiled_keys, aliases=None):
+    """The pre-compilation ``fields_serializer``: one ``getattr`` per field per row."""
+    aliases = aliases or {}
+    items = tuple((key, aliases.get(key, key)) for key in compiled_keys)
+
+    def serialize(obj):
+        if obj is None:
+            return None
+        return {name: _to_json(getattr(obj, attribute)) for name, attribute in items}
+    return serialize
+
+
+APPOINTMENT_ALIASES = {
+    'location_id': 'customer_location_id', 'start_time': 'arrival_datetime', 'end_time': 'departure_datetime',
+    'scheduled_start_datetime': 'arrival_datetime', 'scheduled_end_datetime': 'departure_datetime',
+    'service_type': 'description'
+}
+
+# model, compiled serializer, old helper, getattr aliases
+CASES = [
+    (Appointment, appointment_to_dict, legacy_appointment_to_dict, APPOINTMENT_ALIASES),
+    (Customer, customer_to_dict, legacy_customer_to_dict, None),
+    (Invoice, invoice_to_dict, legacy_invoice_to_dict, None),
+]
+
+
+def time_per_row(serializer, rows, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            serializer(row)
+        samples.append((time.perf_counter() - started) / len(rows) * 1e9)
+    return round(statistics.median(samples), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default='sqlite://', help='defaults to an in-memory SQLite database')
+    parser.add_argument('--rows', type=int, default=20000, help='rows loaded per model')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    db.metadata.create_all(engine)
+    seed(engine, customers=args.rows, appointments=args.rows)
+
+    results = {}
+    with Session(engine) as session:
+        for model, compiled, legacy, aliases in CASES:
+            table = model.__table__
+            inputs = {
+                'orm': session.scalars(select(model).order_by(model.id).limit(args.rows)).all(),
+                'row': session.execute(select(*table.c).order_by(table.c.id).limit(args.rows)).all(),
+            }
+            sample = inputs['orm'][0]
+            if legacy(sample) != compiled(sample):
+                raise SystemExit(f'{model.__name__}: compiled serializer output differs from the old helper')
+            generic = getattr_serializer(list(compiled(sample)), aliases)
+            for kind, rows in inputs.items():
+                variants = {'hand-written': legacy, 'getattr loop': generic, 'compiled': compiled}
+                timings = {name: time_per_row(serializer, rows, args.repeat) for name, serializer in variants.items()}
+                results[f'{table.name} / {kind}'] = {
+                    'rows': len(rows),
+                    'ns_per_row': timings,
+                    'speedup_vs_hand_written': round(timings['hand-written'] / timings['compiled'], 2),
+                }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'ns per row, median of {args.repeat} runs')
+    print(f"{'':<22} {'hand-written':>13} {'getattr loop':>13} {'compiled':>10} {'speedup':>8}")
+    for name, result in results.items():
+        timings = result['ns_per_row']
+        print(f"{name:<22} {timings['hand-written']:>13.1f} {timings['getattr loop']:>13.1f} "
+              f"{timings['compiled']:>10.1f} {result['speedup_vs_hand_written']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Measure how long a worker takes to boot.
+
+Each run starts a fresh interpreter and reports, in milliseconds:
+
+* ``import_ms`` - importing ``app`` (blueprints, models, extensions);
+* ``create_app_ms`` - ``create_app()``;
+* ``first_docs_ms`` - the first ``/api/apispec.json`` request, which is
+  when Flasgger is now loaded and the spec built.
+
+``AUTO_CREATE_TABLES`` is forced off (the production path), so no database
+is needed; pass ``--create-tables`` with ``POSTGRES_*`` pointing at a
+scratch database to include ``db.create_all()`` in ``create_app_ms``.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r'''
+import json, time
+started = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+application = app_module.create_app()
+created = time.perf_counter()
+application.test_client().get('/api/apispec.json')
+documented = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_docs_ms': (documented - created) * 1000,
+}))
+'''
+
+METRICS = ('import_ms', 'create_app_ms', 'first_docs_ms')
+
+PLACEHOLDER_DB_ENV = {
+    'POSTGRES_USER': 'dolg', 'POSTGRES_PASSWORD': 'dolg', 'POSTGRES_HOST': 'localhost',
+    'POSTGRES_PORT': '5432', 'POSTGRES_DB': 'dolg'
+}
+
+
+def run_once(create_tables):
+    env = dict(os.environ, AUTO_CREATE_TABLES='true' if create_tables else 'false')
+    # The engine URL must parse even though nothing connects without --create-tables
+    for name, placeholder in PLACEHOLDER_DB_ENV.items():
+        env.setdefault(name, placeholder)
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE], env=env, capture_output=True, text=True, check=True
+    )
+    # create_app prints other lines; the measurements are the last one
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--create-tables', action='store_true', help='include db.create_all() in create_app')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    runs = [run_once(args.create_tables) for _ in range(args.runs)]
+    results = {
+        metric: {
+            'median': round(statistics.median(run[metric] for run in runs), 1),
+            'min': round(min(run[metric] for run in runs), 1),
+            'max': round(max(run[metric] for run in runs), 1),
+        }
+        for metric in METRICS
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{args.runs} runs (median / min / max)')
+    for metric, result in results.items():
+        print(f"{metric:<16} {result['median']:>8.1f} {result['min']:>8.1f} {result['max']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# blueprints/admin.py
+from flask import Blueprint, jsonify
+from blueprints.auth import admin_required
+from models import db
+from utils.db_pool import pool_status
+from utils.docs import swag_from
+from sqlalchemy import text
+import multiprocessing
+import os
+
+admin_bp = Blueprint('admin', __name__)
+
+
+def _worker_count():
+    # Mirrors the worker count in gunicorn_config.py
+    return int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() + 1))
+
+
+@admin_bp.route('/diagnostics/db-pool', methods=['GET'])
+@admin_required
+@swag_from('ADMIN_DB_POOL_GET')
+def db_pool_diagnostics():
+    engine = db.engine
+    pool = pool_status(engine)
+
+    workers = _worker_count()
+    per_worker = pool.get('size', 0) + max(pool.get('max_overflow', 0), 0)
+    capacity = {
+        'workers': workers,
+        'connections_per_worker': per_worker,
+        'max_app_connections': workers * per_worker,
+        'server_max_connections': None,
+        'server_connections_in_use': None,
+        'fits': None
+    }
+    if engine.dialect.name == 'postgresql':
+        max_connections = int(db.session.execute(text('SHOW max_connections')).scalar())
+        in_use = db.session.execute(
+            text('SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()')
+        ).scalar()
+        capacity.update({
+            'server_max_connections': max_connections,
+            'server_connections_in_use': in_use,
+            'fits': capacity['max_app_connections'] <= max_connections
+        })
+
+    return jsonify({'pool': pool, 'capacity': capacity}), 200
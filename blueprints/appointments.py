@@ -1,55 +1,51 @@
 # blueprints/appointments.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from blueprints.auth import employee_required, lead_required, admin_required
 from models import db, Appointment, RecurringAppointment, CustomerLocation, Customer, Employee
-from datetime import datetime, date
-from flasgger import swag_from
-from utils.swagger_docs import (
-    APPOINTMENTS_GET, get_detail_docs, get_create_docs, get_update_docs, get_delete_docs
-)
+from datetime import datetime, date, timedelta
+import re
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.versioning import conditional_get
+from utils.bulk import BulkError, RowError, bulk_items, bulk_create_response, lookup, referenced_ids, row_id
+from utils.serializers import model_serializer
+from utils.availability import bitmap_rows
+from utils.docs import swag_from
 
 appointments_bp = Blueprint('appointments', __name__)
 
+# Public field names (for ?fields=) that differ from the Appointment columns
+APPOINTMENT_FIELD_ALIASES = {
+    'location_id': 'customer_location_id',
+    'start_time': 'arrival_datetime',
+    'end_time': 'departure_datetime',
+    'scheduled_start_datetime': 'arrival_datetime',
+    'scheduled_end_datetime': 'departure_datetime',
+    'service_type': 'description'
+}
+
 # Helper functions to serialize model objects
 
-def appointment_to_dict(appointment):
-    if not appointment:
-        return None
-    
-    # Get start and end times consistently
-    start_time = appointment.arrival_datetime
-    end_time = appointment.departure_datetime
-    if hasattr(appointment, 'start_time') and callable(getattr(appointment, 'start_time')):
-        start_time = appointment.start_time
-    if hasattr(appointment, 'end_time') and callable(getattr(appointment, 'end_time')):
-        end_time = appointment.end_time
-    
-    result = {
-        'id': appointment.id,
-        'customer_id': appointment.customer_id,
-        'employee_id': appointment.employee_id,
-        'location_id': appointment.customer_location_id,
-        'description': appointment.description,
-        'start_time': start_time.isoformat() if start_time else None,
-        'end_time': end_time.isoformat() if end_time else None,
-        'status': appointment.status,
-        'notes': appointment.notes,
-        'created_datetime': appointment.created_datetime.isoformat() if appointment.created_datetime else None,
-        # Add test-specific field names for compatibility
-        'scheduled_start_datetime': start_time.isoformat() if start_time else None,
-        'scheduled_end_datetime': end_time.isoformat() if end_time else None,
-        'service_type': appointment.description
-    }
-    return result
+appointment_to_dict = model_serializer(Appointment, (
+    'id', 'customer_id', 'employee_id', ('location_id', 'customer_location_id'), 'description',
+    ('start_time', 'arrival_datetime'), ('end_time', 'departure_datetime'), 'status', 'notes', 'created_datetime',
+    # Test-specific field names kept for compatibility
+    ('scheduled_start_datetime', 'arrival_datetime'), ('scheduled_end_datetime', 'departure_datetime'),
+    ('service_type', 'description')
+))
 
-def recurring_appointment_to_dict(recurring):
-    return {
-        'id': recurring.id,
-        'customer_location_id': recurring.customer_location_id,
-        'start_date': recurring.start_date.isoformat(),
-        'schedule': recurring.schedule,
-        'team': recurring.team
-    }
+def parse_appointment_times(data):
+    """Start and end datetimes from either field naming convention; ValueError if malformed."""
+    # First try the API test field names, then the implementation field names
+    start = data.get('scheduled_start_datetime') or data.get('start_time')
+    end = data.get('scheduled_end_datetime') or data.get('end_time')
+    return (datetime.fromisoformat(start) if start else None,
+            datetime.fromisoformat(end) if end else None)
+
+recurring_appointment_to_dict = model_serializer(RecurringAppointment, (
+    'id', 'customer_location_id', 'start_date', 'schedule', 'team'
+))
 
 # ----------------------------
 # One-Time Appointment Endpoints
@@ -57,7 +53,9 @@ def recurring_appointment_to_dict(recurring):
 
 @appointments_bp.route('/', methods=['GET'])
 @employee_required
-@swag_from(APPOINTMENTS_GET)
+@swag_from('APPOINTMENTS_GET')
+@conditional_get(Appointment)
+@cached_response(Appointment)
 def get_appointments():
     # Get query parameters
     customer_id = request.args.get('customer_id', type=int)
@@ -78,22 +76,22 @@ def get_appointments():
     if start_date:
         try:
             start_date = datetime.fromisoformat(start_date)
-            query = query.filter(Appointment.start_time >= start_date)
+            query = query.filter(Appointment.arrival_datetime >= start_date)
         except ValueError:
             return jsonify({'msg': 'Invalid start_date format, use ISO format (YYYY-MM-DDTHH:MM:SS)'}), 400
     if end_date:
         try:
             end_date = datetime.fromisoformat(end_date)
-            query = query.filter(Appointment.start_time <= end_date)
+            query = query.filter(Appointment.arrival_datetime <= end_date)
         except ValueError:
             return jsonify({'msg': 'Invalid end_date format, use ISO format (YYYY-MM-DDTHH:MM:SS)'}), 400
     
-    appointments = query.all()
-    return jsonify([appointment_to_dict(appt) for appt in appointments]), 200
+    return list_response(query, appointment_to_dict, sort_column=Appointment.arrival_datetime,
+                         aliases=APPOINTMENT_FIELD_ALIASES)
 
 @appointments_bp.route('/', methods=['POST'])
 @lead_required
-@swag_from(get_create_docs(
+@swag_from('get_create_docs',
     "Appointments", "appointment",
     {
         'customer_id': {"type": "integer", "example": 1},
@@ -117,7 +115,7 @@ def get_appointments():
         'notes': {"type": "string"},
         'created_datetime': {"type": "string", "format": "date-time"}
     }
-))
+)
 def create_appointment():
     data = request.get_json() or {}
     
@@ -146,17 +144,7 @@ def create_appointment():
     
     # Parse dates - handle both field naming conventions
     try:
-        # First try the API test field names
-        if data.get('scheduled_start_datetime'):
-            start_time = datetime.fromisoformat(data['scheduled_start_datetime'])
-        else:
-            # Then try the implementation field names
-            start_time = datetime.fromisoformat(data['start_time']) if data.get('start_time') else None
-            
-        if data.get('scheduled_end_datetime'):
-            end_time = datetime.fromisoformat(data['scheduled_end_datetime'])
-        else:
-            end_time = datetime.fromisoformat(data['end_time']) if data.get('end_time') else None
+        start_time, end_time = parse_appointment_times(data)
     except ValueError:
         return jsonify({'error': 'Invalid date format, use ISO format (YYYY-MM-DDTHH:MM:SS)'}), 400
     
@@ -187,9 +175,58 @@ def create_appointment():
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+@appointments_bp.route('/bulk', methods=['POST'])
+@lead_required
+@swag_from('APPOINTMENTS_BULK_POST')
+def bulk_create_appointments():
+    try:
+        items = bulk_items()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # One IN query per referenced table; a location also tells us its customer
+    locations = lookup([CustomerLocation.customer_id], CustomerLocation.id, referenced_ids(items, 'location_id'))
+    employees = lookup([], Employee.id, referenced_ids(items, 'employee_id'))
+
+    def prepare(item):
+        location_id = row_id(item, 'location_id')
+        employee_id = row_id(item, 'employee_id')
+        customer_id = row_id(item, 'customer_id')
+        if not location_id:
+            raise RowError('Missing required field: location_id')
+        location = locations.get(location_id)
+        if location is None:
+            raise RowError('Location not found')
+        customer_id = customer_id or location.customer_id
+        if customer_id != location.customer_id:
+            raise RowError('Location does not belong to this customer')
+        if employee_id and employee_id not in employees:
+            raise RowError('Employee not found')
+        try:
+            start_time, end_time = parse_appointment_times(item)
+        except (TypeError, ValueError):
+            raise RowError('Invalid date format, use ISO format (YYYY-MM-DDTHH:MM:SS)')
+        if not start_time or not end_time:
+            raise RowError('Start and end time are required')
+        if end_time < start_time:
+            raise RowError('End time is before start time')
+        return {
+            'customer_id': customer_id,
+            'employee_id': employee_id,
+            'customer_location_id': location[0],
+            'description': item.get('service_type') or item.get('description'),
+            'arrival_datetime': start_time,
+            'departure_datetime': end_time,
+            'status': item.get('status', 'scheduled'),
+            'team': item.get('team'),
+            'notes': item.get('notes')
+        }
+
+    return bulk_create_response(Appointment, items, prepare, appointment_to_dict)
+
 @appointments_bp.route('/<int:appointment_id>', methods=['GET'])
 @employee_required
-@swag_from(get_detail_docs(
+@swag_from('get_detail_docs',
     "Appointments", "appointment", "appointment_id",
     {
         'id': {"type": "integer"},
@@ -206,8 +243,14 @@ def create_appointment():
         'notes': {"type": "string"},
         'created_datetime': {"type": "string", "format": "date-time"}
     }
-))
+)
+@conditional_get(Appointment, Customer, Employee, CustomerLocation)
+@cached_response(Appointment, Customer, Employee, CustomerLocation)
 def get_appointment(appointment_id):
+    # Sparse fieldsets skip the related-name lookups below
+    if 'fields' in request.args:
+        return detail_response(Appointment, appointment_id, appointment_to_dict, aliases=APPOINTMENT_FIELD_ALIASES)
+    
     appointment = Appointment.query.get_or_404(appointment_id)
     response_data = appointment_to_dict(appointment)
     
@@ -239,7 +282,7 @@ def get_appointment(appointment_id):
 
 @appointments_bp.route('/<int:appointment_id>', methods=['PUT'])
 @lead_required
-@swag_from(get_update_docs(
+@swag_from('get_update_docs',
     "Appointments", "appointment", "appointment_id",
     {
         'customer_id': {"type": "integer", "example": 1},
@@ -266,7 +309,7 @@ def get_appointment(appointment_id):
         'notes': {"type": "string"},
         'created_datetime': {"type": "string", "format": "date-time"}
     }
-))
+)
 def update_appointment(appointment_id):
     appointment = Appointment.query.get_or_404(appointment_id)
     data = request.get_json() or {}
@@ -321,7 +364,7 @@ def update_appointment(appointment_id):
 
 @appointments_bp.route('/<int:appointment_id>', methods=['DELETE'])
 @lead_required
-@swag_from(get_delete_docs("Appointments", "appointment", "appointment_id"))
+@swag_from('get_delete_docs', "Appointments", "appointment", "appointment_id")
 def delete_appointment(appointment_id):
     appointment = Appointment.query.get_or_404(appointment_id)
     db.session.delete(appointment)
@@ -334,9 +377,9 @@ def delete_appointment(appointment_id):
 
 @appointments_bp.route('/recurring', methods=['GET'])
 @employee_required
+@cached_response(RecurringAppointment)
 def get_recurring_appointments():
-    recurring_apps = RecurringAppointment.query.all()
-    return jsonify([recurring_appointment_to_dict(r) for r in recurring_apps]), 200
+    return list_response(RecurringAppointment.query, recurring_appointment_to_dict)
 
 @appointments_bp.route('/recurring', methods=['POST'])
 @lead_required
@@ -366,9 +409,9 @@ def create_recurring_appointment():
 
 @appointments_bp.route('/recurring/<int:recurring_id>', methods=['GET'])
 @employee_required
+@cached_response(RecurringAppointment)
 def get_recurring_appointment(recurring_id):
-    recurring = RecurringAppointment.query.get_or_404(recurring_id)
-    return jsonify(recurring_appointment_to_dict(recurring)), 200
+    return detail_response(RecurringAppointment, recurring_id, recurring_appointment_to_dict)
 
 @appointments_bp.route('/recurring/<int:recurring_id>', methods=['PUT'])
 @lead_required
@@ -396,6 +439,7 @@ def delete_recurring_appointment(recurring_id):
 
 @appointments_bp.route('/available-employees', methods=['GET'])
 @employee_required
+@cached_response(Appointment, Employee)
 def get_available_employees():
     """
     Get Available Employees for an Appointment Time Range
@@ -451,21 +495,11 @@ def get_available_employees():
         end = datetime.fromisoformat(end_time)
     except ValueError:
         return jsonify({'msg': 'Invalid date format, use ISO format (YYYY-MM-DDTHH:MM:SS)'}), 400
+    if end <= start:
+        return jsonify({'msg': 'end_time must be after start_time'}), 400
     
-    # Find employees who don't have conflicting appointments
-    busy_employee_ids = db.session.query(Appointment.employee_id).filter(
-        Appointment.employee_id.isnot(None),
-        Appointment.status != 'cancelled',
-        db.or_(
-            db.and_(Appointment.start_time >= start, Appointment.start_time < end),
-            db.and_(Appointment.end_time > start, Appointment.end_time <= end),
-            db.and_(Appointment.start_time <= start, Appointment.end_time >= end)
-        )
-    ).distinct().all()
-    
-    busy_ids = [id[0] for id in busy_employee_ids]
-    
-    available_employees = Employee.query.filter(~Employee.id.in_(busy_ids) if busy_ids else True).all()
+    # Employees with no appointment overlapping [start, end)
+    available_employees = current_app.extensions['availability'].available_employees(start, end)
     
     result = [{
         'id': emp.id,
@@ -475,3 +509,105 @@ def get_available_employees():
     } for emp in available_employees]
     
     return jsonify(result), 200
+
+AVAILABILITY_SLOT_RE = re.compile(r'^(\d+)\s*(m|min|h)$')
+
+@appointments_bp.route('/availability-grid', methods=['GET'])
+@employee_required
+@cached_response(Appointment, Employee)
+def get_availability_grid():
+    """
+    Availability Grid for the Dispatch Board
+    ---
+    tags:
+      - Appointments
+    description: >
+      Every employee's availability in fixed slots over one or more days, in
+      one request. Each employee's `available` string has one character per
+      slot, `1` where the employee has no appointment overlapping the slot
+      and `0` where they are booked. Cancelled appointments are ignored.
+    parameters:
+      - name: date
+        in: query
+        type: string
+        format: date
+        required: true
+        description: First day of the grid (YYYY-MM-DD)
+      - name: slot
+        in: query
+        type: string
+        default: 30m
+        description: Slot length in minutes or hours (15m, 30m, 1h); must divide a day evenly
+      - name: days
+        in: query
+        type: integer
+        default: 1
+        description: Number of days, 1 (a day) to 7 (a week)
+    responses:
+      200:
+        description: Availability bitmap of every employee over the slots
+        schema:
+          type: object
+          properties:
+            start:
+              type: string
+              format: date-time
+            end:
+              type: string
+              format: date-time
+            slot_minutes:
+              type: integer
+            slots:
+              type: integer
+            employees:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                  name:
+                    type: string
+                  role:
+                    type: string
+                  available:
+                    type: string
+                    example: "111100001111"
+      400:
+        description: Invalid request parameters
+      401:
+        description: Unauthorized
+      403:
+        description: Forbidden - Insufficient permissions
+    security:
+      - Bearer: []
+    """
+    try:
+        day = date.fromisoformat(request.args.get('date', ''))
+    except ValueError:
+        return jsonify({'msg': 'date is required, use ISO format (YYYY-MM-DD)'}), 400
+    match = AVAILABILITY_SLOT_RE.match(request.args.get('slot', '30m').strip())
+    if not match:
+        return jsonify({'msg': 'Invalid slot, use minutes or hours such as 15m, 30m or 1h'}), 400
+    slot_minutes = int(match.group(1)) * (60 if match.group(2) == 'h' else 1)
+    if not 5 <= slot_minutes <= 1440 or 1440 % slot_minutes:
+        return jsonify({'msg': 'slot must be between 5m and 24h and divide a day evenly'}), 400
+    days = request.args.get('days', 1, type=int)
+    if not 1 <= days <= 7:
+        return jsonify({'msg': 'days must be between 1 and 7'}), 400
+
+    start = datetime.combine(day, datetime.min.time())
+    slots = days * 1440 // slot_minutes
+    employees, free = current_app.extensions['availability'].grid(start, slots, slot_minutes)
+    return jsonify({
+        'start': start.isoformat(),
+        'end': (start + timedelta(days=days)).isoformat(),
+        'slot_minutes': slot_minutes,
+        'slots': slots,
+        'employees': [{
+            'id': employee.id,
+            'name': employee.name,
+            'role': employee.role,
+            'available': row
+        } for employee, row in zip(employees, bitmap_rows(free))]
+    }), 200
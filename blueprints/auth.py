@@ -1,21 +1,24 @@
 # blueprints/auth.py
 from flask import Blueprint, request, jsonify
 from models import db, Employee, Customer
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import check_password, hash_password, verify_and_update
+from utils.revocation import revoke_token
+from utils.ratelimit import rate_limit, json_field
 from flask_jwt_extended import (
     create_access_token, jwt_required, get_jwt, verify_jwt_in_request,
-    get_jwt_identity, create_refresh_token, get_current_user
+    get_jwt_identity, create_refresh_token, get_current_user, decode_token
 )
 from datetime import timedelta
 import os
-from flasgger import swag_from
-from utils.swagger_docs import AUTH_LOGIN
+from utils.docs import swag_from
 from functools import wraps
 auth_bp = Blueprint('auth', __name__)
 
 
 @auth_bp.route('/login', methods=['POST'])
-@swag_from(AUTH_LOGIN)
+@rate_limit('10/minute', key=json_field('email'))
+@rate_limit('60/minute')
+@swag_from('AUTH_LOGIN')
 def login():
     data = request.get_json() or {}
     email = data.get('email')
@@ -27,7 +30,7 @@ def login():
     
     if not employee:
         return jsonify({'msg': 'Bad email' + str(employee)}), 401
-    if not check_password_hash(employee.password_hash, password):
+    if not verify_and_update(employee, password):
         return jsonify({'msg': 'Bad password' + str(employee)}), 401
 
     # Add a claim to distinguish employee tokens from customer tokens.
@@ -56,6 +59,8 @@ def login():
     }), 200
 
 @auth_bp.route('/customer/login', methods=['POST'])
+@rate_limit('10/minute', key=json_field('email'))
+@rate_limit('60/minute')
 def customer_login():
     """
     Customer Login Endpoint
@@ -114,7 +119,7 @@ def customer_login():
     
     if not customer:
         return jsonify({'msg': 'Invalid email'}), 401
-    if not customer.password_hash or not check_password_hash(customer.password_hash, password):
+    if not customer.password_hash or not verify_and_update(customer, password):
         return jsonify({'msg': 'Invalid password'}), 401
         
     # Add claim for customer
@@ -181,6 +186,53 @@ def refresh():
     
     return jsonify({'access_token': access_token}), 200
 
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Logout Endpoint
+    ---
+    tags:
+      - Authentication
+    description: >
+      Revoke the token used to call this endpoint (access or refresh). Pass the
+      refresh token in the body to revoke it along with the access token.
+    security:
+      - Bearer: []
+    parameters:
+      - name: body
+        in: body
+        required: false
+        schema:
+          type: object
+          properties:
+            refresh_token:
+              type: string
+    responses:
+      200:
+        description: Logged out
+      400:
+        description: Invalid refresh token
+      401:
+        description: Missing, expired or already revoked token
+    """
+    claims = get_jwt()
+    data = request.get_json(silent=True) or {}
+    refresh_claims = None
+    if data.get('refresh_token'):
+        try:
+            refresh_claims = decode_token(data['refresh_token'])
+        except Exception:
+            return jsonify({'msg': 'Invalid refresh token'}), 400
+        if refresh_claims.get('type') != 'refresh' or refresh_claims.get('sub') != claims.get('sub') \
+                or refresh_claims.get('user_type') != claims.get('user_type'):
+            return jsonify({'msg': 'Invalid refresh token'}), 400
+
+    revoke_token(claims)
+    if refresh_claims is not None:
+        revoke_token(refresh_claims)
+    return jsonify({'msg': 'Logged out'}), 200
+
 @auth_bp.route('/register', methods=['POST'])
 def register_employee():
     """
@@ -340,50 +392,47 @@ def change_password():
         return jsonify({'msg': 'User not found'}), 404
     
     # Verify current password
-    if not check_password_hash(user.password_hash, data['current_password']):
+    if not check_password(user.password_hash, data['current_password']):
         return jsonify({'msg': 'Current password is incorrect'}), 401
     
     # Update password
-    user.set_password(data['new_password'])
+    user.password_hash = hash_password(data['new_password'])
     db.session.commit()
     
     return jsonify({'msg': 'Password updated successfully'}), 200
 
-def employee_required(fn):
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        claims = get_jwt()
-        if claims.get("user_type") != "employee":
-            return jsonify({'msg': 'Unauthorized - employee token required'}), 403
-        if not (claims.get("user_role") == "admin" or claims.get("user_role") == "lead" or claims.get("user_role") == "employee"):
-            return jsonify({'msg': 'Unauthorized - admin, lead, or employee token required'}), 403
-        return fn(*args, **kwargs)
-    return wrapper
+# Roles each decorator admits; checked with one set lookup per request
+EMPLOYEE_ROLES = frozenset({'admin', 'lead', 'employee'})
+LEAD_ROLES = frozenset({'admin', 'lead'})
+ADMIN_ROLES = frozenset({'admin'})
 
-def lead_required(fn):
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        claims = get_jwt()
-        if claims.get("user_type") != "employee":
-            return jsonify({'msg': 'Unauthorized - employee token required'}), 403
-        if not (claims.get("user_role") == "admin" or claims.get("user_role") == "lead"):
-            return jsonify({'msg': 'Unauthorized - admin, lead, or employee token required'}), 403
-        return fn(*args, **kwargs)
-    return wrapper
 
-def admin_required(fn):
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        claims = get_jwt()
-        if claims.get("user_type") != "employee":
-            return jsonify({'msg': 'Unauthorized - employee token required'}), 403
-        if not (claims.get("user_role") == "admin"):
-            return jsonify({'msg': 'Unauthorized - admin, lead, or employee token required'}), 403
-        return fn(*args, **kwargs)
-    return wrapper
+def claims_required(user_type, roles=None, role_msg='Unauthorized - admin, lead, or employee token required'):
+    """Admit requests whose JWT has ``user_type`` and, if given, a ``user_role`` in ``roles``.
+
+    The token is verified once (through the decoded-token cache, see
+    ``utils.jwt_cache``) and the claims are checked directly.
+    """
+    type_msg = f'Unauthorized - {user_type} token required'
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verified = verify_jwt_in_request()
+            claims = verified[1] if verified else {}
+            if claims.get("user_type") != user_type:
+                return jsonify({'msg': type_msg}), 403
+            if roles is not None and claims.get("user_role") not in roles:
+                return jsonify({'msg': role_msg}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+employee_required = claims_required("employee", EMPLOYEE_ROLES)
+lead_required = claims_required("employee", LEAD_ROLES)
+admin_required = claims_required("employee", ADMIN_ROLES)
+customer_required = claims_required("customer")
 
 def api_key_required(fn):
     @wraps(fn)
@@ -394,13 +443,3 @@ def api_key_required(fn):
         return fn(*args, **kwargs)
     wrapper.__name__ = fn.__name__
     return wrapper
-
-def customer_required(fn):
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        claims = get_jwt()
-        if claims.get("user_type") != "customer":
-            return jsonify({'msg': 'Unauthorized - customer token required'}), 403
-        return fn(*args, **kwargs)
-    return wrapper
\ No newline at end of file
@@ -2,38 +2,21 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import (
     create_access_token,
-    jwt_required,
-    get_jwt_identity,
-    get_jwt
+    get_jwt_identity
 )
-from flasgger import swag_from
-from utils.swagger_docs import (
-    CUSTOMER_PORTAL_REGISTER_POST,
-    CUSTOMER_PORTAL_LOGIN_POST,
-    CUSTOMER_PORTAL_PROFILE_GET,
-    CUSTOMER_PORTAL_PROFILE_PUT,
-    CUSTOMER_PORTAL_APPOINTMENTS_GET,
-    CUSTOMER_PORTAL_INVOICES_GET,
-    CUSTOMER_PORTAL_PHOTOS_GET,
-    CUSTOMER_PORTAL_REVIEWS_POST,
-    CUSTOMER_PORTAL_INVOICE_ID_GET)
-from werkzeug.security import generate_password_hash, check_password_hash
+from blueprints.auth import customer_required
+from utils.docs import swag_from
+from utils.passwords import hash_password, verify_and_update
+from utils.ratelimit import rate_limit, json_field
 from models import db, Customer, CustomerLocation, Appointment, Invoice, Photo, Review
 from datetime import timedelta, datetime
 import re
+from utils.serializers import model_serializer
 
 customer_portal_bp = Blueprint('customer_portal', __name__)
 
 # Helper: Serialize a customer object
-def customer_to_dict(cust):
-    return {
-        'id': cust.id,
-        'name': cust.name,
-        'phone': cust.phone,
-        'email': cust.email,
-        'notes': cust.notes,
-        'created_datetime': cust.created_datetime.isoformat() if cust.created_datetime else None
-    }
+customer_to_dict = model_serializer(Customer, ('id', 'name', 'phone', 'email', 'notes', 'created_datetime'))
 
 # Simple email validation
 def is_valid_email(email):
@@ -42,8 +25,9 @@ def is_valid_email(email):
 # ------------------------------------------
 # Customer Registration (Separate from Employees)
 # ------------------------------------------
-@swag_from(CUSTOMER_PORTAL_REGISTER_POST)
+@swag_from('CUSTOMER_PORTAL_REGISTER_POST')
 @customer_portal_bp.route('/register', methods=['POST'])
+@rate_limit('20/hour', burst=5)
 def customer_register():
     data = request.get_json() or {}
     email = data.get('email')
@@ -65,7 +49,7 @@ def customer_register():
             name=name,
             email=email,
             phone=phone,
-            password_hash=generate_password_hash(password)
+            password_hash=hash_password(password)
         )
         db.session.add(new_customer)
         db.session.commit()
@@ -76,8 +60,10 @@ def customer_register():
     except Exception as e:
         return jsonify({'msg': str(e)}), 400
 
-@swag_from(CUSTOMER_PORTAL_LOGIN_POST)
+@swag_from('CUSTOMER_PORTAL_LOGIN_POST')
 @customer_portal_bp.route('/login', methods=['POST'])
+@rate_limit('10/minute', key=json_field('email'))
+@rate_limit('60/minute')
 def customer_login():
     data = request.get_json() or {}
     email = data.get('email')
@@ -87,7 +73,7 @@ def customer_login():
         return jsonify({'msg': 'Email and password required'}), 400
 
     customer = Customer.query.filter_by(email=email).first()
-    if not customer or not check_password_hash(customer.password_hash, password):
+    if not customer or not verify_and_update(customer, password):
         return jsonify({'msg': 'Invalid email or password'}), 401
 
     # Add a claim to distinguish customer tokens from employee tokens
@@ -106,18 +92,8 @@ def customer_login():
         }
     }), 200
 
-def customer_required(fn):
-    @jwt_required()
-    def wrapper(*args, **kwargs):
-        claims = get_jwt()
-        if claims.get("user_type") != "customer":
-            return jsonify({'msg': 'Unauthorized - customer token required'}), 403
-        return fn(*args, **kwargs)
-    wrapper.__name__ = fn.__name__
-    return wrapper
-
 @customer_portal_bp.route('/profile', methods=['GET'])
-@swag_from(CUSTOMER_PORTAL_PROFILE_GET)
+@swag_from('CUSTOMER_PORTAL_PROFILE_GET')
 @customer_required
 def get_customer_profile():
     customer_id = get_jwt_identity()
@@ -128,7 +104,7 @@ def get_customer_profile():
     return jsonify(customer_to_dict(customer)), 200
 
 @customer_portal_bp.route('/profile', methods=['PUT'])
-@swag_from(CUSTOMER_PORTAL_PROFILE_PUT)
+@swag_from('CUSTOMER_PORTAL_PROFILE_PUT')
 @customer_required
 def update_customer_profile():
     customer_id = get_jwt_identity()
@@ -141,14 +117,14 @@ def update_customer_profile():
         customer.name = data.get('name', customer.name)
         customer.phone = data.get('phone', customer.phone)
         if data.get('password'):
-            customer.password_hash = generate_password_hash(data['password'])
+            customer.password_hash = hash_password(data['password'])
         db.session.commit()
         return jsonify(customer_to_dict(customer)), 200
     except Exception as e:
         return jsonify({'msg': str(e)}), 400
 
 @customer_portal_bp.route('/appointments', methods=['GET'])
-@swag_from(CUSTOMER_PORTAL_APPOINTMENTS_GET)
+@swag_from('CUSTOMER_PORTAL_APPOINTMENTS_GET')
 @customer_required
 def get_customer_appointments():
     customer_id = get_jwt_identity()
@@ -168,18 +144,15 @@ def get_customer_appointments():
     } for apt in appointments]), 200
 
 @customer_portal_bp.route('/invoices', methods=['GET'])
-@swag_from(CUSTOMER_PORTAL_INVOICES_GET)
+@swag_from('CUSTOMER_PORTAL_INVOICES_GET')
 @customer_required
 def get_customer_invoices():
     customer_id = get_jwt_identity()
     # Convert to int if it's a string
     if isinstance(customer_id, str):
         customer_id = int(customer_id)
-    customer = Customer.query.get_or_404(customer_id)
-    invoices = []
-    for location in customer.locations:
-        for appointment in location.appointments:
-            invoices.extend(appointment.invoices)
+    Customer.query.get_or_404(customer_id)
+    invoices = Invoice.query.join(Appointment, Invoice.appointment_id == Appointment.id).filter(Appointment.customer_id == customer_id).order_by(Invoice.id).all()
     return jsonify([{
         'id': inv.id,
         'appointment_id': inv.appointment_id,
@@ -192,7 +165,7 @@ def get_customer_invoices():
     } for inv in invoices]), 200
 
 @customer_portal_bp.route('/photos', methods=['GET'])
-@swag_from(CUSTOMER_PORTAL_PHOTOS_GET)
+@swag_from('CUSTOMER_PORTAL_PHOTOS_GET')
 @customer_required
 def get_customer_photos():
     customer_id = get_jwt_identity()
@@ -212,7 +185,7 @@ def get_customer_photos():
     } for photo in photos if photo.show_to_customer]), 200
 
 @customer_portal_bp.route('/reviews', methods=['POST'])
-@swag_from(CUSTOMER_PORTAL_REVIEWS_POST)
+@swag_from('CUSTOMER_PORTAL_REVIEWS_POST')
 @customer_required
 def submit_review():
     customer_id = get_jwt_identity()
@@ -237,7 +210,7 @@ def submit_review():
         return jsonify({'msg': str(e)}), 400
 
 @customer_portal_bp.route('/payment/<int:invoice_id>', methods=['GET'])
-@swag_from(CUSTOMER_PORTAL_INVOICE_ID_GET)
+@swag_from('CUSTOMER_PORTAL_INVOICE_ID_GET')
 @customer_required
 def initiate_payment(invoice_id):
     # In a real integration, call the payment provider (e.g., Stripe) to create a payment session.
@@ -1,42 +1,34 @@
 # blueprints/customers.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from blueprints.auth import employee_required, lead_required, admin_required
 from models import db, Customer
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.bulk import BulkError, RowError, bulk_items, bulk_create_response, lookup
+from utils.csv_import import CsvImportError, import_customers, text_stream
+from utils.serializers import model_serializer
 from werkzeug.security import generate_password_hash
-from flasgger import swag_from
-from utils.swagger_docs import (
-    CUSTOMER_LIST, CUSTOMER_CREATE, CUSTOMER_GET, 
-    CUSTOMER_UPDATE, CUSTOMER_DELETE
-)
+from utils.docs import swag_from
 
 customers_bp = Blueprint('customers', __name__)
 
 
-def customer_to_dict(cust):
-    if not cust:
-        return None
-    return {
-        'id': cust.id,
-        'name': cust.name,
-        'phone': cust.phone,
-        'email': cust.email,
-        'notes': cust.notes,
-        'created_datetime': cust.created_datetime.isoformat() if cust.created_datetime else None
-    }
+customer_to_dict = model_serializer(Customer, ('id', 'name', 'phone', 'email', 'notes', 'created_datetime'))
 
 
 @customers_bp.route('/', methods=['GET'])
 @employee_required
-@swag_from(CUSTOMER_LIST)
+@swag_from('CUSTOMER_LIST')
+@cached_response(Customer)
 def get_customers():
     """Get all customers"""
-    customers = Customer.query.all()
-    return jsonify([customer_to_dict(cust) for cust in customers]), 200
+    return list_response(Customer.query, customer_to_dict)
 
 
 @customers_bp.route('/', methods=['POST'])
 @lead_required
-@swag_from(CUSTOMER_CREATE)
+@swag_from('CUSTOMER_CREATE')
 def create_customer():
     """Create a new customer"""
     data = request.get_json() or {}
@@ -66,18 +58,78 @@ def create_customer():
         return jsonify({'error': str(e)}), 400
 
 
+@customers_bp.route('/bulk', methods=['POST'])
+@lead_required
+@swag_from('CUSTOMER_BULK_CREATE')
+def bulk_create_customers():
+    """Create many customers in one transaction"""
+    try:
+        items = bulk_items()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    emails = {item.get('email') for item in items if isinstance(item, dict) and isinstance(item.get('email'), str)}
+    taken = set(lookup([], Customer.email, emails))
+    seen = set()
+
+    def prepare(item):
+        if not item.get('name'):
+            raise RowError('Name is required')
+        email = item.get('email')
+        if not email or not isinstance(email, str):
+            raise RowError('Email is required')
+        if email in taken or email in seen:
+            raise RowError('Email already exists')
+        seen.add(email)
+        return {
+            'name': item['name'],
+            'phone': item.get('phone'),
+            'email': email,
+            'notes': item.get('notes')
+        }
+
+    return bulk_create_response(Customer, items, prepare, customer_to_dict)
+
+
+@customers_bp.route('/import', methods=['POST'])
+@admin_required
+@swag_from('CUSTOMER_IMPORT')
+def import_customers_csv():
+    """Import customers and locations from a CSV upload"""
+    # A multipart upload is spooled to disk by Werkzeug; a text/csv body is read from the socket
+    if 'file' in request.files:
+        stream = request.files['file'].stream
+    elif request.mimetype == 'text/csv':
+        stream = request.stream
+    else:
+        return jsonify({'error': 'Upload a CSV as the "file" form field or send it as text/csv'}), 400
+
+    chunk_size = request.args.get('chunk_size', 1000, type=int)
+    if not 1 <= chunk_size <= 10000:
+        return jsonify({'error': 'chunk_size must be between 1 and 10000'}), 400
+
+    def progress(report):
+        current_app.logger.info('Customer import: %d rows, %d chunks committed', report.rows, report.chunks)
+
+    try:
+        report = import_customers(text_stream(stream), chunk_size=chunk_size, progress=progress)
+    except CsvImportError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(report.as_dict()), 200
+
+
 @customers_bp.route('/<int:customer_id>', methods=['GET'])
 @employee_required
-@swag_from(CUSTOMER_GET)
+@swag_from('CUSTOMER_GET')
+@cached_response(Customer)
 def get_customer(customer_id):
     """Get a specific customer by ID"""
-    customer = Customer.query.get_or_404(customer_id)
-    return jsonify(customer_to_dict(customer)), 200
+    return detail_response(Customer, customer_id, customer_to_dict)
 
 
 @customers_bp.route('/<int:customer_id>', methods=['PUT'])
 @lead_required
-@swag_from(CUSTOMER_UPDATE)
+@swag_from('CUSTOMER_UPDATE')
 def update_customer(customer_id):
     """Update a customer"""
     customer = Customer.query.get_or_404(customer_id)
@@ -108,7 +160,7 @@ def update_customer(customer_id):
 
 @customers_bp.route('/<int:customer_id>', methods=['DELETE'])
 @admin_required
-@swag_from(CUSTOMER_DELETE)
+@swag_from('CUSTOMER_DELETE')
 def delete_customer(customer_id):
     """Delete a customer"""
     try:
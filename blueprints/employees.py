@@ -2,34 +2,29 @@
 from flask import Blueprint, request, jsonify
 from blueprints.auth import lead_required, admin_required
 from models import db, Employee
-from werkzeug.security import generate_password_hash
-from flasgger import swag_from
-from utils.swagger_docs import (
-    EMPLOYEES_GET, get_detail_docs, get_update_docs, get_delete_docs, get_create_docs
-)
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.versioning import conditional_get
+from utils.serializers import model_serializer
+from utils.passwords import hash_password
+from utils.docs import swag_from
 
 employees_bp = Blueprint('employees', __name__)
 
-def employee_to_dict(emp):
-    return {
-        'id': emp.id,
-        'name': emp.name,
-        'phone': emp.phone,
-        'email': emp.email,
-        'team': emp.team,
-        'role': emp.role
-    }
+employee_to_dict = model_serializer(Employee, ('id', 'name', 'phone', 'email', 'team', 'role'))
 
 @employees_bp.route('/', methods=['GET'])
 @lead_required
-@swag_from(EMPLOYEES_GET)
+@swag_from('EMPLOYEES_GET')
+@conditional_get(Employee)
+@cached_response(Employee)
 def get_employees():
-    employees = Employee.query.all()
-    return jsonify([employee_to_dict(emp) for emp in employees]), 200
+    return list_response(Employee.query, employee_to_dict)
 
 @employees_bp.route('/', methods=['POST'])
 @admin_required
-@swag_from(get_create_docs(
+@swag_from('get_create_docs',
     "Employees", "employee",
     {
         'name': {"type": "string", "example": "John Smith"},
@@ -47,7 +42,7 @@ def get_employees():
         'team': {"type": "string"},
         'role': {"type": "string", "enum": ["admin", "lead", "employee"]}
     }
-))
+)
 def create_employee():
     data = request.get_json() or {}
     
@@ -68,7 +63,7 @@ def create_employee():
             name=data.get('name'),
             phone=data.get('phone', ''),
             email=data.get('email'),
-            password_hash=generate_password_hash(data.get('password')),
+            password_hash=hash_password(data.get('password')),
             team=data.get('team', ''),
             role=data.get('role', 'employee')
         )
@@ -81,7 +76,7 @@ def create_employee():
 
 @employees_bp.route('/<int:employee_id>', methods=['GET'])
 @lead_required
-@swag_from(get_detail_docs(
+@swag_from('get_detail_docs',
     "Employees", "employee", "employee_id", 
     {
         'id': {"type": "integer"},
@@ -91,14 +86,15 @@ def create_employee():
         'team': {"type": "string"},
         'role': {"type": "string", "enum": ["admin", "lead", "employee"]}
     }
-))
+)
+@conditional_get(Employee)
+@cached_response(Employee)
 def get_employee(employee_id):
-    emp = Employee.query.get_or_404(employee_id)
-    return jsonify(employee_to_dict(emp)), 200
+    return detail_response(Employee, employee_id, employee_to_dict)
 
 @employees_bp.route('/<int:employee_id>', methods=['PUT'])
 @admin_required
-@swag_from(get_update_docs(
+@swag_from('get_update_docs',
     "Employees", "employee", "employee_id",
     {
         'name': {"type": "string", "example": "John Smith"},
@@ -116,7 +112,7 @@ def get_employee(employee_id):
         'team': {"type": "string"},
         'role': {"type": "string", "enum": ["admin", "lead", "employee"]}
     }
-))
+)
 def update_employee(employee_id):
     emp = Employee.query.get_or_404(employee_id)
     data = request.get_json() or {}
@@ -126,13 +122,13 @@ def update_employee(employee_id):
     emp.team = data.get('team', emp.team)
     emp.role = data.get('role', emp.role)
     if data.get('password'):
-        emp.password_hash = generate_password_hash(data['password'])
+        emp.password_hash = hash_password(data['password'])
     db.session.commit()
     return jsonify({'msg': 'Employee updated successfully'}), 200
 
 @employees_bp.route('/<int:employee_id>', methods=['DELETE'])
 @admin_required
-@swag_from(get_delete_docs("Employees", "employee", "employee_id"))
+@swag_from('get_delete_docs', "Employees", "employee", "employee_id")
 def delete_employee(employee_id):
     emp = Employee.query.get_or_404(employee_id)
     db.session.delete(emp)
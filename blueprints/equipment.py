@@ -2,36 +2,29 @@
 from flask import Blueprint, request, jsonify
 from blueprints.auth import employee_required, admin_required
 from models import db, EquipmentCategory, Equipment, EquipmentAssignment, ConsumableUsage
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.versioning import conditional_get
+from utils.serializers import model_serializer
 from datetime import datetime, date
-from flasgger import swag_from
-from utils.swagger_docs import (
-    EQUIPMENT_CATEGORIES_GET,
-    EQUIPMENT_CATEGORIES_POST,
-    EQUIPMENT_GET,
-    EQUIPMENT_POST,
-    EQUIPMENT_EQ_ID_GET,
-    EQUIPMENT_EQ_ID_PUT,
-    EQUIPMENT_EQ_ID_DELETE,
-    EQUIPMENT_EQ_ID_POST)
+from utils.docs import swag_from
 
 equipment_bp = Blueprint('equipment', __name__)
 
 # --- Equipment Categories ---
-def category_to_dict(cat):
-    return {
-        'id': cat.id,
-        'name': cat.name
-    }
+category_to_dict = model_serializer(EquipmentCategory, ('id', 'name'))
 
 @equipment_bp.route('/categories', methods=['GET'])
-@swag_from(EQUIPMENT_CATEGORIES_GET)
+@swag_from('EQUIPMENT_CATEGORIES_GET')
 @employee_required
+@conditional_get(EquipmentCategory)
+@cached_response(EquipmentCategory)
 def get_categories():
-    categories = EquipmentCategory.query.all()
-    return jsonify([category_to_dict(cat) for cat in categories]), 200
+    return list_response(EquipmentCategory.query, category_to_dict)
 
 @equipment_bp.route('/categories', methods=['POST'])
-@swag_from(EQUIPMENT_CATEGORIES_POST)
+@swag_from('EQUIPMENT_CATEGORIES_POST')
 @admin_required
 def create_category():
     data = request.get_json() or {}
@@ -44,33 +37,21 @@ def create_category():
     return jsonify(category_to_dict(new_cat)), 201
 
 # --- Equipment ---
-def equipment_to_dict(eq):
-    return {
-        'id': eq.id,
-        'name': eq.name,
-        'purchased_date': eq.purchased_date.isoformat() if eq.purchased_date else None,
-        'purchased_condition': eq.purchased_condition,
-        'warranty_expiration_date': eq.warranty_expiration_date.isoformat() if eq.warranty_expiration_date else None,
-        'manufacturer': eq.manufacturer,
-        'model': eq.model,
-        'equipment_category_id': eq.equipment_category_id,
-        'purchase_price': eq.purchase_price,
-        'repair_cost_to_date': eq.repair_cost_to_date,
-        'purchased_by': eq.purchased_by,
-        'fuel_type': eq.fuel_type,
-        'oil_type': eq.oil_type,
-        'created_date': eq.created_date.isoformat()
-    }
+equipment_to_dict = model_serializer(Equipment, (
+    'id', 'name', 'purchased_date', 'purchased_condition', 'warranty_expiration_date', 'manufacturer', 'model',
+    'equipment_category_id', 'purchase_price', 'repair_cost_to_date', 'purchased_by', 'created_date'
+))
 
 @equipment_bp.route('/', methods=['GET'])
-@swag_from(EQUIPMENT_GET)
+@swag_from('EQUIPMENT_GET')
 @employee_required
+@conditional_get(Equipment)
+@cached_response(Equipment)
 def get_equipment():
-    equipment = Equipment.query.all()
-    return jsonify([equipment_to_dict(eq) for eq in equipment]), 200
+    return list_response(Equipment.query, equipment_to_dict)
 
 @equipment_bp.route('/', methods=['POST'])
-@swag_from(EQUIPMENT_POST)
+@swag_from('EQUIPMENT_POST')
 @admin_required
 def create_equipment():
     data = request.get_json() or {}
@@ -85,9 +66,7 @@ def create_equipment():
             equipment_category_id=data.get('equipment_category_id'),
             purchase_price=float(data.get('purchase_price', 0)),
             repair_cost_to_date=float(data.get('repair_cost_to_date', 0)),
-            purchased_by=data.get('purchased_by'),
-            fuel_type=data.get('fuel_type'),
-            oil_type=data.get('oil_type')
+            purchased_by=data.get('purchased_by')
         )
     except Exception as e:
         return jsonify({'msg': 'Invalid input', 'error': str(e)}), 400
@@ -96,14 +75,15 @@ def create_equipment():
     return jsonify({'msg': 'Equipment created', 'equipment_id': new_eq.id}), 201
 
 @equipment_bp.route('/<int:eq_id>', methods=['GET'])
-@swag_from(EQUIPMENT_EQ_ID_GET)
+@swag_from('EQUIPMENT_EQ_ID_GET')
 @employee_required
+@conditional_get(Equipment)
+@cached_response(Equipment)
 def get_equipment_item(eq_id):
-    eq = Equipment.query.get_or_404(eq_id)
-    return jsonify(equipment_to_dict(eq)), 200
+    return detail_response(Equipment, eq_id, equipment_to_dict)
 
 @equipment_bp.route('/<int:eq_id>', methods=['PUT'])
-@swag_from(EQUIPMENT_EQ_ID_PUT)
+@swag_from('EQUIPMENT_EQ_ID_PUT')
 @admin_required
 def update_equipment(eq_id):
     eq = Equipment.query.get_or_404(eq_id)
@@ -114,7 +94,7 @@ def update_equipment(eq_id):
     return jsonify({'msg': 'Equipment updated'}), 200
 
 @equipment_bp.route('/<int:eq_id>', methods=['DELETE'])
-@swag_from(EQUIPMENT_EQ_ID_DELETE)
+@swag_from('EQUIPMENT_EQ_ID_DELETE')
 @admin_required
 def delete_equipment(eq_id):
     eq = Equipment.query.get_or_404(eq_id)
@@ -123,23 +103,18 @@ def delete_equipment(eq_id):
     return jsonify({'msg': 'Equipment deleted'}), 200
 
 # --- Equipment Assignments ---
-def assignment_to_dict(assign):
-    return {
-        'id': assign.id,
-        'equipment_id': assign.equipment_id,
-        'team': assign.team,
-        'assigned_date': assign.assigned_date.isoformat()
-    }
+assignment_to_dict = model_serializer(EquipmentAssignment, ('id', 'equipment_id', 'team', 'assigned_date'))
 
 @equipment_bp.route('/<int:eq_id>/assignments', methods=['GET'])
-@swag_from(EQUIPMENT_EQ_ID_GET)
+@swag_from('EQUIPMENT_EQ_ID_GET')
 @employee_required
+@cached_response(Equipment, EquipmentAssignment)
 def get_assignments(eq_id):
     eq = Equipment.query.get_or_404(eq_id)
     return jsonify([assignment_to_dict(a) for a in eq.assignments]), 200
 
 @equipment_bp.route('/<int:eq_id>/assignments', methods=['POST'])
-@swag_from(EQUIPMENT_EQ_ID_POST)
+@swag_from('EQUIPMENT_EQ_ID_POST')
 @admin_required
 def create_assignment(eq_id):
     Equipment.query.get_or_404(eq_id)  # Ensure equipment exists
@@ -154,25 +129,20 @@ def create_assignment(eq_id):
     return jsonify({'msg': 'Assignment created', 'assignment_id': new_assign.id}), 201
 
 # --- Consumable Usage ---
-def consumable_to_dict(c):
-    return {
-        'id': c.id,
-        'equipment_id': c.equipment_id,
-        'consumable_type': c.consumable_type,
-        'amount_used': c.amount_used,
-        'cost_per_liter': c.cost_per_liter,
-        'date_recorded': c.date_recorded.isoformat()
-    }
+consumable_to_dict = model_serializer(ConsumableUsage, (
+    'id', 'equipment_id', 'consumable_type', 'amount_used', 'cost_per_liter', 'date_recorded'
+))
 
 @equipment_bp.route('/<int:eq_id>/consumables', methods=['GET'])
-@swag_from(EQUIPMENT_EQ_ID_GET)
+@swag_from('EQUIPMENT_EQ_ID_GET')
 @employee_required
+@cached_response(Equipment, ConsumableUsage)
 def get_consumables(eq_id):
     eq = Equipment.query.get_or_404(eq_id)
     return jsonify([consumable_to_dict(c) for c in eq.consumables]), 200
 
 @equipment_bp.route('/<int:eq_id>/consumables', methods=['POST'])
-@swag_from(EQUIPMENT_EQ_ID_POST)
+@swag_from('EQUIPMENT_EQ_ID_POST')
 @admin_required
 def create_consumable(eq_id):
     Equipment.query.get_or_404(eq_id)
@@ -0,0 +1,139 @@
+# blueprints/export.py
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from blueprints.auth import admin_required
+from models import (
+    Customer, CustomerLocation, Employee, Appointment, Invoice, InvoiceItem, Payment, Service, TimeLog
+)
+from datetime import datetime, date, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from utils.streaming import iter_csv, iter_ndjson
+from utils.docs import swag_from
+
+export_bp = Blueprint('export', __name__)
+
+InvoiceCustomer = aliased(Customer)
+
+
+def _invoice_columns():
+    return [
+        Invoice.id, Invoice.invoice_number, Invoice.appointment_id,
+        Appointment.customer_id, InvoiceCustomer.name.label('customer_name'),
+        Invoice.subtotal, Invoice.tax_rate, Invoice.total, Invoice.amount_paid, Invoice.balance,
+        Invoice.paid, Invoice.status, Invoice.due_date, Invoice.created_date
+    ]
+
+
+# Each export: the statement (joined columns included) and the column its date range filters on
+EXPORTS = {
+    'invoices': lambda: (
+        select(*_invoice_columns())
+        .outerjoin(Appointment, Invoice.appointment_id == Appointment.id)
+        .outerjoin(InvoiceCustomer, Appointment.customer_id == InvoiceCustomer.id)
+        .order_by(Invoice.id),
+        Invoice.created_date
+    ),
+    'invoice_items': lambda: (
+        select(
+            InvoiceItem.id, InvoiceItem.invoice_id, Invoice.invoice_number, InvoiceItem.service_id,
+            Service.name.label('service_name'), InvoiceItem.cost, Invoice.created_date.label('invoice_created_date')
+        )
+        .join(Invoice, InvoiceItem.invoice_id == Invoice.id)
+        .outerjoin(Service, InvoiceItem.service_id == Service.id)
+        .order_by(InvoiceItem.id),
+        Invoice.created_date
+    ),
+    'payments': lambda: (
+        select(
+            Payment.id, Payment.invoice_id, Invoice.invoice_number, Appointment.customer_id,
+            InvoiceCustomer.name.label('customer_name'), Payment.amount, Payment.payment_date,
+            Payment.payment_method, Payment.status, Payment.reference_number, Payment.notes
+        )
+        .join(Invoice, Payment.invoice_id == Invoice.id)
+        .outerjoin(Appointment, Invoice.appointment_id == Appointment.id)
+        .outerjoin(InvoiceCustomer, Appointment.customer_id == InvoiceCustomer.id)
+        .order_by(Payment.id),
+        Payment.payment_date
+    ),
+    'customers': lambda: (
+        select(Customer.id, Customer.name, Customer.email, Customer.phone, Customer.notes, Customer.created_datetime)
+        .order_by(Customer.id),
+        Customer.created_datetime
+    ),
+    'locations': lambda: (
+        select(
+            CustomerLocation.id, CustomerLocation.customer_id, Customer.name.label('customer_name'),
+            CustomerLocation.address, CustomerLocation.city, CustomerLocation.state, CustomerLocation.zip_code,
+            CustomerLocation.point_of_contact, CustomerLocation.property_type, CustomerLocation.approx_acres,
+            CustomerLocation.notes, CustomerLocation.created_at
+        )
+        .join(Customer, CustomerLocation.customer_id == Customer.id)
+        .order_by(CustomerLocation.id),
+        CustomerLocation.created_at
+    ),
+    'appointments': lambda: (
+        select(
+            Appointment.id, Appointment.customer_id, Customer.name.label('customer_name'),
+            Appointment.customer_location_id.label('location_id'), Appointment.employee_id,
+            Employee.name.label('employee_name'), Appointment.description, Appointment.arrival_datetime,
+            Appointment.departure_datetime, Appointment.status, Appointment.team, Appointment.notes
+        )
+        .outerjoin(Customer, Appointment.customer_id == Customer.id)
+        .outerjoin(Employee, Appointment.employee_id == Employee.id)
+        .order_by(Appointment.id),
+        Appointment.arrival_datetime
+    ),
+    'timelogs': lambda: (
+        select(
+            TimeLog.id, TimeLog.appointment_id, TimeLog.employee_id, Employee.name.label('employee_name'),
+            TimeLog.time_in, TimeLog.time_out, TimeLog.total_time
+        )
+        .outerjoin(Employee, TimeLog.employee_id == Employee.id)
+        .order_by(TimeLog.id),
+        TimeLog.time_in
+    ),
+}
+
+FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
+
+
+def _parse_bound(value, end=False):
+    """A date or datetime query value; a bare end date covers that whole day."""
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        return parsed + timedelta(days=1), True
+    return parsed, False
+
+
+@export_bp.route('/<entity>', methods=['GET'])
+@admin_required
+@swag_from('EXPORT_GET')
+def export(entity):
+    if entity not in EXPORTS:
+        return jsonify({'msg': f"Unknown export '{entity}', expected one of: {', '.join(sorted(EXPORTS))}"}), 404
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in FORMATS:
+        return jsonify({'msg': 'format must be csv or ndjson'}), 400
+
+    stmt, date_column = EXPORTS[entity]()
+    try:
+        if request.args.get('start_date'):
+            start, _ = _parse_bound(request.args['start_date'])
+            stmt = stmt.where(date_column >= start)
+        if request.args.get('end_date'):
+            end, exclusive = _parse_bound(request.args['end_date'], end=True)
+            stmt = stmt.where(date_column < end if exclusive else date_column <= end)
+    except ValueError:
+        return jsonify({'msg': 'Invalid start_date/end_date, use ISO format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)'}), 400
+
+    iterate, mimetype = FORMATS[export_format]
+    filename = f"{entity}-{date.today().isoformat()}.{export_format}"
+    return Response(
+        stream_with_context(iterate(stmt)),
+        status=200,
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
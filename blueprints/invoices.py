@@ -1,60 +1,40 @@
 # blueprints/invoices.py
 from flask import Blueprint, request, jsonify
 from blueprints.auth import employee_required, lead_required, admin_required
-from models import db, Invoice, InvoiceItem, Appointment, CustomerLocation, Customer, Service
+from models import db, Invoice, InvoiceItem, Appointment, CustomerLocation, Customer, Service, Payment
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.serializers import model_serializer
+from blueprints.payments import payment_to_dict
 from datetime import datetime, date, timedelta
-from flasgger import swag_from
-from utils.swagger_docs import (
-    INVOICES_GET,
-    INVOICES_POST,
-    INVOICES_INVOICE_ID_GET,
-    INVOICES_INVOICE_ID_PUT,
-    INVOICES_INVOICE_ID_DELETE,
-    INVOICES_INVOICE_ID_POST,
-    INVOICES_ITEM_ID_PUT,
-    INVOICES_ITEM_ID_DELETE
-)
+from utils.docs import swag_from
 
 invoices_bp = Blueprint('invoices', __name__)
 
-def invoice_to_dict(inv):
-    return {
-        'id': inv.id,
-        'appointment_id': inv.appointment_id,
-        'subtotal': inv.subtotal,
-        'total': inv.total,
-        'tax_rate': inv.tax_rate,
-        'paid': inv.paid,
-        'attempt': inv.attempt,
-        'due_date': inv.due_date.isoformat(),
-        'created_date': inv.created_date.isoformat()
-    }
+invoice_to_dict = model_serializer(Invoice, (
+    'id', 'appointment_id', 'subtotal', 'total', 'tax_rate', 'paid', 'attempt', 'due_date', 'created_date'
+))
 
-def invoice_item_to_dict(item):
-    return {
-        'id': item.id,
-        'invoice_id': item.invoice_id,
-        'service': item.service,
-        'cost': item.cost
-    }
+invoice_item_to_dict = model_serializer(InvoiceItem, ('id', 'invoice_id', 'service_id', 'cost'))
 
 # Invoice Endpoints
 @invoices_bp.route('/', methods=['GET'])
-@swag_from(INVOICES_GET)
+@swag_from('INVOICES_GET')
 @employee_required
+@cached_response(Invoice, Appointment)
 def get_invoices():
     customer_id = request.args.get('customer_id', type=int)
     
-    # If customer_id is provided, filter by customer
+    query = Invoice.query
+    # If customer_id is provided, filter by the appointment's customer
     if customer_id:
-        invoices = Invoice.query.filter_by(customer_id=customer_id).all()
-    else:
-        invoices = Invoice.query.all()
+        query = query.join(Appointment, Invoice.appointment_id == Appointment.id).filter(Appointment.customer_id == customer_id)
         
-    return jsonify([invoice_to_dict(inv) for inv in invoices]), 200
+    return list_response(query, invoice_to_dict, sort_column=Invoice.due_date)
 
 @invoices_bp.route('/', methods=['POST'])
-@swag_from(INVOICES_POST)
+@swag_from('INVOICES_POST')
 @lead_required
 def create_invoice():
     data = request.get_json() or {}
@@ -78,14 +58,14 @@ def create_invoice():
         return jsonify({'msg': str(e)}), 400
 
 @invoices_bp.route('/<int:invoice_id>', methods=['GET'])
-@swag_from(INVOICES_INVOICE_ID_GET)
+@swag_from('INVOICES_INVOICE_ID_GET')
 @employee_required
+@cached_response(Invoice)
 def get_invoice(invoice_id):
-    invoice = Invoice.query.get_or_404(invoice_id)
-    return jsonify(invoice_to_dict(invoice)), 200
+    return detail_response(Invoice, invoice_id, invoice_to_dict)
 
 @invoices_bp.route('/<int:invoice_id>', methods=['PUT'])
-@swag_from(INVOICES_INVOICE_ID_PUT)
+@swag_from('INVOICES_INVOICE_ID_PUT')
 @lead_required
 def update_invoice(invoice_id):
     invoice = Invoice.query.get_or_404(invoice_id)
@@ -104,7 +84,7 @@ def update_invoice(invoice_id):
         return jsonify({'msg': str(e)}), 400
 
 @invoices_bp.route('/<int:invoice_id>', methods=['DELETE'])
-@swag_from(INVOICES_INVOICE_ID_DELETE)
+@swag_from('INVOICES_INVOICE_ID_DELETE')
 @admin_required
 def delete_invoice(invoice_id):
     invoice = Invoice.query.get_or_404(invoice_id)
@@ -114,14 +94,15 @@ def delete_invoice(invoice_id):
 
 # Invoice Items Endpoints
 @invoices_bp.route('/<int:invoice_id>/items', methods=['GET'])
-@swag_from(INVOICES_INVOICE_ID_GET)
+@swag_from('INVOICES_INVOICE_ID_GET')
 @lead_required
+@cached_response(Invoice, InvoiceItem, Service)
 def get_invoice_items(invoice_id):
     invoice = Invoice.query.get_or_404(invoice_id)
     return jsonify([invoice_item_to_dict(item) for item in invoice.items]), 200
 
 @invoices_bp.route('/<int:invoice_id>/items', methods=['POST'])
-@swag_from(INVOICES_INVOICE_ID_POST)
+@swag_from('INVOICES_INVOICE_ID_POST')
 @lead_required
 def create_invoice_item(invoice_id):
     invoice = Invoice.query.get_or_404(invoice_id)
@@ -139,7 +120,7 @@ def create_invoice_item(invoice_id):
         return jsonify({'msg': str(e)}), 400
 
 @invoices_bp.route('/items/<int:item_id>', methods=['PUT'])
-@swag_from(INVOICES_ITEM_ID_PUT)
+@swag_from('INVOICES_ITEM_ID_PUT')
 @lead_required
 def update_invoice_item(item_id):
     item = InvoiceItem.query.get_or_404(item_id)
@@ -152,7 +133,7 @@ def update_invoice_item(item_id):
         return jsonify({'msg': str(e)}), 400
 
 @invoices_bp.route('/items/<int:item_id>', methods=['DELETE'])
-@swag_from(INVOICES_ITEM_ID_DELETE)
+@swag_from('INVOICES_ITEM_ID_DELETE')
 @admin_required
 def delete_invoice_item(item_id):
     item = InvoiceItem.query.get_or_404(item_id)
@@ -162,7 +143,7 @@ def delete_invoice_item(item_id):
 
 # Add endpoint to generate invoice from appointment
 @invoices_bp.route('/from-appointment/<int:appointment_id>', methods=['POST'])
-@swag_from(INVOICES_POST)
+@swag_from('INVOICES_POST')
 @lead_required
 def generate_invoice_from_appointment(appointment_id):
     try:
@@ -238,27 +219,9 @@ def generate_invoice_from_appointment(appointment_id):
 
 # Add endpoint to get payments for an invoice
 @invoices_bp.route('/<int:invoice_id>/payments', methods=['GET'])
-@swag_from(INVOICES_INVOICE_ID_GET)
+@swag_from('INVOICES_INVOICE_ID_GET')
 @employee_required
+@cached_response(Invoice, Payment)
 def get_invoice_payments(invoice_id):
-    invoice = Invoice.query.get_or_404(invoice_id)
-    
-    # Import the Payment model and get related payments
-    from models import Payment
-    payments = Payment.query.filter_by(invoice_id=invoice_id).all()
-    
-    # Define payment_to_dict function if not already defined
-    def payment_to_dict(payment):
-        return {
-            'id': payment.id,
-            'invoice_id': payment.invoice_id,
-            'amount': payment.amount,
-            'payment_date': payment.payment_date.isoformat(),
-            'payment_method': payment.payment_method,
-            'reference_number': payment.reference_number,
-            'notes': payment.notes,
-            'created_at': payment.created_at.isoformat() if payment.created_at else None,
-            'updated_at': payment.updated_at.isoformat() if payment.updated_at else None
-        }
-    
-    return jsonify([payment_to_dict(payment) for payment in payments]), 200
+    Invoice.query.get_or_404(invoice_id)
+    return list_response(Payment.query.filter_by(invoice_id=invoice_id), payment_to_dict)
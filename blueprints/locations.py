@@ -2,52 +2,40 @@
 from flask import Blueprint, request, jsonify
 from blueprints.auth import employee_required, lead_required, admin_required
 from models import db, Customer, CustomerLocation
-from flasgger import swag_from
-from utils.swagger_docs import (
-    LOCATION_LIST, LOCATION_CREATE, LOCATION_GET, 
-    LOCATION_UPDATE, LOCATION_DELETE
-)
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.bulk import BulkError, RowError, bulk_items, bulk_create_response, lookup, referenced_ids, row_id
+from utils.serializers import model_serializer
+from utils.docs import swag_from
 
 locations_bp = Blueprint('locations', __name__)
 
-def location_to_dict(loc):
-    if not loc:
-        return None
-    return {
-        'id': loc.id,
-        'customer_id': loc.customer_id,
-        'address': loc.address,
-        'city': loc.city,
-        'state': loc.state,
-        'zip_code': loc.zip_code,
-        'point_of_contact': loc.point_of_contact,
-        'property_type': loc.property_type,
-        'approx_acres': loc.approx_acres,
-        'notes': loc.notes,
-        'created_at': loc.created_at.isoformat() if loc.created_at else None,
-        'updated_at': loc.updated_at.isoformat() if loc.updated_at else None
-    }
+location_to_dict = model_serializer(CustomerLocation, (
+    'id', 'customer_id', 'address', 'city', 'state', 'zip_code', 'point_of_contact', 'property_type',
+    'approx_acres', 'notes', 'created_at', 'updated_at'
+))
 
 @locations_bp.route('/', methods=['GET'])
 @employee_required
-@swag_from(LOCATION_LIST)
+@swag_from('LOCATION_LIST')
+@cached_response(CustomerLocation)
 def get_all_locations():
     """Get all locations"""
-    locations = CustomerLocation.query.all()
-    return jsonify([location_to_dict(loc) for loc in locations]), 200
+    return list_response(CustomerLocation.query, location_to_dict)
 
 @locations_bp.route('/customer/<int:customer_id>', methods=['GET'])
 @employee_required
-@swag_from(LOCATION_LIST)
+@swag_from('LOCATION_LIST')
+@cached_response(Customer, CustomerLocation)
 def get_customer_locations(customer_id):
     """Get all locations for a customer"""
     customer = Customer.query.get_or_404(customer_id)
-    locations = CustomerLocation.query.filter_by(customer_id=customer_id).all()
-    return jsonify([location_to_dict(loc) for loc in locations]), 200
+    return list_response(CustomerLocation.query.filter_by(customer_id=customer_id), location_to_dict)
 
 @locations_bp.route('/', methods=['POST'])
 @lead_required
-@swag_from(LOCATION_CREATE)
+@swag_from('LOCATION_CREATE')
 def create_location():
     """Create a new location for a customer"""
     data = request.get_json() or {}
@@ -82,17 +70,51 @@ def create_location():
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+@locations_bp.route('/bulk', methods=['POST'])
+@lead_required
+@swag_from('LOCATION_BULK_CREATE')
+def bulk_create_locations():
+    """Create many locations (e.g. every site of a new client) in one transaction"""
+    try:
+        items = bulk_items()
+    except BulkError as e:
+        return jsonify({'error': str(e)}), 400
+
+    customers = lookup([], Customer.id, referenced_ids(items, 'customer_id'))
+
+    def prepare(item):
+        customer_id = row_id(item, 'customer_id')
+        if not customer_id:
+            raise RowError('Customer ID is required')
+        if not item.get('address'):
+            raise RowError('Address is required')
+        if customer_id not in customers:
+            raise RowError('Customer not found')
+        return {
+            'customer_id': customer_id,
+            'address': item['address'],
+            'city': item.get('city'),
+            'state': item.get('state'),
+            'zip_code': item.get('zip_code'),
+            'point_of_contact': item.get('point_of_contact'),
+            'property_type': item.get('property_type'),
+            'approx_acres': item.get('approx_acres'),
+            'notes': item.get('notes')
+        }
+
+    return bulk_create_response(CustomerLocation, items, prepare, location_to_dict)
+
 @locations_bp.route('/<int:location_id>', methods=['GET'])
 @employee_required
-@swag_from(LOCATION_GET)
+@swag_from('LOCATION_GET')
+@cached_response(CustomerLocation)
 def get_location(location_id):
     """Get a specific location by ID"""
-    location = CustomerLocation.query.get_or_404(location_id)
-    return jsonify(location_to_dict(location)), 200
+    return detail_response(CustomerLocation, location_id, location_to_dict)
 
 @locations_bp.route('/<int:location_id>', methods=['PUT'])
 @lead_required
-@swag_from(LOCATION_UPDATE)
+@swag_from('LOCATION_UPDATE')
 def update_location(location_id):
     """Update a location"""
     location = CustomerLocation.query.get_or_404(location_id)
@@ -124,7 +146,7 @@ def update_location(location_id):
 
 @locations_bp.route('/<int:location_id>', methods=['DELETE'])
 @admin_required
-@swag_from(LOCATION_DELETE)
+@swag_from('LOCATION_DELETE')
 def delete_location(location_id):
     """Delete a location"""
     try:
@@ -2,32 +2,22 @@
 from flask import Blueprint, request, jsonify
 from blueprints.auth import employee_required, lead_required, admin_required
 from models import db, Invoice, Payment
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.serializers import model_serializer
 from datetime import datetime
-from flasgger import swag_from
-from utils.swagger_docs import (
-    PAYMENTS_POST,
-    PAYMENTS_PAYMENT_ID_GET,
-    PAYMENTS_INVOICE_ID_GET,
-    PAYMENTS_PAYMENT_ID_PUT,
-    PAYMENTS_PAYMENT_ID_DELETE)
+from utils.docs import swag_from
 
 payments_bp = Blueprint('payments', __name__)
 
-def payment_to_dict(payment):
-    return {
-        'id': payment.id,
-        'invoice_id': payment.invoice_id,
-        'amount': payment.amount,
-        'payment_date': payment.payment_date.isoformat(),
-        'payment_method': payment.payment_method,
-        'reference_number': payment.reference_number,
-        'notes': payment.notes,
-        'created_at': payment.created_at.isoformat() if payment.created_at else None,
-        'updated_at': payment.updated_at.isoformat() if payment.updated_at else None
-    }
+payment_to_dict = model_serializer(Payment, (
+    'id', 'invoice_id', 'amount', 'payment_date', 'payment_method', 'reference_number', 'notes',
+    'created_at', 'updated_at'
+))
 
 @payments_bp.route('/', methods=['POST'])
-@swag_from(PAYMENTS_POST)
+@swag_from('PAYMENTS_POST')
 @lead_required
 def create_payment():
     data = request.get_json() or {}
@@ -63,26 +53,25 @@ def create_payment():
         return jsonify({'msg': str(e)}), 400
 
 @payments_bp.route('/<int:payment_id>', methods=['GET'])
-@swag_from(PAYMENTS_PAYMENT_ID_GET)
+@swag_from('PAYMENTS_PAYMENT_ID_GET')
 @employee_required
+@cached_response(Payment)
 def get_payment(payment_id):
-    payment = Payment.query.get_or_404(payment_id)
-    return jsonify(payment_to_dict(payment)), 200
+    return detail_response(Payment, payment_id, payment_to_dict)
 
 @payments_bp.route('/invoice/<int:invoice_id>', methods=['GET'])
-@swag_from(PAYMENTS_INVOICE_ID_GET)
+@swag_from('PAYMENTS_INVOICE_ID_GET')
 @employee_required
+@cached_response(Invoice, Payment)
 def get_payments_for_invoice(invoice_id):
     # Verify invoice exists
     invoice = Invoice.query.get_or_404(invoice_id)
     
     # Get all payments for this invoice
-    payments = Payment.query.filter_by(invoice_id=invoice_id).all()
-    
-    return jsonify([payment_to_dict(payment) for payment in payments]), 200
+    return list_response(Payment.query.filter_by(invoice_id=invoice_id), payment_to_dict)
 
 @payments_bp.route('/<int:payment_id>', methods=['PUT'])
-@swag_from(PAYMENTS_PAYMENT_ID_PUT)
+@swag_from('PAYMENTS_PAYMENT_ID_PUT')
 @lead_required
 def update_payment(payment_id):
     payment = Payment.query.get_or_404(payment_id)
@@ -126,7 +115,7 @@ def update_payment(payment_id):
         return jsonify({'msg': str(e)}), 400
 
 @payments_bp.route('/<int:payment_id>', methods=['DELETE'])
-@swag_from(PAYMENTS_PAYMENT_ID_DELETE)
+@swag_from('PAYMENTS_PAYMENT_ID_DELETE')
 @admin_required
 def delete_payment(payment_id):
     payment = Payment.query.get_or_404(payment_id)
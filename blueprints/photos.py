@@ -2,37 +2,28 @@
 from flask import Blueprint, request, jsonify
 from blueprints.auth import employee_required, lead_required
 from models import db, Photo
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.serializers import model_serializer
 from datetime import datetime
-from flasgger import swag_from
-from utils.swagger_docs import (
-    PHOTOS_GET,
-    PHOTOS_POST,
-    PHOTOS_PHOTO_ID_PUT,
-    PHOTOS_PHOTO_ID_DELETE)
+from utils.docs import swag_from
 
 photos_bp = Blueprint('photos', __name__)
 
-def photo_to_dict(photo):
-    return {
-        'id': photo.id,
-        'appointment_id': photo.appointment_id,
-        'file_path': photo.file_path,
-        'uploaded_by': photo.uploaded_by,
-        'approved_by': photo.approved_by,
-        'show_to_customer': photo.show_to_customer,
-        'show_on_website': photo.show_on_website,
-        'datetime': photo.datetime.isoformat()
-    }
+photo_to_dict = model_serializer(Photo, (
+    'id', 'appointment_id', 'file_path', 'uploaded_by', 'approved_by', 'show_to_customer', 'show_on_website',
+    'datetime'
+))
 
 @photos_bp.route('/', methods=['GET'])
-@swag_from(PHOTOS_GET)
+@swag_from('PHOTOS_GET')
 @employee_required
+@cached_response(Photo)
 def get_photos():
-    photos = Photo.query.all()
-    return jsonify([photo_to_dict(p) for p in photos]), 200
+    return list_response(Photo.query, photo_to_dict)
 
 @photos_bp.route('/', methods=['POST'])
-@swag_from(PHOTOS_POST)
+@swag_from('PHOTOS_POST')
 @employee_required
 def create_photo():
     data = request.get_json() or {}
@@ -53,7 +44,7 @@ def create_photo():
         return jsonify({'msg': str(e)}), 400
 
 @photos_bp.route('/<int:photo_id>', methods=['PUT'])
-@swag_from(PHOTOS_PHOTO_ID_PUT)
+@swag_from('PHOTOS_PHOTO_ID_PUT')
 @lead_required
 def update_photo(photo_id):
     photo = Photo.query.get_or_404(photo_id)
@@ -68,7 +59,7 @@ def update_photo(photo_id):
         return jsonify({'msg': str(e)}), 400
 
 @photos_bp.route('/<int:photo_id>', methods=['DELETE'])
-@swag_from(PHOTOS_PHOTO_ID_DELETE)
+@swag_from('PHOTOS_PHOTO_ID_DELETE')
 @lead_required
 def delete_photo(photo_id):
     photo = Photo.query.get_or_404(photo_id)
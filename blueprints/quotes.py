@@ -2,47 +2,29 @@
 from flask import Blueprint, request, jsonify
 from blueprints.auth import employee_required, admin_required, lead_required
 from models import db, Quote, QuoteItem, Appointment, Employee, Customer, CustomerLocation
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.fields import detail_response
+from utils.serializers import model_serializer
 from datetime import datetime, timedelta
-from flasgger import swag_from
-from utils.swagger_docs import (
-    QUOTES_GET,
-    QUOTES_POST,
-    QUOTES_QUOTE_ID_GET,
-    QUOTES_QUOTE_ID_PUT,
-    QUOTES_QUOTE_ID_DELETE,
-    QUOTES_QUOTE_ID_POST,
-    QUOTES_ITEM_ID_PUT,
-    QUOTES_ITEM_ID_DELETE)
+from utils.docs import swag_from
 
 quotes_bp = Blueprint('quotes', __name__)
 
-def quote_to_dict(quote):
-    return {
-        'id': quote.id,
-        'appointment_id': quote.appointment_id,
-        'estimate': quote.estimate,
-        'employee_id': quote.employee_id,
-        'created_date': quote.created_date.isoformat()
-    }
+quote_to_dict = model_serializer(Quote, ('id', 'appointment_id', 'estimate', 'employee_id', 'created_date'))
 
-def quote_item_to_dict(qs):
-    return {
-        'id': qs.id,
-        'quote_id': qs.quote_id,
-        'service_id': qs.service_id,
-        'cost': qs.cost
-    }
+quote_item_to_dict = model_serializer(QuoteItem, ('id', 'quote_id', 'service_id', 'cost'))
 
 # Quote Endpoints
 @quotes_bp.route('/', methods=['GET'])
-@swag_from(QUOTES_GET)
+@swag_from('QUOTES_GET')
 @employee_required
+@cached_response(Quote)
 def get_quotes():
-    quotes = Quote.query.all()
-    return jsonify([quote_to_dict(q) for q in quotes]), 200
+    return list_response(Quote.query, quote_to_dict)
 
 @quotes_bp.route('/', methods=['POST'])
-@swag_from(QUOTES_POST)
+@swag_from('QUOTES_POST')
 @lead_required
 def create_quote():
     data = request.get_json() or {}
@@ -77,14 +59,14 @@ def create_quote():
         return jsonify({'msg': str(e)}), 400
 
 @quotes_bp.route('/<int:quote_id>', methods=['GET'])
-@swag_from(QUOTES_QUOTE_ID_GET)
+@swag_from('QUOTES_QUOTE_ID_GET')
 @employee_required
+@cached_response(Quote)
 def get_quote(quote_id):
-    quote = Quote.query.get_or_404(quote_id)
-    return jsonify(quote_to_dict(quote)), 200
+    return detail_response(Quote, quote_id, quote_to_dict)
 
 @quotes_bp.route('/<int:quote_id>', methods=['PUT'])
-@swag_from(QUOTES_QUOTE_ID_PUT)
+@swag_from('QUOTES_QUOTE_ID_PUT')
 @lead_required
 def update_quote(quote_id):
     quote = Quote.query.get_or_404(quote_id)
@@ -97,7 +79,7 @@ def update_quote(quote_id):
         return jsonify({'msg': str(e)}), 400
 
 @quotes_bp.route('/<int:quote_id>', methods=['DELETE'])
-@swag_from(QUOTES_QUOTE_ID_DELETE)
+@swag_from('QUOTES_QUOTE_ID_DELETE')
 @admin_required
 def delete_quote(quote_id):
     quote = Quote.query.get_or_404(quote_id)
@@ -107,14 +89,15 @@ def delete_quote(quote_id):
 
 # Quote Items Endpoints
 @quotes_bp.route('/<int:quote_id>/items', methods=['GET'])
-@swag_from(QUOTES_QUOTE_ID_GET)
+@swag_from('QUOTES_QUOTE_ID_GET')
 @employee_required
+@cached_response(Quote, QuoteItem)
 def get_quote_items(quote_id):
     quote = Quote.query.get_or_404(quote_id)
     return jsonify([quote_item_to_dict(item) for item in quote.items]), 200
 
 @quotes_bp.route('/<int:quote_id>/services', methods=['POST'])
-@swag_from(QUOTES_QUOTE_ID_POST)
+@swag_from('QUOTES_QUOTE_ID_POST')
 @lead_required
 def create_quote_service(quote_id):
     quote = Quote.query.get_or_404(quote_id)
@@ -132,7 +115,7 @@ def create_quote_service(quote_id):
         return jsonify({'msg': str(e)}), 400
 
 @quotes_bp.route('/items/<int:item_id>', methods=['PUT'])
-@swag_from(QUOTES_ITEM_ID_PUT)
+@swag_from('QUOTES_ITEM_ID_PUT')
 @lead_required
 def update_quote_item(item_id):
     item = QuoteItem.query.get_or_404(item_id)
@@ -145,7 +128,7 @@ def update_quote_item(item_id):
         return jsonify({'msg': str(e)}), 400
 
 @quotes_bp.route('/item/<int:item_id>', methods=['DELETE'])
-@swag_from(QUOTES_ITEM_ID_DELETE)
+@swag_from('QUOTES_ITEM_ID_DELETE')
 @admin_required
 def delete_quote_service(item_id):
     item = QuoteItem.query.get_or_404(item_id)
@@ -2,36 +2,27 @@
 from flask import Blueprint, request, jsonify
 from blueprints.auth import employee_required, admin_required
 from models import db, Review
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.serializers import model_serializer
 from datetime import datetime
-from flasgger import swag_from
-from utils.swagger_docs import (
-    REVIEWS_GET,
-    REVIEWS_POST,
-    REVIEWS_REVIEW_ID_PUT,
-    REVIEWS_REVIEW_ID_DELETE)
+from utils.docs import swag_from
 
 reviews_bp = Blueprint('reviews', __name__)
 
-def review_to_dict(review):
-    return {
-        'id': review.id,
-        'customer_id': review.customer_id,
-        'location_id': review.location_id,
-        'appointment_id': review.appointment_id,
-        'rating': review.rating,
-        'comment': review.comment,
-        'datetime': review.datetime.isoformat()
-    }
+review_to_dict = model_serializer(Review, (
+    'id', 'customer_id', 'location_id', 'appointment_id', 'rating', 'comment', 'datetime'
+))
 
 @reviews_bp.route('/', methods=['GET'])
-@swag_from(REVIEWS_GET)
+@swag_from('REVIEWS_GET')
 @employee_required
+@cached_response(Review)
 def get_reviews():
-    reviews = Review.query.all()
-    return jsonify([review_to_dict(r) for r in reviews]), 200
+    return list_response(Review.query, review_to_dict)
 
 @reviews_bp.route('/', methods=['POST'])
-@swag_from(REVIEWS_POST)
+@swag_from('REVIEWS_POST')
 @admin_required
 def create_review():
     data = request.get_json() or {}
@@ -51,7 +42,7 @@ def create_review():
         return jsonify({'msg': str(e)}), 400
 
 @reviews_bp.route('/<int:review_id>', methods=['PUT'])
-@swag_from(REVIEWS_REVIEW_ID_PUT)
+@swag_from('REVIEWS_REVIEW_ID_PUT')
 @admin_required
 def update_review(review_id):
     review = Review.query.get_or_404(review_id)
@@ -65,7 +56,7 @@ def update_review(review_id):
         return jsonify({'msg': str(e)}), 400
 
 @reviews_bp.route('/<int:review_id>', methods=['DELETE'])
-@swag_from(REVIEWS_REVIEW_ID_DELETE)
+@swag_from('REVIEWS_REVIEW_ID_DELETE')
 @admin_required
 def delete_review(review_id):
     review = Review.query.get_or_404(review_id)
@@ -3,34 +3,24 @@ from flask import Blueprint, request, jsonify
 from models import db, TimeLog
 from datetime import datetime
 from blueprints.auth import employee_required
-from flasgger import swag_from
-from utils.swagger_docs import (
-    TIMELOGS_GET,
-    TIMELOGS_POST,
-    TIMELOGS_LOG_ID_PUT,
-    TIMELOGS_LOG_ID_DELETE)
+from utils.pagination import list_response
+from utils.cache import cached_response
+from utils.serializers import model_serializer
+from utils.docs import swag_from
 
 timelogs_bp = Blueprint('timelogs', __name__)
 
-def timelog_to_dict(tl):
-    return {
-        'id': tl.id,
-        'appointment_id': tl.appointment_id,
-        'employee_id': tl.employee_id,
-        'time_in': tl.time_in.isoformat(),
-        'time_out': tl.time_out.isoformat() if tl.time_out else None,
-        'total_time': tl.total_time
-    }
+timelog_to_dict = model_serializer(TimeLog, ('id', 'appointment_id', 'employee_id', 'time_in', 'time_out', 'total_time'))
 
 @timelogs_bp.route('/', methods=['GET'])
-@swag_from(TIMELOGS_GET)
+@swag_from('TIMELOGS_GET')
 @employee_required
+@cached_response(TimeLog)
 def get_timelogs():
-    logs = TimeLog.query.all()
-    return jsonify([timelog_to_dict(log) for log in logs]), 200
+    return list_response(TimeLog.query, timelog_to_dict, sort_column=TimeLog.time_in)
 
 @timelogs_bp.route('/', methods=['POST'])
-@swag_from(TIMELOGS_POST)
+@swag_from('TIMELOGS_POST')
 @employee_required
 def create_timelog():
     data = request.get_json() or {}
@@ -47,7 +37,7 @@ def create_timelog():
         return jsonify({'msg': str(e)}), 400
 
 @timelogs_bp.route('/<int:log_id>', methods=['PUT'])
-@swag_from(TIMELOGS_LOG_ID_PUT)
+@swag_from('TIMELOGS_LOG_ID_PUT')
 @employee_required
 def update_timelog(log_id):
     log = TimeLog.query.get_or_404(log_id)
@@ -64,7 +54,7 @@ def update_timelog(log_id):
         return jsonify({'msg': str(e)}), 400
 
 @timelogs_bp.route('/<int:log_id>', methods=['DELETE'])
-@swag_from(TIMELOGS_LOG_ID_DELETE)
+@swag_from('TIMELOGS_LOG_ID_DELETE')
 @employee_required
 def delete_timelog(log_id):
     log = TimeLog.query.get_or_404(log_id)
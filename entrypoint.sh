@@ -12,10 +12,14 @@ while ! pg_isready -h ${DB_HOST:-192.168.2.7} -p ${DB_PORT:-5432} -U ${DB_USER:-
 done
 echo "PostgreSQL is ready!"
 
-# Run database migrations
+# Run database migrations (the baseline revision creates a fresh database's tables)
 echo "Running database migrations..."
 flask db upgrade
 
+# Compile the OpenAPI spec once instead of generating it in every worker
+echo "Compiling API spec..."
+python manage.py build-apispec
+
 # Start the application with secure configuration
 echo "Starting application with secure configuration..."
 if [ "$FLASK_ENV" = "development" ]; then
@@ -2,16 +2,23 @@
 Gunicorn configuration to mitigate security vulnerabilities
 """
 import multiprocessing
+import os
+import shutil
+import tempfile
 
 # Bind to localhost only to prevent external access
 bind = "0.0.0.0:5000"
 
 # Number of worker processes for handling requests
-workers = multiprocessing.cpu_count() + 1
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() + 1))
 
 # Set worker class to sync to prevent possible timing-based request smuggling
 worker_class = "sync"
 
+# Import and create the app once in the master so workers (including the ones
+# recycled by max_requests) start by forking instead of booting the app
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
 # Set maximum requests per worker to prevent memory leaks
 max_requests = 100
 max_requests_jitter = 50
@@ -25,4 +32,33 @@ limit_request_fields = 100
 limit_request_field_size = 8190
 
 # Disable Werkzeug debugger in production
-reload = False 
\ No newline at end of file
+reload = False 
+
+# Prometheus metrics are aggregated across workers through files in this
+# directory; it must be set before the app imports prometheus_client
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "dolg-prometheus"))
+
+
+def on_starting(server):
+    # Start every master process with empty metrics
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with the workers
+    if not server.cfg.preload_app:
+        return
+    from models import db
+    from utils.db_pool import pool_stats
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    pool_stats.reset()
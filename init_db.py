@@ -2,7 +2,7 @@
 # init_db.py
 from app import create_app
 from models import db, Employee
-from werkzeug.security import generate_password_hash
+from utils.passwords import hash_password
 import hashlib
 
 
@@ -23,7 +23,7 @@ with app.app_context():
         employee = Employee(
             name="admin",
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=hash_password(password),
             role="admin"
         )
         db.session.add(employee)
@@ -31,7 +31,7 @@ with app.app_context():
         print(f"Created employee account for {email}")
     else:
         print("Updating employee account...")
-        existing_employee.password_hash = generate_password_hash(password)  
+        existing_employee.password_hash = hash_password(password)  
         existing_employee.role = "admin"
         existing_employee.name = "admin"
         existing_employee.email = "admin@example.com"
@@ -1,13 +1,88 @@
 #!/usr/bin/env python
 
+import os
+import sys
+import click
+from flask import current_app
 from flask.cli import FlaskGroup
 from app import create_app
 from models import db
 from flask_migrate import Migrate
+from utils.docs import write_apispec, diff_apispec
+from utils.csv_import import CsvImportError, import_customers
+from utils.revocation import prune_expired
 
 app = create_app()
 migrate = Migrate(app, db)
 cli = FlaskGroup(create_app=create_app)
 
+
+@cli.command('build-apispec')
+def build_apispec():
+    """Compile the OpenAPI spec served at /api/apispec.json to APISPEC_FILE."""
+    path = write_apispec(current_app)
+    print(f'Wrote {path}')
+
+
+@cli.command('check-apispec')
+def check_apispec():
+    """Fail if APISPEC_FILE no longer matches the routes."""
+    problems = diff_apispec(current_app)
+    if problems:
+        for problem in problems:
+            print(problem)
+        print('The compiled API spec is out of date; run "python manage.py build-apispec"')
+        sys.exit(1)
+    print('The compiled API spec matches the routes')
+
+
+@cli.command('generate-data')
+@click.option('--scale', type=float, default=1.0, show_default=True,
+              help='1.0 is about 5M rows (10k customers, 500k appointments)')
+def generate_data(scale):
+    """Load a synthetic, referentially consistent dataset into the database."""
+    if os.getenv('FLASK_ENV', 'production') == 'production':
+        print('Refusing to generate data with FLASK_ENV=production; use a scratch database')
+        sys.exit(1)
+    # Imported here so the app and its other commands never load the benchmark code
+    from benchmarks.dataset import generate, scaled_counts
+
+    def progress(table_name, rows, seconds):
+        print(f'{table_name:<24} {rows:>10} rows {seconds:>8.1f} s')
+
+    counts = scaled_counts(scale)
+    loaded = generate(db.engine, counts, progress=progress)
+    print(f'Loaded {sum(loaded.values())} rows')
+
+
+@cli.command('import-customers')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', type=int, default=1000, show_default=True, help='rows committed per transaction')
+def import_customers_command(path, chunk_size):
+    """Import customers and their locations from a CSV file, deduplicated on email."""
+    def progress(report):
+        print(f'{report.rows:>10} rows  {report.customers_created:>8} customers  '
+              f'{report.locations_created:>8} locations  {report.failed_rows:>6} failed')
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        try:
+            report = import_customers(f, chunk_size=chunk_size, progress=progress)
+        except CsvImportError as e:
+            print(e)
+            sys.exit(1)
+    summary = report.as_dict()
+    for error in summary['errors']:
+        print(f"line {error['line']}: {error['error']}")
+    print(f"Imported {summary['rows']} rows: {summary['customers_created']} new customers, "
+          f"{summary['customers_matched']} existing, {summary['locations_created']} locations "
+          f"({summary['locations_skipped']} already known), {summary['failed_rows']} failed")
+
+
+@cli.command('prune-revoked-tokens')
+def prune_revoked_tokens():
+    """Delete revoked tokens that have expired anyway."""
+    print(f'Deleted {prune_expired()} expired revoked tokens')
+
+
 if __name__ == '__main__':
-    cli() 
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""baseline schema: the tables that predate the other migrations
+
+Revision ID: 0e5b8a2f6c13
+Revises: 
+Create Date: 2026-10-16 07:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0e5b8a2f6c13'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # These tables used to come only from "flask create-tables" (db.create_all).
+    # if_not_exists keeps this a no-op on databases that were set up that way;
+    # the indexes and later tables come from the revisions after this one.
+    op.create_table(
+        'customers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('phone', sa.String(length=20)),
+        sa.Column('email', sa.String(length=128), nullable=False),
+        sa.Column('password_hash', sa.String(length=128)),
+        sa.Column('notes', sa.Text()),
+        sa.Column('created_datetime', sa.DateTime()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'employees',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('phone', sa.String(length=20)),
+        sa.Column('email', sa.String(length=128), nullable=False),
+        sa.Column('password_hash', sa.String(length=256), nullable=False),
+        sa.Column('team', sa.String(length=128)),
+        sa.Column('role', sa.String(length=64)),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'equipment_categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'services',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'consumables',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('manufacturer', sa.String(length=128)),
+        sa.Column('model', sa.String(length=128)),
+        sa.Column('cost_per_unit', sa.Float(), nullable=False),
+        sa.Column('unit_of_measure', sa.String(length=32), nullable=False),
+        sa.Column('purchased_by', sa.Integer()),
+        sa.Column('purchased_date', sa.DateTime()),
+        sa.ForeignKeyConstraint(['purchased_by'], ['employees.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'customer_locations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('address', sa.String(length=256)),
+        sa.Column('point_of_contact', sa.String(length=128)),
+        sa.Column('property_type', sa.String(length=64)),
+        sa.Column('approx_acres', sa.Float()),
+        sa.Column('city', sa.String(length=128)),
+        sa.Column('state', sa.String(length=64)),
+        sa.Column('zip_code', sa.String(length=20)),
+        sa.Column('notes', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'equipment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('purchased_date', sa.Date()),
+        sa.Column('purchased_condition', sa.String(length=32)),
+        sa.Column('warranty_expiration_date', sa.Date()),
+        sa.Column('manufacturer', sa.String(length=128)),
+        sa.Column('model', sa.String(length=128)),
+        sa.Column('equipment_category_id', sa.Integer()),
+        sa.Column('purchase_price', sa.Float()),
+        sa.Column('repair_cost_to_date', sa.Float()),
+        sa.Column('purchased_by', sa.Integer()),
+        sa.Column('created_date', sa.DateTime()),
+        sa.ForeignKeyConstraint(['equipment_category_id'], ['equipment_categories.id']),
+        sa.ForeignKeyConstraint(['purchased_by'], ['employees.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'appointments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer()),
+        sa.Column('employee_id', sa.Integer()),
+        sa.Column('customer_location_id', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(length=256)),
+        sa.Column('arrival_datetime', sa.DateTime(), nullable=False),
+        sa.Column('departure_datetime', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=64)),
+        sa.Column('team', sa.String(length=128)),
+        sa.Column('notes', sa.Text()),
+        sa.Column('created_datetime', sa.DateTime()),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.ForeignKeyConstraint(['customer_location_id'], ['customer_locations.id']),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'consumable_usage',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('equipment_id', sa.Integer(), nullable=False),
+        sa.Column('consumable_type', sa.String(length=64)),
+        sa.Column('amount_used', sa.Float()),
+        sa.Column('cost_per_liter', sa.Float()),
+        sa.Column('date_recorded', sa.Date()),
+        sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'equipment_assignments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('equipment_id', sa.Integer(), nullable=False),
+        sa.Column('team', sa.String(length=128)),
+        sa.Column('assigned_date', sa.Date()),
+        sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'recurring_appointments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_location_id', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('schedule', sa.String(length=128), nullable=False),
+        sa.Column('team', sa.String(length=128)),
+        sa.ForeignKeyConstraint(['customer_location_id'], ['customer_locations.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'invoices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('subtotal', sa.Float(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.Column('tax_rate', sa.Float(), nullable=False),
+        sa.Column('paid', sa.String(length=16), nullable=False),
+        sa.Column('attempt', sa.Integer(), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('created_date', sa.DateTime()),
+        sa.Column('amount_paid', sa.Float()),
+        sa.Column('balance', sa.Float()),
+        sa.Column('status', sa.String(length=32)),
+        sa.Column('invoice_number', sa.String(length=64)),
+        sa.Column('notes', sa.Text()),
+        sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('invoice_number'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'photos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('file_path', sa.String(length=256), nullable=False),
+        sa.Column('uploaded_by', sa.String(length=128)),
+        sa.Column('approved_by', sa.String(length=128)),
+        sa.Column('show_to_customer', sa.Boolean()),
+        sa.Column('show_on_website', sa.Boolean()),
+        sa.Column('datetime', sa.DateTime()),
+        sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'quotes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('estimate', sa.Float(), nullable=False),
+        sa.Column('employee_id', sa.Integer(), nullable=False),
+        sa.Column('notes', sa.Text()),
+        sa.Column('service_description', sa.String(length=256)),
+        sa.Column('valid_until', sa.DateTime()),
+        sa.Column('created_date', sa.DateTime()),
+        sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id']),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'reviews',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer()),
+        sa.Column('appointment_id', sa.Integer()),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('comment', sa.Text()),
+        sa.Column('datetime', sa.DateTime()),
+        sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id']),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.ForeignKeyConstraint(['location_id'], ['customer_locations.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'timelogs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('employee_id', sa.Integer(), nullable=False),
+        sa.Column('time_in', sa.DateTime(), nullable=False),
+        sa.Column('time_out', sa.DateTime()),
+        sa.Column('total_time', sa.Float()),
+        sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id']),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'invoice_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('invoice_id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('cost', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id']),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'payments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('invoice_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('payment_date', sa.DateTime(), nullable=False),
+        sa.Column('payment_method', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.String(length=32)),
+        sa.Column('reference_number', sa.String(length=64)),
+        sa.Column('notes', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'quote_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quote_id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('cost', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['quote_id'], ['quotes.id']),
+        sa.ForeignKeyConstraint(['service_id'], ['services.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('quote_items', if_exists=True)
+    op.drop_table('payments', if_exists=True)
+    op.drop_table('invoice_items', if_exists=True)
+    op.drop_table('timelogs', if_exists=True)
+    op.drop_table('reviews', if_exists=True)
+    op.drop_table('quotes', if_exists=True)
+    op.drop_table('photos', if_exists=True)
+    op.drop_table('invoices', if_exists=True)
+    op.drop_table('recurring_appointments', if_exists=True)
+    op.drop_table('equipment_assignments', if_exists=True)
+    op.drop_table('consumable_usage', if_exists=True)
+    op.drop_table('appointments', if_exists=True)
+    op.drop_table('equipment', if_exists=True)
+    op.drop_table('customer_locations', if_exists=True)
+    op.drop_table('consumables', if_exists=True)
+    op.drop_table('services', if_exists=True)
+    op.drop_table('equipment_categories', if_exists=True)
+    op.drop_table('employees', if_exists=True)
+    op.drop_table('customers', if_exists=True)
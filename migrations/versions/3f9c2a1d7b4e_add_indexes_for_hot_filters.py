@@ -0,0 +1,61 @@
+"""add indexes for hot filters and foreign keys
+
+Revision ID: 3f9c2a1d7b4e
+Revises: c41a7e9d2f08
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a1d7b4e'
+down_revision = 'c41a7e9d2f08'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - kept in step with the Index/index=True
+# declarations in models.py
+INDEXES = [
+    # get_appointments: keyset pagination, customer/status filters, date ranges
+    ('ix_appointments_arrival_datetime_id', 'appointments', ['arrival_datetime', 'id']),
+    ('ix_appointments_customer_id_arrival', 'appointments', ['customer_id', 'arrival_datetime']),
+    ('ix_appointments_status_arrival', 'appointments', ['status', 'arrival_datetime']),
+    # get_available_employees: per-employee overlap checks
+    ('ix_appointments_employee_id_window', 'appointments', ['employee_id', 'arrival_datetime', 'departure_datetime']),
+    # customer portal joins: customer -> locations -> appointments -> invoices/photos
+    ('ix_appointments_customer_location_id', 'appointments', ['customer_location_id']),
+    ('ix_customer_locations_customer_id_id', 'customer_locations', ['customer_id', 'id']),
+    ('ix_invoices_appointment_id', 'invoices', ['appointment_id']),
+    ('ix_invoices_due_date_id', 'invoices', ['due_date', 'id']),
+    ('ix_invoice_items_invoice_id', 'invoice_items', ['invoice_id']),
+    # get_payments_for_invoice / get_invoice_payments
+    ('ix_payments_invoice_id_id', 'payments', ['invoice_id', 'id']),
+    ('ix_quotes_appointment_id', 'quotes', ['appointment_id']),
+    ('ix_quote_items_quote_id', 'quote_items', ['quote_id']),
+    ('ix_timelogs_appointment_id', 'timelogs', ['appointment_id']),
+    ('ix_timelogs_employee_id_time_in', 'timelogs', ['employee_id', 'time_in']),
+    ('ix_timelogs_time_in_id', 'timelogs', ['time_in', 'id']),
+    ('ix_photos_appointment_id', 'photos', ['appointment_id']),
+    ('ix_reviews_customer_id', 'reviews', ['customer_id']),
+    ('ix_equipment_assignments_equipment_id', 'equipment_assignments', ['equipment_id']),
+    ('ix_consumable_usage_equipment_id', 'consumable_usage', ['equipment_id']),
+]
+
+
+def upgrade():
+    # Build concurrently on PostgreSQL so large tables stay writable; that
+    # has to run outside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True,
+                          postgresql_concurrently=True)
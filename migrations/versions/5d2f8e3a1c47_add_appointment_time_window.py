@@ -0,0 +1,45 @@
+"""add appointments.time_window tsrange with a GiST index
+
+Revision ID: 5d2f8e3a1c47
+Revises: 8b1e4d2c6a90
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8e3a1c47'
+down_revision = '8b1e4d2c6a90'
+branch_labels = None
+depends_on = None
+
+
+# Kept in step with APPOINTMENT_WINDOW_DDL in models.py
+ADD_COLUMN = (
+    "ALTER TABLE appointments ADD COLUMN IF NOT EXISTS time_window tsrange GENERATED ALWAYS AS "
+    "(tsrange(arrival_datetime, GREATEST(arrival_datetime, departure_datetime), '[)')) STORED"
+)
+CREATE_INDEX = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_appointments_time_window ON appointments "
+    "USING gist (time_window) WHERE employee_id IS NOT NULL AND status <> 'cancelled'"
+)
+
+
+def upgrade():
+    # tsrange and GiST are PostgreSQL features; other databases use the
+    # in-memory interval tree in utils.availability
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Adding a stored generated column rewrites the table once
+    op.execute(ADD_COLUMN)
+    with op.get_context().autocommit_block():
+        op.execute(CREATE_INDEX)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_appointments_time_window")
+    op.execute("ALTER TABLE appointments DROP COLUMN IF EXISTS time_window")
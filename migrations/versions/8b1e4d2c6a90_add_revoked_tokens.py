@@ -0,0 +1,39 @@
+"""add revoked_tokens for logout
+
+Revision ID: 8b1e4d2c6a90
+Revises: 3f9c2a1d7b4e
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4d2c6a90'
+down_revision = '3f9c2a1d7b4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: a database set up with create-tables already has it
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True),
+        sa.Column('jti', sa.String(length=64), nullable=False),
+        sa.Column('token_type', sa.String(length=16), nullable=False),
+        sa.Column('user_type', sa.String(length=16)),
+        sa.Column('identity', sa.String(length=64)),
+        sa.Column('revoked_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime()),
+        sa.UniqueConstraint('jti', name='revoked_tokens_jti_key'),
+        if_not_exists=True
+    )
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens', if_exists=True)
+    op.drop_table('revoked_tokens', if_exists=True)
@@ -0,0 +1,27 @@
+"""index lower(customers.email) for case-insensitive matching
+
+Revision ID: a4c8e2f6b0d3
+Revises: e7a3b5c9d1f2
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c8e2f6b0d3'
+down_revision = 'e7a3b5c9d1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The CSV customer import looks customers up by lower(email) (see
+    # utils.csv_import)
+    op.create_index('ix_customers_email_lower', 'customers', [sa.text('lower(email)')],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_customers_email_lower', table_name='customers', if_exists=True)
@@ -0,0 +1,30 @@
+"""stamp revoked_tokens.revoked_at with the database clock
+
+Revision ID: b6e0d4a2c8f5
+Revises: a4c8e2f6b0d3
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e0d4a2c8f5'
+down_revision = 'a4c8e2f6b0d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Revocation refreshes compare revoked_at across workers (see
+    # utils.revocation), so it comes from one clock rather than each worker's
+    with op.batch_alter_table('revoked_tokens') as batch_op:
+        batch_op.alter_column('revoked_at', existing_type=sa.DateTime(), existing_nullable=False,
+                              server_default=sa.func.now())
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_tokens') as batch_op:
+        batch_op.alter_column('revoked_at', existing_type=sa.DateTime(), existing_nullable=False,
+                              server_default=None)
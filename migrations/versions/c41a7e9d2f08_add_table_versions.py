@@ -0,0 +1,48 @@
+"""add table_versions for ETags and response cache keys
+
+Revision ID: c41a7e9d2f08
+Revises: 0e5b8a2f6c13
+Create Date: 2026-10-16 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a7e9d2f08'
+down_revision = '0e5b8a2f6c13'
+branch_labels = None
+depends_on = None
+
+
+# Tables whose writes are counted (utils.versioning); kept in step with models.py
+VERSIONED_TABLES = [
+    'employees', 'customers', 'customer_locations', 'services', 'appointments',
+    'recurring_appointments', 'invoices', 'invoice_items', 'quotes', 'quote_items',
+    'equipment_categories', 'equipment', 'consumables', 'equipment_assignments',
+    'consumable_usage', 'reviews', 'photos', 'timelogs', 'payments',
+]
+
+
+def upgrade():
+    # if_not_exists: a database set up with create-tables already has it
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=64), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        if_not_exists=True
+    )
+    # One row per table up front, so the first write bumps a row instead of
+    # racing other workers to insert it. Counters that already exist are kept.
+    for table_name in VERSIONED_TABLES:
+        op.execute(
+            sa.text(
+                "INSERT INTO table_versions (table_name, version) SELECT :table_name, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM table_versions WHERE table_name = :table_name)"
+            ).bindparams(table_name=table_name)
+        )
+
+
+def downgrade():
+    op.drop_table('table_versions', if_exists=True)
@@ -0,0 +1,26 @@
+"""index revoked_tokens.revoked_at for revocation refreshes
+
+Revision ID: e7a3b5c9d1f2
+Revises: 5d2f8e3a1c47
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b5c9d1f2'
+down_revision = '5d2f8e3a1c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Every worker re-reads the last few seconds of revocations on each
+    # refresh (see utils.revocation)
+    op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_revoked_tokens_revoked_at', table_name='revoked_tokens', if_exists=True)
@@ -1,7 +1,8 @@
 # models.py
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import hash_password, check_password
 
 db = SQLAlchemy()
 
@@ -18,11 +19,11 @@ class Employee(db.Model):
     
     def set_password(self, password):
         """Set the password hash from a plaintext password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
         
     def check_password(self, password):
         """Check if the provided password matches the stored hash"""
-        return check_password_hash(self.password_hash, password)
+        return check_password(self.password_hash, password)
 
 class Customer(db.Model):
     __tablename__ = 'customers'
@@ -35,8 +36,14 @@ class Customer(db.Model):
     created_datetime = db.Column(db.DateTime, default=datetime.datetime.now(datetime.UTC))   
     locations = db.relationship('CustomerLocation', backref='customer', lazy=True)
 
+# CSV imports match customers on their email whatever its case
+db.Index('ix_customers_email_lower', db.func.lower(Customer.email))
+
 class CustomerLocation(db.Model):  
     __tablename__ = 'customer_locations'
+    __table_args__ = (
+        db.Index('ix_customer_locations_customer_id_id', 'customer_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)  
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)  
     address = db.Column(db.String(256))  
@@ -62,45 +69,43 @@ class Service(db.Model):
 # ---------- Phase 2 Models (Scheduling/Appointments) ----------
 class Appointment(db.Model):  
     __tablename__ = 'appointments' 
+    __table_args__ = (
+        # Keyset pagination and date-range filters in get_appointments
+        db.Index('ix_appointments_arrival_datetime_id', 'arrival_datetime', 'id'),
+        db.Index('ix_appointments_customer_id_arrival', 'customer_id', 'arrival_datetime'),
+        db.Index('ix_appointments_status_arrival', 'status', 'arrival_datetime'),
+        # Per-employee conflict checks in get_available_employees
+        db.Index('ix_appointments_employee_id_window', 'employee_id', 'arrival_datetime', 'departure_datetime'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'))
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'))
-    customer_location_id = db.Column(db.Integer, db.ForeignKey('customer_locations.id'), nullable=False)
-    location_id = db.Column(db.Integer, db.ForeignKey('customer_locations.id'))  # Alias for customer_location_id
+    customer_location_id = db.Column(db.Integer, db.ForeignKey('customer_locations.id'), nullable=False, index=True)
     description = db.Column(db.String(256))
     arrival_datetime = db.Column(db.DateTime, nullable=False)
     departure_datetime = db.Column(db.DateTime, nullable=False)
-    start_time = db.Column(db.DateTime)  # Alias for arrival_datetime
-    end_time = db.Column(db.DateTime)  # Alias for departure_datetime
     status = db.Column(db.String(64), default='scheduled')
     team = db.Column(db.String(128))
     notes = db.Column(db.Text)
     created_datetime = db.Column(db.DateTime, default=datetime.datetime.now(datetime.UTC))
     location = db.relationship('CustomerLocation', foreign_keys=[customer_location_id], backref='appointments')
-    
-    @property
-    def start_time(self):
-        return self.arrival_datetime
-    
-    @start_time.setter
-    def start_time(self, value):
-        self.arrival_datetime = value
-    
-    @property
-    def end_time(self):
-        return self.departure_datetime
-    
-    @end_time.setter
-    def end_time(self, value):
-        self.departure_datetime = value
-    
-    @property
-    def location_id(self):
-        return self.customer_location_id
-    
-    @location_id.setter
-    def location_id(self, value):
-        self.customer_location_id = value
+    # Aliases that also work in queries (Appointment.start_time < end)
+    start_time = db.synonym('arrival_datetime')
+    end_time = db.synonym('departure_datetime')
+    location_id = db.synonym('customer_location_id')
+
+# PostgreSQL only: each appointment's window as a stored tsrange, with a GiST
+# index over the ones that block an employee, so utils.availability finds
+# conflicts with one && probe. Kept in step with migrations 5d2f8e3a1c47 and
+# d3a7c1e9f4b6, and with utils.availability.BLOCKING.
+APPOINTMENT_WINDOW_DDL = (
+    "ALTER TABLE appointments ADD COLUMN IF NOT EXISTS time_window tsrange GENERATED ALWAYS AS "
+    "(tsrange(arrival_datetime, GREATEST(arrival_datetime, departure_datetime), '[)')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_appointments_time_window ON appointments USING gist (time_window) "
+    "WHERE employee_id IS NOT NULL AND (status IS NULL OR status <> 'cancelled')",
+)
+for _statement in APPOINTMENT_WINDOW_DDL:
+    event.listen(Appointment.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
 
 class RecurringAppointment(db.Model):
     __tablename__ = 'recurring_appointments'
@@ -114,8 +119,11 @@ class RecurringAppointment(db.Model):
 # ---------- Phase 3 Models (Invoicing & Quotes) ----------
 class Invoice(db.Model):
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_due_date_id', 'due_date', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False, index=True)
     subtotal = db.Column(db.Float, nullable=False)
     total = db.Column(db.Float, nullable=False)
     tax_rate = db.Column(db.Float, nullable=False)
@@ -136,14 +144,14 @@ class Invoice(db.Model):
 class InvoiceItem(db.Model):
     __tablename__ = 'invoice_items'
     id = db.Column(db.Integer, primary_key=True)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False, index=True)
     service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
     cost = db.Column(db.Float, nullable=False)
 
 class Quote(db.Model):
     __tablename__ = 'quotes'
     id = db.Column(db.Integer, primary_key=True)
-    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False, index=True)
     estimate = db.Column(db.Float, nullable=False)
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=False)
     notes = db.Column(db.Text)
@@ -156,7 +164,7 @@ class Quote(db.Model):
 class QuoteItem(db.Model):
     __tablename__ = 'quote_items'
     id = db.Column(db.Integer, primary_key=True)
-    quote_id = db.Column(db.Integer, db.ForeignKey('quotes.id'), nullable=False)
+    quote_id = db.Column(db.Integer, db.ForeignKey('quotes.id'), nullable=False, index=True)
     service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
     cost = db.Column(db.Float, nullable=False)
 
@@ -202,14 +210,14 @@ class Consumable(db.Model):
 class EquipmentAssignment(db.Model):
     __tablename__ = 'equipment_assignments'
     id = db.Column(db.Integer, primary_key=True)
-    equipment_id = db.Column(db.Integer, db.ForeignKey('equipment.id'), nullable=False)
+    equipment_id = db.Column(db.Integer, db.ForeignKey('equipment.id'), nullable=False, index=True)
     team = db.Column(db.String(128))
     assigned_date = db.Column(db.Date, default=datetime.date.today)
 
 class ConsumableUsage(db.Model):
     __tablename__ = 'consumable_usage'
     id = db.Column(db.Integer, primary_key=True)
-    equipment_id = db.Column(db.Integer, db.ForeignKey('equipment.id'), nullable=False)
+    equipment_id = db.Column(db.Integer, db.ForeignKey('equipment.id'), nullable=False, index=True)
     consumable_type = db.Column(db.String(64))  # e.g., Gas, Oil, Diesel
     amount_used = db.Column(db.Float)           # in liters
     cost_per_liter = db.Column(db.Float)
@@ -219,7 +227,7 @@ class ConsumableUsage(db.Model):
 class Review(db.Model):
     __tablename__ = 'reviews'
     id = db.Column(db.Integer, primary_key=True)
-    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, index=True)
     location_id = db.Column(db.Integer, db.ForeignKey('customer_locations.id'), nullable=True)
     appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=True)
     rating = db.Column(db.Integer, nullable=False)
@@ -230,7 +238,7 @@ class Review(db.Model):
 class Photo(db.Model):
     __tablename__ = 'photos'
     id = db.Column(db.Integer, primary_key=True)
-    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False, index=True)
     file_path = db.Column(db.String(256), nullable=False)
     uploaded_by = db.Column(db.String(128))
     approved_by = db.Column(db.String(128))
@@ -241,8 +249,12 @@ class Photo(db.Model):
 # Job Time Tracking
 class TimeLog(db.Model):
     __tablename__ = 'timelogs'
+    __table_args__ = (
+        db.Index('ix_timelogs_time_in_id', 'time_in', 'id'),
+        db.Index('ix_timelogs_employee_id_time_in', 'employee_id', 'time_in'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False, index=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=False)
     time_in = db.Column(db.DateTime, nullable=False)
     time_out = db.Column(db.DateTime, nullable=True)
@@ -251,6 +263,9 @@ class TimeLog(db.Model):
 # Add Payment model
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('ix_payments_invoice_id_id', 'invoice_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False)
     amount = db.Column(db.Float, nullable=False)
@@ -260,4 +275,26 @@ class Payment(db.Model):
     reference_number = db.Column(db.String(64))
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.datetime.now(datetime.UTC))
-    updated_at = db.Column(db.DateTime, onupdate=datetime.datetime.now(datetime.UTC))
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, onupdate=datetime.datetime.now(datetime.UTC))
+
+# ---------- Cache Versioning ----------
+# One row per table, bumped in the same transaction as any write to that table.
+# Conditional GETs compare these counters instead of re-running list queries.
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+# ---------- Token Revocation ----------
+# One row per revoked JWT (logout). Every worker keeps a Bloom filter of these
+# jtis (utils.revocation) so only tokens that might be revoked hit this table.
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    jti = db.Column(db.String(64), nullable=False, unique=True)
+    token_type = db.Column(db.String(16), nullable=False)  # 'access' or 'refresh'
+    user_type = db.Column(db.String(16))  # 'employee' or 'customer'
+    identity = db.Column(db.String(64))
+    # Stamped by the database so every worker's rows share one clock; refreshes re-read recent rows
+    revoked_at = db.Column(db.DateTime, nullable=False, index=True, server_default=db.func.now())
+    expires_at = db.Column(db.DateTime, index=True)  # rows past this can be pruned
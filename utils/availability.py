@@ -0,0 +1,198 @@
+"""
+Which employees are booked during a time window.
+
+An appointment blocks its employee over ``[arrival_datetime,
+departure_datetime)``. Cancelled appointments and ones without an employee
+block nothing; one without a status blocks like a scheduled one. Back-to-back appointments do not conflict.
+
+On PostgreSQL the ``appointments.time_window`` tsrange (see
+``APPOINTMENT_WINDOW_DDL`` in models.py) has a partial GiST index over
+exactly the blocking appointments. A lookup is then one index probe with
+``time_window && tsrange(start, end)``, however many appointments have
+accumulated. A PostgreSQL database that has not been migrated yet gets the
+same answer from the arrival/departure columns.
+
+Other databases (SQLite in development and tests) use an ``IntervalTree``
+of the blocking appointments, built once per process and rebuilt when the
+``appointments`` table version moves.
+
+``Availability.grid`` answers a whole dispatch board (every employee x
+every slot of a day or week) from one range query (or one tree lookup). Each appointment becomes
+a +1/-1 pair at its first and past-last slot in a per-employee difference
+array, and a cumulative sum marks the busy slots, all in NumPy.
+"""
+import logging
+import threading
+from bisect import bisect_left
+from datetime import timedelta
+
+import numpy as np
+from sqlalchemy import func, inspect, literal, literal_column, or_, select
+from models import db, Appointment, Employee
+from utils.versioning import table_versions
+
+logger = logging.getLogger(__name__)
+
+_appointments = Appointment.__table__
+_time_window = literal_column('appointments.time_window')
+# A NULL status is not cancelled (``status != 'cancelled'`` alone is NULL for
+# it); the partial index predicate in models.py says the same
+BLOCKING = (
+    _appointments.c.employee_id.isnot(None),
+    or_(_appointments.c.status.is_(None), _appointments.c.status != 'cancelled'),
+)
+
+
+class IntervalTree:
+    """Static tree of half-open ``[start, end)`` intervals, each with a value.
+
+    Intervals are sorted by start and a complete binary tree over them keeps
+    the latest end below each node. A query visits only the subtrees that
+    can still hold an overlap, so it costs ``O(k log n)`` for ``k`` results.
+    """
+
+    def __init__(self, intervals):
+        items = sorted(intervals, key=lambda item: item[0])
+        self.starts = [item[0] for item in items]
+        self.values = [item[2] for item in items]
+        size = 1
+        while size < len(items):
+            size *= 2
+        self._size = size
+        self._max_end = [None] * (2 * size)
+        for i, item in enumerate(items):
+            self._max_end[size + i] = max(item[0], item[1])
+        for node in range(size - 1, 0, -1):
+            left, right = self._max_end[2 * node], self._max_end[2 * node + 1]
+            self._max_end[node] = left if right is None or (left is not None and left >= right) else right
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, start, end):
+        """Values of the intervals that overlap ``[start, end)``."""
+        # Only intervals starting before ``end`` can overlap; of those, the
+        # ones ending after ``start`` do
+        limit = bisect_left(self.starts, end)
+        max_end, values, size = self._max_end, self.values, self._size
+        stack = [(1, 0, size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo >= limit or max_end[node] is None or max_end[node] <= start:
+                continue
+            if node >= size:
+                yield values[lo]
+                continue
+            mid = (lo + hi) // 2
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+
+
+class Availability:
+    """Conflict lookups for one app, using the best method its database supports."""
+
+    def __init__(self):
+        self._method = None
+        self._tree = None
+        self._tree_version = None
+        self._lock = threading.Lock()
+
+    @property
+    def method(self):
+        """``tsrange``, ``columns`` or ``tree``; decided on first use."""
+        if self._method is None:
+            engine = db.engine
+            if engine.dialect.name != 'postgresql':
+                self._method = 'tree'
+            elif any(column['name'] == 'time_window' for column in inspect(engine).get_columns('appointments')):
+                self._method = 'tsrange'
+            else:
+                logger.warning('appointments.time_window is missing; run "flask db upgrade" '
+                               'for indexed availability lookups')
+                self._method = 'columns'
+        return self._method
+
+    def _current_tree(self):
+        version = table_versions(['appointments'])['appointments']
+        if self._tree is None or self._tree_version != version:
+            with self._lock:
+                if self._tree is None or self._tree_version != version:
+                    rows = db.session.execute(
+                        select(_appointments.c.arrival_datetime, _appointments.c.departure_datetime,
+                               _appointments.c.employee_id).where(*BLOCKING)
+                    ).all()
+                    # Each row (arrival, departure, employee_id) is its own value
+                    self._tree = IntervalTree((row[0], row[1], tuple(row)) for row in rows)
+                    self._tree_version = version
+        return self._tree
+
+    def _overlaps(self, start, end):
+        if self.method == 'tsrange':
+            return _time_window.op('&&')(func.tsrange(start, end, literal('[)')))
+        return (_appointments.c.arrival_datetime < end) & (_appointments.c.departure_datetime > start)
+
+    def busy_employee_ids(self, start, end):
+        """Ids of the employees with an appointment overlapping ``[start, end)``."""
+        if self.method == 'tree':
+            return {row[2] for row in self._current_tree().overlapping(start, end)}
+        return set(db.session.execute(
+            select(_appointments.c.employee_id).where(*BLOCKING, self._overlaps(start, end)).distinct()
+        ).scalars())
+
+    def available_employees(self, start, end):
+        """Employees with no appointment overlapping ``[start, end)``, by id."""
+        busy = self.busy_employee_ids(start, end)
+        employees = db.session.execute(select(Employee).order_by(Employee.id)).scalars()
+        return [employee for employee in employees if employee.id not in busy]
+
+    def grid(self, start, slots, slot_minutes):
+        """Every employee's availability over ``slots`` slots of ``slot_minutes`` from ``start``.
+
+        Returns the employees (id, name, role rows, by id) and a boolean
+        ``employees x slots`` array that is True where the employee has no
+        appointment overlapping the slot.
+        """
+        end = start + timedelta(minutes=slots * slot_minutes)
+        employees = db.session.execute(
+            select(Employee.id, Employee.name, Employee.role).order_by(Employee.id)
+        ).all()
+        if self.method == 'tree':
+            rows = list(self._current_tree().overlapping(start, end))
+        else:
+            rows = db.session.execute(
+                select(_appointments.c.arrival_datetime, _appointments.c.departure_datetime,
+                       _appointments.c.employee_id).where(*BLOCKING, self._overlaps(start, end))
+            ).all()
+        count = len(employees)
+        if not rows or not count:
+            return employees, np.ones((count, slots), dtype=bool)
+
+        ids = np.fromiter((employee.id for employee in employees), dtype=np.int64, count=count)
+        owners = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        origin, slot = np.datetime64(start, 's'), np.timedelta64(slot_minutes * 60, 's')
+        arrivals = np.array([row[0] for row in rows], dtype='datetime64[s]')
+        departures = np.array([row[1] for row in rows], dtype='datetime64[s]')
+        # A slot is busy if the appointment overlaps any of it
+        first = np.clip(np.floor((arrivals - origin) / slot), 0, slots).astype(np.int64)
+        last = np.clip(np.ceil((departures - origin) / slot), 0, slots).astype(np.int64)
+        index = np.searchsorted(ids, owners)
+        known = (index < count) & (ids[np.minimum(index, count - 1)] == owners) & (last > first)
+        index, first, last = index[known], first[known], last[known]
+
+        width = slots + 1
+        diff = (np.bincount(index * width + first, minlength=count * width)
+                - np.bincount(index * width + last, minlength=count * width)).reshape(count, width)
+        return employees, np.cumsum(diff[:, :slots], axis=1) == 0
+
+
+def bitmap_rows(free):
+    """One ``'0'``/``'1'`` string per row of a boolean grid (``'1'`` = free)."""
+    chars = np.where(free, ord('1'), ord('0')).astype(np.uint8)
+    return [row.tobytes().decode('ascii') for row in chars]
+
+
+def init_availability(app):
+    """Create this app's ``Availability``."""
+    availability = Availability()
+    app.extensions['availability'] = availability
+    return availability
@@ -0,0 +1,117 @@
+"""
+Batch variants of the create endpoints (``POST /api/<collection>/bulk``).
+
+The body is a JSON array of the objects the single-row POST accepts (or
+``{"items": [...]}``). A route turns the array into insert values with one
+``IN`` query per referenced table instead of a lookup per row, then hands
+them to ``bulk_create_response``. That inserts every valid row with a single
+multi-row ``INSERT ... RETURNING`` in one transaction and answers with a
+result per input row:
+
+    {"created": 2, "failed": 1, "results": [
+        {"index": 0, "status": "created", "item": {...}},
+        {"index": 1, "status": "error", "error": "Customer not found"}, ...]}
+
+SQLite cannot promise the order of RETURNING rows from a multi-row insert,
+so there SQLAlchemy sends the rows one at a time, still in one transaction.
+
+The status is ``201`` when every row was created, ``207`` when only some
+were, and ``400`` when none were. With ``?atomic=true`` a single invalid row
+rejects the whole batch.
+"""
+from flask import request, jsonify
+from sqlalchemy import insert, select
+from models import db
+from utils.versioning import bump_session_versions
+
+MAX_BULK_ROWS = 1000
+
+
+class BulkError(ValueError):
+    """Raised when the request body is not a usable batch."""
+
+
+class RowError(ValueError):
+    """Raised by a route's row preparation to reject that single row."""
+
+
+def bulk_items():
+    """The list of objects in the request body."""
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('items')
+    if not isinstance(data, list) or not data:
+        raise BulkError('Expected a non-empty JSON array of objects, or {"items": [...]}')
+    if len(data) > MAX_BULK_ROWS:
+        raise BulkError(f'At most {MAX_BULK_ROWS} items can be created per request')
+    return data
+
+
+def referenced_ids(items, key):
+    """The distinct integer values of ``key`` across ``items``."""
+    ids = set()
+    for item in items:
+        value = item.get(key) if isinstance(item, dict) else None
+        if isinstance(value, int) and not isinstance(value, bool):
+            ids.add(value)
+    return ids
+
+
+def row_id(item, key):
+    """``item[key]`` as an id: ``None`` when unset, ``RowError`` when not an integer."""
+    value = item.get(key)
+    if value is None:
+        return None
+    # Anything else would reach the lookup dicts (a list is not even hashable)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise RowError(f'{key} must be an integer')
+    return value
+
+
+def lookup(columns, key_column, keys):
+    """``{key: row}`` for the rows whose ``key_column`` is in ``keys``, in one query."""
+    if not keys:
+        return {}
+    rows = db.session.execute(select(key_column, *columns).where(key_column.in_(keys))).all()
+    return {row[0]: row for row in rows}
+
+
+def bulk_create_response(model, items, prepare, serializer):
+    """Insert the rows ``prepare`` accepts and report on every item.
+
+    ``prepare(item)`` returns the column values for one item (the same keys
+    for every item) or raises ``RowError``.
+    """
+    table = model.__table__
+    results = [None] * len(items)
+    values, positions = [], []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise RowError('Item must be a JSON object')
+            values.append(prepare(item))
+            positions.append(index)
+        except RowError as e:
+            results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+
+    failed = len(items) - len(values)
+    atomic = request.args.get('atomic', 'false').lower() in ('1', 'true', 'yes')
+    if values and not (atomic and failed):
+        try:
+            rows = db.session.execute(
+                insert(table).returning(*table.c, sort_by_parameter_order=True), values
+            ).all()
+            bump_session_versions(db.session, [table.name])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        for index, row in zip(positions, rows):
+            results[index] = {'index': index, 'status': 'created', 'item': serializer(row)}
+    else:
+        for index in positions:
+            results[index] = {'index': index, 'status': 'skipped', 'error': 'Batch rejected (atomic=true)'}
+
+    created = sum(1 for result in results if result['status'] == 'created')
+    status = 201 if created == len(items) else 207 if created else 400
+    return jsonify({'created': created, 'failed': len(items) - created, 'results': results}), status
@@ -0,0 +1,277 @@
+"""
+Response cache for read-heavy GET routes.
+
+Entries are keyed by the request URL *and* the ``table_versions`` counters
+of the tables the route depends on (its tags), so any commit that touches a
+tagged table moves the key and the old entry can never be served again, in
+any worker. On top of that the committing worker drops the affected entries
+from its in-process LRU and from the shared backend right after commit, to
+free the memory and disk early.
+
+Two tiers are consulted in order:
+
+* an in-process LRU bounded by entry count, total bytes and TTL;
+* an optional shared backend visible to every gunicorn worker. ``file``
+  stores entries under ``RESPONSE_CACHE_DIR``; ``local`` is a process-local
+  stand-in with the same interface, for tests and development.
+
+``RESPONSE_CACHE_BACKEND`` selects ``memory`` (LRU only, the default),
+``file``, ``local`` or ``none`` to disable caching entirely.
+"""
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, has_app_context, request, Response
+from sqlalchemy import event
+from models import db
+from utils.versioning import table_versions
+
+
+class LRUCache:
+    """Thread-safe LRU of ``key -> (tags, value)`` with TTL and size bounds."""
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024, ttl=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, tags, value, size = entry
+            if expires < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags=(), size=0):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, frozenset(tags), value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        tags = set(tags)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] & tags]
+            for key in stale:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[3]
+
+
+class LocalBackend:
+    """Process-local stand-in for a shared backend."""
+
+    def __init__(self, ttl=300):
+        self._cache = LRUCache(max_entries=4096, max_bytes=256 * 1024 * 1024, ttl=ttl)
+
+    def get(self, key, tags=()):
+        return self._cache.get(key)
+
+    def set(self, key, value, tags=()):
+        self._cache.set(key, value, tags, size=len(value[2]))
+
+    def invalidate(self, tags):
+        self._cache.invalidate(tags)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class FileBackend:
+    """Entries stored as files in a directory shared by all workers on a host.
+
+    A file is named after the entry's tags and a digest of its key
+    (``customers+customer_locations.<sha1>``), so ``invalidate`` finds the
+    entries of a table from the directory listing alone.
+    """
+
+    def __init__(self, directory, ttl=300, max_entries=4096):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, tags):
+        name = '+'.join(sorted(tags)) + '.' + hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def get(self, key, tags=()):
+        path = self._path(key, tags)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if header['expires'] < time.time():
+            return None
+        return header['status'], header['mimetype'], body
+
+    def set(self, key, value, tags=()):
+        status, mimetype, body = value
+        header = json.dumps({'expires': time.time() + self.ttl, 'status': status, 'mimetype': mimetype})
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header.encode('utf-8') + b'\n')
+            f.write(body)
+        os.replace(tmp_path, self._path(key, tags))
+        if random.random() < 0.01:
+            self.prune()
+
+    def invalidate(self, tags):
+        tags = set(tags)
+        for name in os.listdir(self.directory):
+            if not name.startswith('.tmp') and tags.intersection(name.partition('.')[0].split('+')):
+                self._remove(os.path.join(self.directory, name))
+
+    def prune(self):
+        """Remove expired entries and the oldest ones beyond ``max_entries``."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if mtime + self.ttl < now:
+                self._remove(path)
+            elif not name.startswith('.tmp'):
+                entries.append((mtime, path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            self._remove(path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ResponseCache:
+    """Two-tier (in-process LRU + shared backend) cache of GET responses."""
+
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key, tags):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key, tags)
+            if value is not None:
+                self.local.set(key, value, tags, size=len(value[2]))
+        return value
+
+    def set(self, key, value, tags):
+        self.local.set(key, value, tags, size=len(value[2]))
+        if self.shared is not None:
+            self.shared.set(key, value, tags)
+
+    def invalidate(self, tags):
+        self.local.invalidate(tags)
+        if self.shared is not None:
+            self.shared.invalidate(tags)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+def init_response_cache(app):
+    """Create the response cache described by ``app.config``."""
+    backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+    if backend == 'none':
+        app.extensions['response_cache'] = None
+        return None
+
+    ttl = app.config.get('RESPONSE_CACHE_TTL', 300)
+    local = LRUCache(
+        max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 512),
+        max_bytes=app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+        ttl=ttl
+    )
+    if backend == 'memory':
+        shared = None
+    elif backend == 'file':
+        shared = FileBackend(app.config.get('RESPONSE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'dolg-response-cache')), ttl=ttl)
+    elif backend == 'local':
+        shared = LocalBackend(ttl=ttl)
+    else:
+        raise ValueError(f'Unknown RESPONSE_CACHE_BACKEND: {backend}')
+
+    cache = ResponseCache(local, shared)
+    app.extensions['response_cache'] = cache
+    return cache
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_committed_tables(session):
+    tables = session.info.pop('touched_tables', None)
+    if tables and has_app_context():
+        cache = current_app.extensions.get('response_cache')
+        if cache is not None:
+            cache.invalidate(tables)
+
+
+def cached_response(*models):
+    """Cache a GET route's ``200`` responses, tagged by ``models``' tables."""
+    tags = tuple(sorted({model.__table__.name for model in models}))
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None or request.method != 'GET':
+                return fn(*args, **kwargs)
+
+            versions = table_versions(tags)
+            key = request.full_path + '|' + ','.join(f'{t}={versions[t]}' for t in tags)
+            hit = cache.get(key, tags)
+            if hit is not None:
+                status, mimetype, body = hit
+                return Response(body, status=status, mimetype=mimetype)
+
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, (200, response.mimetype, response.get_data()), tags)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,195 @@
+"""
+Response compression negotiated from ``Accept-Encoding``.
+
+``init_compression`` registers an ``after_request`` hook that compresses
+textual responses (JSON, text, XML) with the best encoding both sides support.
+The server's order of preference comes from ``COMPRESS_ALGORITHMS``
+(``zstd,br,gzip`` by default). ``br`` needs the ``brotli`` package and
+``zstd`` needs ``zstandard``; whichever is not installed is skipped, and
+``gzip`` always works.
+
+Bodies smaller than ``COMPRESS_MIN_SIZE`` are sent as is. Images, archives
+and ``send_file`` responses are already compressed and are never touched.
+Streamed responses (``?stream=true``) are compressed chunk by chunk, with a
+flush after each chunk so the client keeps receiving data as it is produced
+(``COMPRESS_STREAMS=false`` turns this off).
+
+A compressed body is a different representation, so its ETag gets an
+``-<encoding>`` suffix. ``etag_variants`` lets ``conditional_get`` match
+the plain form and the one for the encoding negotiated on this request, so a
+client that stops accepting an encoding is not told its copy in that encoding
+is still good.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from flask import current_app, request
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = frozenset({
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml'
+})
+
+
+class _GzipCompressor:
+    def __init__(self):
+        self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+def available_encodings():
+    """``{encoding: compressor class}`` for the encodings usable in this process."""
+    encodings = {'gzip': _GzipCompressor}
+    if brotli is not None:
+        encodings['br'] = _BrotliCompressor
+    if zstandard is not None:
+        encodings['zstd'] = _ZstdCompressor
+    return encodings
+
+
+def _preferred_encodings(config):
+    """``COMPRESS_ALGORITHMS`` in order, less the encodings not usable here."""
+    encodings = available_encodings()
+    return [
+        name.strip() for name in config.get('COMPRESS_ALGORITHMS', 'zstd,br,gzip').split(',')
+        if name.strip() in encodings
+    ]
+
+
+def negotiated_encoding():
+    """The encoding a compressible response to this request would be sent in, or ``None``."""
+    if 'compression' not in current_app.extensions or request.method == 'HEAD':
+        return None
+    return request.accept_encodings.best_match(current_app.extensions['compression'])
+
+
+def etag_variants(etag):
+    """``etag`` and its suffixed form for the encoding negotiated on this request."""
+    encoding = negotiated_encoding()
+    return [etag] if encoding is None else [etag, f'{etag}-{encoding}']
+
+
+def compress(data, encoding):
+    """Compress a whole body with ``encoding``."""
+    compressor = available_encodings()[encoding]()
+    return compressor.compress(data) + compressor.finish()
+
+
+def _compress_stream(chunks, source, compressor):
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(source, 'close'):
+            source.close()
+
+
+def _is_compressible(response):
+    mimetype = response.mimetype or ''
+    return (
+        mimetype.startswith('text/')
+        or mimetype in COMPRESSIBLE_TYPES
+        or mimetype.endswith('+json')
+        or mimetype.endswith('+xml')
+    )
+
+
+def init_compression(app):
+    """Compress ``app``'s responses according to ``COMPRESS_*`` config."""
+    encodings = available_encodings()
+    preferred = _preferred_encodings(app.config)
+    if not preferred:
+        return
+    app.extensions['compression'] = preferred
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+    compress_streams = app.config.get('COMPRESS_STREAMS', True)
+
+    @app.after_request
+    def _compress_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.cache_control.no_transform
+            or not _is_compressible(response)
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiated_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            if not compress_streams:
+                return response
+            source = response.response
+            response.response = _compress_stream(response.iter_encoded(), source, encodings[encoding]())
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            compressed = compress(body, encoding)
+            if len(compressed) >= len(body):
+                return response
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
@@ -0,0 +1,235 @@
+"""
+Streaming CSV import of customers and their locations.
+
+Each CSV row describes a customer and, when it has an address, one of their
+locations; a customer with several sites appears on several rows. Headers
+are matched loosely (``Customer Name``, ``E-mail``, ``Zip`` ...), see
+``FIELD_ALIASES``; unknown columns are ignored.
+
+The file is read with ``csv.DictReader`` straight from the upload stream
+and loaded ``chunk_size`` rows at a time, so memory use does not grow with
+the file. For each chunk, customers are matched on email with one ``IN``
+query on ``lower(email)``, so a stored address in any case is found. The
+missing ones are inserted (lowercased) in one
+statement, and their locations follow, skipping addresses the customer
+already has. Each chunk commits on its own. If the database rejects a chunk,
+it is retried row by row, so one bad row costs only itself.
+
+Used by ``POST /api/customers/import`` and ``python manage.py import-customers``.
+"""
+import csv
+import io
+import re
+
+from sqlalchemy import func, insert, select
+from models import db, Customer, CustomerLocation
+from utils.bulk import RowError, lookup
+from utils.versioning import bump_session_versions
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+CUSTOMER_FIELDS = ('name', 'email', 'phone', 'notes')
+LOCATION_FIELDS = ('address', 'city', 'state', 'zip_code', 'point_of_contact', 'property_type',
+                   'approx_acres', 'location_notes')
+
+# Normalized header -> field
+FIELD_ALIASES = {
+    'name': 'name', 'customer': 'name', 'customer_name': 'name', 'full_name': 'name', 'company': 'name',
+    'email': 'email', 'e_mail': 'email', 'email_address': 'email', 'customer_email': 'email',
+    'phone': 'phone', 'phone_number': 'phone', 'telephone': 'phone', 'customer_phone': 'phone',
+    'notes': 'notes', 'customer_notes': 'notes',
+    'address': 'address', 'street': 'address', 'street_address': 'address', 'address1': 'address',
+    'address_1': 'address', 'property_address': 'address', 'service_address': 'address',
+    'city': 'city', 'town': 'city',
+    'state': 'state', 'province': 'state', 'region': 'state',
+    'zip_code': 'zip_code', 'zip': 'zip_code', 'zipcode': 'zip_code', 'postal_code': 'zip_code',
+    'point_of_contact': 'point_of_contact', 'contact': 'point_of_contact', 'site_contact': 'point_of_contact',
+    'property_type': 'property_type', 'type': 'property_type',
+    'approx_acres': 'approx_acres', 'acres': 'approx_acres', 'acreage': 'approx_acres',
+    'location_notes': 'location_notes', 'property_notes': 'location_notes', 'site_notes': 'location_notes',
+}
+
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+class CsvImportError(ValueError):
+    """Raised when the file as a whole cannot be imported (e.g. no email column)."""
+
+
+def _normalize_header(header):
+    return re.sub(r'[^a-z0-9]+', '_', (header or '').strip().lower()).strip('_')
+
+
+def _address_key(address):
+    return ' '.join(address.lower().split())
+
+
+def text_stream(binary, encoding='utf-8-sig'):
+    """Wrap a binary upload stream for ``csv``; a BOM from Excel is dropped."""
+    return io.TextIOWrapper(binary, encoding=encoding, newline='')
+
+
+def _parse_row(raw, columns):
+    fields = {}
+    for header, field in columns.items():
+        value = (raw.get(header) or '').strip()
+        if value and not fields.get(field):
+            fields[field] = value
+    given = fields.get('email', '')
+    if not given:
+        raise RowError('Email is required')
+    if not _EMAIL.fullmatch(given):
+        raise RowError(f'Invalid email: {given}')
+    # Stored lowercased, and matched against existing rows whatever their case
+    fields['email'] = given.lower()
+    if fields.get('approx_acres'):
+        try:
+            fields['approx_acres'] = float(fields['approx_acres'].replace(',', ''))
+        except ValueError:
+            raise RowError(f"Invalid approx_acres: {fields['approx_acres']}")
+    return fields
+
+
+class ImportReport:
+    """Running totals of an import; ``as_dict()`` is what the endpoint returns."""
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.customers_created = 0
+        self.customers_matched = 0
+        self.locations_created = 0
+        self.locations_skipped = 0
+        self.failed_rows = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.failed_rows += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'customers_created': self.customers_created,
+            'customers_matched': self.customers_matched,
+            'locations_created': self.locations_created,
+            'locations_skipped': self.locations_skipped,
+            'failed_rows': self.failed_rows,
+            'errors': self.errors,
+        }
+
+
+def _load_chunk(rows, report):
+    """Insert one chunk of ``(line, fields)`` in one transaction; raises on database errors."""
+    emails = {fields['email'] for _, fields in rows}
+    customer_ids = {email: row.id for email, row in lookup([Customer.id], func.lower(Customer.email), emails).items()}
+
+    created, matched, errors = {}, set(), []
+    for line, fields in rows:
+        email = fields['email']
+        if email in customer_ids:
+            matched.add(email)
+        elif email not in created:
+            if not fields.get('name'):
+                errors.append((line, 'Name is required for a new customer'))
+                continue
+            created[email] = {key: fields.get(key) for key in CUSTOMER_FIELDS}
+    if created:
+        inserted = db.session.execute(
+            insert(Customer.__table__).returning(Customer.id, Customer.email), list(created.values())
+        ).all()
+        customer_ids.update({row.email: row.id for row in inserted})
+
+    # Addresses the customers already have, in one query
+    located = [(line, fields) for line, fields in rows if fields.get('address') and fields['email'] in customer_ids]
+    known = set()
+    if located:
+        ids = {customer_ids[fields['email']] for _, fields in located}
+        existing = db.session.execute(
+            select(CustomerLocation.customer_id, CustomerLocation.address).where(CustomerLocation.customer_id.in_(ids))
+        ).all()
+        known = {(row.customer_id, _address_key(row.address or '')) for row in existing}
+
+    locations, skipped = [], 0
+    for line, fields in located:
+        customer_id = customer_ids[fields['email']]
+        key = (customer_id, _address_key(fields['address']))
+        if key in known:
+            skipped += 1
+            continue
+        known.add(key)
+        location = {field: fields.get(field) for field in LOCATION_FIELDS if field != 'location_notes'}
+        location.update(customer_id=customer_id, notes=fields.get('location_notes'))
+        locations.append(location)
+    if locations:
+        db.session.execute(insert(CustomerLocation.__table__), locations)
+
+    tables = ([Customer.__table__.name] if created else []) + ([CustomerLocation.__table__.name] if locations else [])
+    if tables:
+        bump_session_versions(db.session, tables)
+    db.session.commit()
+    # Only counted once committed, in case the chunk is retried row by row
+    for line, message in errors:
+        report.error(line, message)
+    report.customers_created += len(created)
+    report.customers_matched += len(matched)
+    report.locations_created += len(locations)
+    report.locations_skipped += skipped
+
+
+def _flush(rows, report):
+    try:
+        _load_chunk(rows, report)
+    except Exception as e:
+        db.session.rollback()
+        if len(rows) == 1:
+            report.error(rows[0][0], str(e).splitlines()[0])
+            return
+        # Find the offending rows without losing the rest of the chunk
+        for row in rows:
+            _flush([row], report)
+
+
+def import_customers(stream, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Import customers and locations from the text ``stream``; returns an ``ImportReport``.
+
+    ``progress`` is called with the report after every committed chunk.
+    """
+    reader = csv.DictReader(stream)
+    columns = {header: FIELD_ALIASES[_normalize_header(header)]
+               for header in reader.fieldnames or [] if _normalize_header(header) in FIELD_ALIASES}
+    if 'email' not in columns.values():
+        raise CsvImportError('The CSV needs an email column to match customers on')
+
+    report = ImportReport()
+    chunk = []
+    rows = iter(reader)
+    while True:
+        try:
+            raw = next(rows)
+        except StopIteration:
+            break
+        except (csv.Error, UnicodeDecodeError) as e:
+            # The rest of the file cannot be parsed reliably; keep what was read
+            report.error(reader.line_num, f'Unreadable CSV, import stopped: {e}')
+            break
+        report.rows += 1
+        try:
+            chunk.append((reader.line_num, _parse_row(raw, columns)))
+        except RowError as e:
+            report.error(reader.line_num, str(e))
+        if len(chunk) >= chunk_size:
+            _flush(chunk, report)
+            report.chunks += 1
+            chunk = []
+            if progress:
+                progress(report)
+    if chunk:
+        _flush(chunk, report)
+        report.chunks += 1
+        if progress:
+            progress(report)
+    return report
@@ -0,0 +1,156 @@
+"""
+Configurable, instrumented SQLAlchemy connection pool.
+
+``engine_options_from_env`` turns the ``DB_POOL_*`` environment variables
+into ``SQLALCHEMY_ENGINE_OPTIONS``. The pool class it selects records how
+long each checkout waited, how many connections are in use, overflow and
+timeout events and connection churn. ``pool_status`` exposes these numbers
+for the admin diagnostics endpoint.
+
+Every gunicorn worker owns its own pool, so the numbers are per process.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def engine_options_from_env():
+    """Pool settings for ``SQLALCHEMY_ENGINE_OPTIONS``."""
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+
+class PoolStats:
+    """Counters and checkout-latency samples for this process's pool."""
+
+    SAMPLE_SIZE = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.overflow_checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.closes = 0
+            self.invalidations = 0
+            self.peak_in_use = 0
+            self.wait_ms_total = 0.0
+            self.wait_ms_max = 0.0
+            self._samples = deque(maxlen=self.SAMPLE_SIZE)
+
+    def record_checkout(self, wait_ms, in_use, overflow):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+            self._samples.append(wait_ms)
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+
+            def percentile(p):
+                if not samples:
+                    return 0.0
+                return round(samples[min(len(samples) - 1, int(p * len(samples)))], 3)
+
+            return {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'overflow_checkouts': self.overflow_checkouts,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'closes': self.closes,
+                'invalidations': self.invalidations,
+                'peak_in_use': self.peak_in_use,
+                'checkout_wait_ms': {
+                    'mean': round(self.wait_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+                    'p50': percentile(0.50),
+                    'p95': percentile(0.95),
+                    'p99': percentile(0.99),
+                    'max': round(self.wait_ms_max, 3),
+                },
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` that times every checkout into ``pool_stats``."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.increment('timeouts')
+            raise
+        pool_stats.record_checkout((time.perf_counter() - started) * 1000, self.checkedout(), self.overflow())
+        return connection
+
+
+@event.listens_for(InstrumentedQueuePool, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    pool_stats.increment('connects')
+
+
+@event.listens_for(InstrumentedQueuePool, 'close')
+def _on_close(dbapi_connection, connection_record):
+    pool_stats.increment('closes')
+
+
+@event.listens_for(InstrumentedQueuePool, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.increment('invalidations')
+
+
+@event.listens_for(InstrumentedQueuePool, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    pool_stats.increment('checkins')
+
+
+def pool_status(engine):
+    """Live pool state plus the counters collected since this worker started."""
+    pool = engine.pool
+    status = {
+        'pid': os.getpid(),
+        'pool_class': type(pool).__name__,
+        'stats': pool_stats.snapshot(),
+    }
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    return status
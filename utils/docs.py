@@ -0,0 +1,192 @@
+"""
+API documentation that costs nothing until someone reads it.
+
+``swag_from`` records a route's spec dict the same way Flasgger's decorator
+does, but without importing Flasgger (and jsonschema) or adding a wrapper
+around every view call. Blueprints refer to their specs in
+utils.swagger_docs by name, and the names are resolved when the docs are
+first built. ``init_docs`` registers the usual Flasgger routes
+(``/api/docs``, ``/api/apispec.json``, its static files and OAuth redirect).
+The Flasgger ``Swagger`` object behind them is only built on the first
+request to one of them, so worker startup does no documentation work at all.
+
+The spec itself is normally served from a file compiled ahead of time
+(``python manage.py build-apispec`` writes ``APISPEC_FILE``). It is sent with
+an ETag and long cache headers, so workers never walk the routes for it.
+``python manage.py check-apispec`` fails when the file no longer matches the
+routes. Without the file the spec is generated on the fly as before.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+
+from flask import Blueprint, Response, jsonify, redirect, request, url_for
+from utils.compression import etag_variants
+
+APISPEC_MAX_AGE = 86400
+
+
+def swag_from(specs, *args, **kwargs):
+    """Attach the Swagger ``specs`` dict to a view, as ``flasgger.swag_from`` does.
+
+    ``specs`` may also name a spec in utils.swagger_docs, either a dict or a
+    function to call with ``args`` and ``kwargs``. The name is looked up
+    when the docs are first built, so importing a blueprint does not import
+    the spec module.
+    """
+    def decorator(function):
+        if isinstance(specs, str):
+            function.specs_ref = (specs, args, kwargs)
+        else:
+            function.specs_dict = specs
+        return function
+    return decorator
+
+
+def _resolve_specs(app):
+    # Auth decorators copy the view's attributes onto their wrapper, so the
+    # registered view function carries the reference
+    from utils import swagger_docs
+    for function in app.view_functions.values():
+        ref = getattr(function, 'specs_ref', None)
+        if ref is None or hasattr(function, 'specs_dict'):
+            continue
+        name, args, kwargs = ref
+        specs = getattr(swagger_docs, name)
+        function.specs_dict = specs(*args, **kwargs) if callable(specs) else specs
+
+
+def _flasgger_ui_dir(uiversion):
+    # find_spec locates the package without importing it
+    package_dir = importlib.util.find_spec('flasgger').submodule_search_locations[0]
+    return os.path.join(package_dir, f'ui{uiversion}')
+
+
+def _get_swagger(app):
+    docs = app.extensions['docs']
+    if docs['swagger'] is None:
+        from flasgger import Swagger
+        _resolve_specs(app)
+        swagger = Swagger(config=docs['config'], template=docs['template'])
+        # Bind without init_app: the routes are already registered by init_docs
+        swagger.app = app
+        docs['swagger'] = swagger
+    return docs['swagger']
+
+
+def _compiled_endpoint(app):
+    # The compiled file holds the first (and only) spec
+    return app.extensions['docs']['config']['specs'][0]['endpoint']
+
+
+def build_apispec(app):
+    """Generate the spec from ``app``'s routes, as ``/api/apispec.json`` would."""
+    with app.test_request_context():
+        spec = _get_swagger(app).get_apispecs(_compiled_endpoint(app))
+    # Round-trip so the result compares equal to what is read back from disk
+    return json.loads(json.dumps(spec))
+
+
+def write_apispec(app, path=None):
+    """Compile the spec to ``path`` (``APISPEC_FILE`` by default)."""
+    path = path or app.config['APISPEC_FILE']
+    with open(path, 'w') as f:
+        json.dump(build_apispec(app), f, indent=2, sort_keys=True)
+        f.write('\n')
+    return path
+
+
+def diff_apispec(app, path=None):
+    """Describe how the compiled spec differs from the routes; empty when in sync."""
+    path = path or app.config['APISPEC_FILE']
+    if not os.path.exists(path):
+        return [f'{path} does not exist; run "python manage.py build-apispec"']
+    with open(path) as f:
+        compiled = json.load(f)
+    current = build_apispec(app)
+
+    problems = []
+    compiled_paths = compiled.get('paths', {})
+    current_paths = current.get('paths', {})
+    for route in sorted(set(compiled_paths) | set(current_paths)):
+        old = compiled_paths.get(route, {})
+        new = current_paths.get(route, {})
+        for method in sorted(set(old) | set(new)):
+            if method not in old:
+                problems.append(f'{method.upper()} {route} is not in the compiled spec')
+            elif method not in new:
+                problems.append(f'{method.upper()} {route} no longer exists')
+            elif old[method] != new[method]:
+                problems.append(f'{method.upper()} {route} documentation changed')
+    for key in sorted(set(compiled) | set(current)):
+        if key != 'paths' and compiled.get(key) != current.get(key):
+            problems.append(f'"{key}" changed')
+    return problems
+
+
+def _load_compiled_spec(app):
+    docs = app.extensions['docs']
+    if docs['compiled'] is None:
+        path = app.config.get('APISPEC_FILE')
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                body = json.dumps(json.load(f), separators=(',', ':')).encode('utf-8')
+            docs['compiled'] = (body, hashlib.sha1(body).hexdigest())
+        else:
+            docs['compiled'] = False
+    return docs['compiled']
+
+
+def _compiled_spec_response(body, etag):
+    # Compressed copies carry an -<encoding> suffix (see utils.compression)
+    for candidate in etag_variants(etag):
+        if request.if_none_match.contains_weak(candidate):
+            response = Response(status=304)
+            response.set_etag(candidate)
+            break
+    else:
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = APISPEC_MAX_AGE
+    return response
+
+
+def init_docs(app, config, template):
+    """Serve Swagger UI and specs for ``app``, building them on first use."""
+    app.extensions['docs'] = {'config': config, 'template': template, 'swagger': None, 'compiled': None}
+    app.config.setdefault('APISPEC_FILE', os.path.join(app.root_path, 'apispec.json'))
+
+    ui_dir = _flasgger_ui_dir(config.get('uiversion', 3))
+    docs_bp = Blueprint(
+        config.get('endpoint', 'flasgger'), __name__,
+        template_folder=os.path.join(ui_dir, 'templates'),
+        static_folder=os.path.join(ui_dir, 'static'),
+        static_url_path=config.get('static_url_path')
+    )
+
+    def apidocs():
+        from flasgger.base import APIDocsView
+        return APIDocsView(view_args={'config': _get_swagger(app).config}).get()
+
+    def oauth_redirect():
+        from flasgger.base import OAuthRedirect
+        return OAuthRedirect().get()
+
+    def apispec_view(endpoint):
+        def apispec():
+            if endpoint == _compiled_endpoint(app):
+                compiled = _load_compiled_spec(app)
+                if compiled:
+                    return _compiled_spec_response(*compiled)
+            return jsonify(_get_swagger(app).get_apispecs(endpoint))
+        return apispec
+
+    docs_bp.add_url_rule(config.get('specs_route', '/apidocs/'), 'apidocs', view_func=apidocs)
+    docs_bp.add_url_rule(config.get('oauth_redirect', '/oauth2-redirect.html'), 'oauth_redirect', view_func=oauth_redirect)
+    docs_bp.add_url_rule('/apidocs/index.html', 'apidocs_index', view_func=lambda: redirect(url_for('flasgger.apidocs')))
+    for spec in config['specs']:
+        docs_bp.add_url_rule(spec['route'], spec['endpoint'], view_func=apispec_view(spec['endpoint']))
+
+    app.register_blueprint(docs_bp)
@@ -0,0 +1,75 @@
+"""
+Sparse fieldsets (``?fields=id,status,...``) for list and detail routes.
+
+The requested fields are validated against the model's mapped columns and
+pushed down into the SELECT with ``load_only`` so unrequested columns (long
+``notes`` text, for instance) are never read from the database. The response
+then contains only the requested keys, written by the compiled serializer
+for that field set (see ``utils.serializers``).
+
+Routes whose JSON keys differ from the column names pass ``aliases`` mapping
+the public field name to the model attribute that backs it.
+"""
+from flask import request, jsonify
+from sqlalchemy.orm import load_only
+from utils.serializers import HIDDEN_FIELDS, model_serializer
+
+
+class FieldsError(ValueError):
+    """Raised when ``?fields=`` names a field the model does not expose."""
+
+
+def requested_fields(model, aliases=None, args=None):
+    """Parse ``?fields=`` into an ordered ``{field: attribute}`` mapping.
+
+    Returns ``None`` when the parameter is absent so callers fall back to
+    the full serializer.
+    """
+    args = request.args if args is None else args
+    raw = args.get('fields')
+    if raw is None:
+        return None
+
+    aliases = aliases or {}
+    columns = {attr.key for attr in model.__mapper__.column_attrs} - HIDDEN_FIELDS
+    fields = {}
+    unknown = []
+    for name in (part.strip() for part in raw.split(',')):
+        if not name:
+            continue
+        attribute = aliases.get(name, name)
+        if attribute not in columns:
+            unknown.append(name)
+            continue
+        fields[name] = attribute
+    if unknown:
+        raise FieldsError(f'Unknown field(s) for {model.__tablename__}: {", ".join(unknown)}')
+    if not fields:
+        raise FieldsError('fields must name at least one field')
+    return fields
+
+
+def apply_fields(query, model, fields, *extra_columns):
+    """Restrict ``query`` to the columns backing ``fields`` (plus ``extra_columns``)."""
+    attributes = {getattr(model, attribute) for attribute in fields.values()}
+    attributes.update(extra_columns)
+    return query.options(load_only(*attributes))
+
+
+def fields_serializer(model, fields):
+    """The serializer that emits only ``fields`` from a ``model`` row."""
+    return model_serializer(model, tuple(fields.items()))
+
+
+def detail_response(model, ident, serializer, aliases=None):
+    """Return one ``model`` row by primary key, honouring ``?fields=``."""
+    try:
+        fields = requested_fields(model, aliases)
+    except FieldsError as e:
+        return jsonify({'msg': str(e)}), 400
+
+    query = model.query
+    if fields is not None:
+        query = apply_fields(query, model, fields)
+        serializer = fields_serializer(model, fields)
+    return jsonify(serializer(query.get_or_404(ident))), 200
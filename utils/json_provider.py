@@ -0,0 +1,57 @@
+"""
+Flask JSON provider backed by orjson.
+
+Installed with ``app.json = OrjsonProvider(app)`` so every ``jsonify`` call,
+``current_app.json.dumps`` (used by ``utils.streaming``) and ``request.get_json``
+go through it without any handler changes. ``datetime``, ``date``, ``time``,
+``UUID`` and dataclasses are encoded natively (datetimes as ISO 8601, the same
+format the ``*_to_dict`` helpers produce with ``isoformat()``); ``Decimal`` is
+encoded as a string like Flask's default provider.
+
+``sort_keys`` and ``compact`` keep their Flask meaning, so responses are
+byte-compatible with the stdlib provider apart from whitespace.
+"""
+import decimal
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """``DefaultJSONProvider`` with orjson doing the encoding and decoding."""
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=False):
+        """Encode ``obj`` straight to UTF-8 bytes."""
+        return orjson.dumps(obj, default=_default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Stdlib-only arguments (cls, separators, ...) keep working
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
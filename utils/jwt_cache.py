@@ -0,0 +1,109 @@
+"""
+Cache of verified JWTs.
+
+A logged-in client sends the same access token with every request, and
+Flask-JWT-Extended parses it three times and checks its HMAC signature on
+each one. ``CachingJWTManager`` keeps the verified claims of recently seen
+tokens in a bounded LRU keyed by the SHA-256 of the token, so a repeat
+token skips decoding and verification. An entry is only served before the
+token's ``exp`` (plus ``JWT_DECODE_LEEWAY``). After that the token goes
+through full verification again and is rejected as expired.
+
+Only the decode is cached. The type, freshness and blocklist checks that
+Flask-JWT-Extended runs after decoding still run on every request. Tokens
+sent with a CSRF value (cookie auth on unsafe methods) bypass the cache.
+
+Flask-JWT-Extended has no public hook around the decode itself (its
+loaders all run after it), so the cache overrides the private
+``JWTManager._decode_jwt_from_config`` of the pinned 4.x release. If a
+release drops that method, the cache turns itself off and tokens are
+verified as usual.
+
+``JWT_DECODE_CACHE_SIZE`` bounds the entries per process (0 disables).
+"""
+import datetime
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config
+
+DEFAULT_CACHE_SIZE = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """Thread-safe LRU of ``token digest -> (claims, expires_at)``."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest, now):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if expires_at is not None and now >= expires_at:
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def set(self, digest, claims, expires_at):
+        with self._lock:
+            self._entries[digest] = (claims, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+class CachingJWTManager(JWTManager):
+    """``JWTManager`` that serves repeat tokens from a ``TokenCache``."""
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor=add_context_processor)
+        size = int(app.config.get('JWT_DECODE_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+        if size > 0 and not callable(getattr(JWTManager, '_decode_jwt_from_config', None)):
+            logger.warning('This Flask-JWT-Extended has no _decode_jwt_from_config; JWT decode cache disabled')
+            size = 0
+        self.token_cache = TokenCache(size) if size > 0 else None
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = getattr(self, 'token_cache', None)
+        if cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        digest = hashlib.sha256(encoded_token.encode('utf-8')).digest()
+        claims = cache.get(digest, time.time())
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            expires_at = claims.get('exp')
+            if expires_at is not None:
+                leeway = config.leeway
+                if isinstance(leeway, datetime.timedelta):
+                    leeway = leeway.total_seconds()
+                expires_at += leeway
+            cache.set(digest, claims, expires_at)
+        # Callers get their own dict; the cached claims stay untouched
+        return dict(claims)
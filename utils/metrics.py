@@ -0,0 +1,105 @@
+"""
+Prometheus metrics for every request, exposed at ``/api/metrics``.
+
+Requests are counted and timed per endpoint (``blueprint.view``), method and
+status code, together with the response size and the database time recorded
+by ``utils.query_stats``. A streamed response is recorded when it closes,
+so its time and queries include sending the body. Under gunicorn each worker is a separate process;
+setting ``PROMETHEUS_MULTIPROC_DIR`` (``gunicorn_config.py`` does this) makes
+``prometheus_client`` keep its values in memory-mapped files in that
+directory, so a scrape served by any worker reports the totals of all of them.
+
+Scrapes must send ``Authorization: Bearer <METRICS_TOKEN>``. Without a
+token configured the endpoint answers ``403``, except outside production
+(``FLASK_ENV`` other than ``production``), where it is open.
+"""
+import hmac
+import os
+import time
+
+from flask import current_app, g, request, Response
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from utils.query_stats import QueryStats, current_query_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled',
+    ['endpoint', 'method', 'status']
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request',
+    ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Size of non-streamed response bodies',
+    ['endpoint', 'status'], buckets=SIZE_BUCKETS
+)
+DB_TIME = Histogram(
+    'http_request_db_seconds', 'Time spent in database queries per request',
+    ['endpoint'], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Counter(
+    'http_request_db_queries_total', 'Database queries issued while handling requests',
+    ['endpoint']
+)
+
+
+def _endpoint_label():
+    # Unmatched URLs share one label so scanners cannot blow up cardinality
+    return request.endpoint or 'unmatched'
+
+
+def init_metrics(app):
+    """Record request metrics for every request handled by ``app``."""
+
+    @app.before_request
+    def _start_request_timer():
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('_request_started', None)
+        if started is None:
+            return response
+
+        endpoint = _endpoint_label()
+        method = request.method
+        status = str(response.status_code)
+        if response.is_streamed:
+            # Timed and counted once the body has been sent, with the queries it ran
+            stats = g.setdefault('_query_stats', QueryStats())
+            response.call_on_close(lambda: _observe(endpoint, method, status, started, None, stats))
+        else:
+            _observe(endpoint, method, status, started, response.content_length, current_query_stats())
+        return response
+
+
+def _observe(endpoint, method, status, started, size, stats):
+    REQUESTS.labels(endpoint, method, status).inc()
+    LATENCY.labels(endpoint, method, status).observe(time.perf_counter() - started)
+    if size is not None:
+        RESPONSE_SIZE.labels(endpoint, status).observe(size)
+    DB_TIME.labels(endpoint).observe(stats.db_time if stats else 0.0)
+    DB_QUERIES.labels(endpoint).inc(stats.count if stats else 0)
+
+
+def metrics_response():
+    """Render the metrics of every worker in the Prometheus text format."""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        # Endpoint names and traffic are not for the public internet
+        if current_app.config.get('METRICS_REQUIRE_TOKEN', True):
+            return Response('Metrics are disabled until METRICS_TOKEN is set\n', status=403, mimetype='text/plain')
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
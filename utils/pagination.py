@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination shared by the collection endpoints.
+
+Pages are addressed by an opaque cursor that encodes the ``(sort_key, id)``
+pair of the last row returned, so each page is fetched with a seek predicate
+(``WHERE (sort_key, id) > (:last_value, :last_id)``) instead of an OFFSET
+scan. Routes opt in by returning ``list_response(query, serializer)``.
+Unpaginated requests can ask for ``?stream=true`` to have the full array
+streamed instead of built in memory (see ``utils.streaming``), and every
+mode honours ``?fields=`` (see ``utils.fields``).
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from flask import request, jsonify
+from models import db
+from utils.streaming import wants_stream, stream_json_array
+from utils.fields import FieldsError, requested_fields, apply_fields, fields_serializer
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """Raised when the ``limit`` or ``cursor`` query parameters are invalid."""
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_column, sort_value, row_id):
+    """Build the opaque cursor pointing just past ``(sort_value, row_id)``."""
+    payload = json.dumps([sort_column.key, _encode_value(sort_value), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(sort_column, cursor):
+    """Return the ``(sort_value, row_id)`` pair stored in ``cursor``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if key != sort_column.key or not isinstance(row_id, int):
+            raise PaginationError('Cursor does not belong to this collection')
+        return _decode_value(sort_column, value), row_id
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        if isinstance(e, PaginationError):
+            raise
+        raise PaginationError('Invalid cursor') from e
+
+
+def parse_page_args(args):
+    """Read ``limit`` and ``cursor`` from the request args.
+
+    Returns ``None`` when the client did not ask for a page, so routes keep
+    returning a bare JSON array to existing callers.
+    """
+    if 'limit' not in args and 'cursor' not in args:
+        return None
+    limit = args.get('limit', DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise PaginationError('limit must be an integer')
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise PaginationError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    return limit, args.get('cursor') or None
+
+
+def keyset_page(query, limit, cursor=None, sort_column=None, id_column=None):
+    """Fetch one page of ``query`` ordered by ``(sort_column, id_column)``.
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is ``None`` on the last page.
+    """
+    if id_column is None:
+        id_column = query.column_descriptions[0]['entity'].id
+    if sort_column is None:
+        sort_column = id_column
+
+    if cursor:
+        last_value, last_id = decode_cursor(sort_column, cursor)
+        if sort_column is id_column:
+            query = query.filter(id_column > last_id)
+        else:
+            query = query.filter(db.tuple_(sort_column, id_column) > db.tuple_(last_value, last_id))
+
+    if sort_column is id_column:
+        query = query.order_by(id_column)
+    else:
+        query = query.order_by(sort_column, id_column)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_column, getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def list_response(query, serializer, sort_column=None, aliases=None):
+    """Serialize a collection query for a GET route.
+
+    With ``?limit=`` or ``?cursor=`` the body is ``{"items": [...], "next_cursor": ...}``;
+    otherwise the whole result is returned as a JSON array as before, streamed
+    from the cursor when ``?stream=true`` is given. ``aliases`` is passed to
+    ``requested_fields`` for routes whose keys differ from the column names.
+    """
+    try:
+        page = parse_page_args(request.args)
+        model = query.column_descriptions[0]['entity']
+        fields = requested_fields(model, aliases)
+    except (PaginationError, FieldsError) as e:
+        return jsonify({'msg': str(e)}), 400
+
+    if fields is not None:
+        extra_columns = [model.id] if sort_column is None else [model.id, sort_column]
+        query = apply_fields(query, model, fields, *extra_columns)
+        serializer = fields_serializer(model, fields)
+
+    if page is None:
+        if wants_stream():
+            return stream_json_array(query, serializer)
+        return jsonify([serializer(row) for row in query.all()]), 200
+
+    limit, cursor = page
+    try:
+        rows, next_cursor = keyset_page(query, limit, cursor, sort_column=sort_column)
+    except PaginationError as e:
+        return jsonify({'msg': str(e)}), 400
+    return jsonify({
+        'items': [serializer(row) for row in rows],
+        'next_cursor': next_cursor
+    }), 200
@@ -0,0 +1,109 @@
+"""
+Password hashing policy shared by every login and password change.
+
+``PASSWORD_HASH_METHOD`` is the Werkzeug method (algorithm and cost) new
+hashes are made with, e.g. ``scrypt:32768:8:1`` (Werkzeug's default) or
+``pbkdf2:sha256:260000``. A stored hash is checked with whatever method
+made it, and after a successful login ``verify_and_update`` rewrites it
+with the configured method when the two differ. Raising or lowering the
+cost therefore takes effect user by user as they log in, with no bulk
+migration.
+
+With ``PASSWORD_HASH_THREADS`` above zero, checks run on a pool of that
+many threads per process. hashlib's scrypt and PBKDF2 release the GIL, so
+under threaded workers (``gunicorn --threads``) the worker's other
+requests keep doing database I/O while a login hashes. A burst of logins
+also queues for the pool instead of running every hash at once. Under the
+default sync workers, keep it at 0.
+"""
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from sqlalchemy.orm import object_session
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_key = None
+_executor_lock = threading.Lock()
+
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return os.getenv(name, default)
+
+
+def hash_method():
+    """The configured ``PASSWORD_HASH_METHOD``."""
+    return _setting('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+
+
+@functools.lru_cache(maxsize=8)
+def _canonical(method):
+    # Werkzeug fills in omitted parameters ('pbkdf2' -> 'pbkdf2:sha256:1000000'),
+    # so compare against the prefix of a hash it actually produces
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
+def hash_password(password):
+    """Hash ``password`` with the configured method."""
+    return generate_password_hash(password, method=hash_method())
+
+
+def needs_rehash(password_hash):
+    """True when ``password_hash`` was not made with the configured method."""
+    return password_hash.split('$', 1)[0] != _canonical(hash_method())
+
+
+def _pool():
+    global _executor, _executor_key
+    threads = int(_setting('PASSWORD_HASH_THREADS', 0) or 0)
+    if threads <= 0:
+        return None
+    # A pool created before a fork has no threads in the child
+    key = (os.getpid(), threads)
+    if _executor_key != key:
+        with _executor_lock:
+            if _executor_key != key:
+                _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='password-hash')
+                _executor_key = key
+    return _executor
+
+
+def check_password(password_hash, password):
+    """Check ``password`` against ``password_hash``, on the hashing pool if there is one."""
+    if not password_hash:
+        return False
+    pool = _pool()
+    if pool is None:
+        return check_password_hash(password_hash, password)
+    return pool.submit(check_password_hash, password_hash, password).result()
+
+
+def verify_and_update(user, password):
+    """Check ``password`` for ``user`` and bring its hash up to the current policy.
+
+    The new hash is committed straight away; if that fails the login still
+    succeeds and the hash is upgraded on a later one.
+    """
+    if not check_password(user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+        session = object_session(user)
+        if session is not None:
+            try:
+                session.commit()
+            except Exception:
+                session.rollback()
+                logger.warning('Could not store the rehashed password of %s %s',
+                               type(user).__name__, user.id, exc_info=True)
+    return True
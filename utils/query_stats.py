@@ -0,0 +1,119 @@
+"""
+Per-request SQL statement counting and N+1 detection.
+
+Engine cursor events count every statement a request executes and the time
+spent in the database. Statements are also grouped by shape (the SQL text
+with bound parameters and expanded ``IN`` lists collapsed), so a lazy load
+inside a loop shows up as the same shape executed once per row.
+
+After each request ``init_query_stats`` adds ``X-Query-Count`` and
+``X-DB-Time`` headers when ``QUERY_STATS_HEADERS`` is on (the default outside
+``FLASK_ENV=production``). It also logs a warning when the request ran more
+than ``QUERY_COUNT_WARN_THRESHOLD`` statements, or repeated one shape at
+least ``N_PLUS_ONE_THRESHOLD`` times.
+"""
+import re
+import time
+from collections import Counter
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_WHITESPACE = re.compile(r'\s+')
+_PYFORMAT_PARAM = re.compile(r'%\(\w+\)s')
+_PARAM_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+
+
+def statement_shape(statement):
+    """Normalize ``statement`` so executions differing only in parameters compare equal."""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PYFORMAT_PARAM.sub('?', shape)
+    return _PARAM_LIST.sub('?', shape)
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """``(shape, count)`` pairs executed at least ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def current_query_stats():
+    """Stats of the current request, or ``None`` if it has not touched the database."""
+    return g.get('_query_stats') if has_app_context() else None
+
+
+def _record(statement, started):
+    if has_app_context():
+        if '_query_stats' not in g:
+            g._query_stats = QueryStats()
+        g._query_stats.record(statement, time.perf_counter() - started)
+
+
+# The start time lives on the statement's execution context, which is
+# discarded with it, so a statement that raises leaves nothing behind for
+# later statements on the connection to be timed against
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is not None:
+        _record(statement, started)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _failed_query(exception_context):
+    # after_cursor_execute never fires for a statement that raised; count it here
+    context = exception_context.execution_context
+    started = getattr(context, '_query_started', None)
+    if started is not None:
+        _record(exception_context.statement, started)
+
+
+def init_query_stats(app):
+    """Report each request's query count and DB time and flag N+1 patterns."""
+
+    def warn(stats, method, path, endpoint):
+        repeated = stats.repeated(app.config.get('N_PLUS_ONE_THRESHOLD', 5))
+        if repeated or stats.count > app.config.get('QUERY_COUNT_WARN_THRESHOLD', 30):
+            app.logger.warning(
+                '%s %s (%s) ran %d queries in %.1fms%s',
+                method, path, endpoint, stats.count, stats.db_time * 1000,
+                ''.join(f'\n  possible N+1: {count}x {shape[:200]}' for shape, count in repeated)
+            )
+
+    @app.after_request
+    def _report_query_stats(response):
+        if response.is_streamed:
+            # A streamed body runs its queries while it is sent (the headers are
+            # gone by then), so the request is only judged once it has closed
+            stats = g.setdefault('_query_stats', QueryStats())
+            method, path, endpoint = request.method, request.path, request.endpoint
+            response.call_on_close(lambda: warn(stats, method, path, endpoint))
+            return response
+
+        stats = current_query_stats()
+        if stats is None:
+            stats = QueryStats()
+        if app.config.get('QUERY_STATS_HEADERS'):
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers['X-DB-Time'] = f'{stats.db_time * 1000:.2f}ms'
+        warn(stats, request.method, request.path, request.endpoint)
+        return response
@@ -0,0 +1,360 @@
+"""
+Rate limits for routes that can be hammered (logins, registration, webhooks).
+
+Limits are declared on the route, next to the other decorators::
+
+    @auth_bp.route('/login', methods=['POST'])
+    @rate_limit('10/minute', key=json_field('email'))
+    @rate_limit('60/minute')
+    def login():
+
+Each ``rate_limit`` is a token bucket holding up to ``burst`` requests
+(the limit's count by default) that refills at ``count / period``. A bucket
+is kept per route (``request.endpoint``) and per identity. The identity
+comes from ``key``: ``remote_address`` (the default), ``json_field(name)``
+(a field of the JSON body, e.g. the email being logged in) or
+``jwt_identity`` (the verified token's user, so each caller has its own
+budget however many tokens it holds). A
+request over any of its route's limits gets ``429`` with ``Retry-After``.
+
+Stacked ``rate_limit`` decorators become one check. A request is charged
+against all of the route's buckets if every one of them allows it, and
+against none of them if any refuses it. A login refused for its email
+therefore does not use up the address's budget, and the reverse holds too.
+The limits run before the view and the decorators below them, so a
+rejected request does no database work.
+
+``RATE_LIMIT_BACKEND`` selects where the buckets live:
+
+* ``shared`` (the default): a fixed table of ``RATE_LIMIT_SLOTS`` buckets in
+  a memory-mapped file (``RATE_LIMIT_FILE``), shared by every gunicorn
+  worker on the host and guarded by ``flock``;
+* ``redis``: one hash per bucket in Redis at ``RATE_LIMIT_REDIS_URL``,
+  updated by a Lua script, for limits shared between hosts. Needs the
+  ``redis`` package;
+* ``local``: a process-local stand-in with the same interface, for tests
+  and development;
+* ``none``: no limits.
+
+If the backend fails, the request is let through and a warning is logged.
+"""
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_LIMIT_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$')
+
+
+class Limit:
+    """``count`` requests per ``period`` seconds, with bursts of up to ``burst``."""
+
+    def __init__(self, count, period, burst=None):
+        self.count = count
+        self.period = period
+        self.burst = burst or count
+        self.rate = count / period
+
+    @classmethod
+    def parse(cls, text, burst=None):
+        """Parse ``'10/minute'``, ``'100/hour'`` or ``'5/15minutes'``."""
+        match = _LIMIT_RE.match(text)
+        if not match:
+            raise ValueError(f'Invalid rate limit: {text!r}')
+        count, multiplier, unit = match.groups()
+        return cls(int(count), int(multiplier or 1) * PERIODS[unit], burst)
+
+    def __repr__(self):
+        return f'Limit({self.count}/{self.period}s, burst={self.burst})'
+
+
+def _take(tokens, updated, now, limit, cost):
+    """Refill a bucket to ``now`` and take ``cost``; returns (allowed, tokens, retry_after)."""
+    tokens = min(limit.burst, tokens + max(0.0, now - updated) * limit.rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / limit.rate
+
+
+def _take_all(states, now, cost):
+    """``_take`` from every ``(limit, tokens, updated)``; returns (allowed, new tokens, retry_after).
+
+    The new tokens are only meant to be stored when every bucket allowed
+    the request; otherwise the buckets are left as they were.
+    """
+    results = [_take(tokens, updated, now, limit, cost) for limit, tokens, updated in states]
+    return (all(result[0] for result in results), [result[1] for result in results],
+            max(result[2] for result in results))
+
+
+class LocalBackend:
+    """Process-local stand-in for a shared backend.
+
+    ``hit(buckets, cost)`` takes ``cost`` from every ``(key, limit)`` in
+    ``buckets`` if they all have it, and returns (allowed, retry_after) as
+    every backend does.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def hit(self, buckets, cost=1):
+        now = time.time()
+        with self._lock:
+            states = [(limit, *self._buckets.get(key, (limit.burst, now))) for key, limit in buckets]
+            allowed, tokens, retry_after = _take_all(states, now, cost)
+            if allowed:
+                for (key, _), remaining in zip(buckets, tokens):
+                    self._buckets[key] = (remaining, now)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SharedMemoryBackend:
+    """Buckets in a memory-mapped file shared by the processes on a host.
+
+    The file is a table of ``slots`` records of (key hash, tokens, updated),
+    addressed by open addressing over ``PROBES`` neighbouring slots. When
+    they are all taken by other keys, the least recently used one is
+    reused; its key starts again from a full bucket.
+    """
+
+    RECORD = struct.Struct('<Qdd')
+    PROBES = 8
+
+    def __init__(self, path, slots=65536):
+        self.path = path
+        self.slots = slots
+        self.size = slots * self.RECORD.size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+
+    def _open(self):
+        # An fd inherited across fork shares its flock with the parent, so
+        # each process opens the file itself
+        if self._pid == os.getpid():
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            # Only ever grow the file: another process may still map it
+            if os.fstat(fd).st_size < self.size:
+                os.ftruncate(fd, self.size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, self.size)
+        self._pid = os.getpid()
+
+    def _slot(self, digest, taken=()):
+        record, data = self.RECORD, self._map
+        start = digest % self.slots
+        victim, victim_updated = None, None
+        for probe in range(self.PROBES):
+            offset = ((start + probe) % self.slots) * record.size
+            if offset in taken:
+                # Claimed by another bucket of the same request
+                continue
+            slot_digest, tokens, updated = record.unpack_from(data, offset)
+            if slot_digest == digest:
+                return offset, tokens, updated
+            if slot_digest == 0:
+                return offset, None, None
+            if victim is None or updated < victim_updated:
+                victim, victim_updated = offset, updated
+        return victim, None, None
+
+    def hit(self, buckets, cost=1):
+        digests = [int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+                   for key, _ in buckets]
+        now = time.time()
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                offsets, states = [], []
+                for digest, (_, limit) in zip(digests, buckets):
+                    offset, tokens, updated = self._slot(digest, offsets)
+                    if tokens is None:
+                        tokens, updated = limit.burst, now
+                    offsets.append(offset)
+                    states.append((limit, tokens, updated))
+                allowed, tokens, retry_after = _take_all(states, now, cost)
+                if allowed:
+                    for offset, digest, remaining in zip(offsets, digests, tokens):
+                        self.RECORD.pack_into(self._map, offset, digest, remaining, now)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._map[:] = bytes(self.size)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class RedisBackend:
+    """Buckets stored in Redis, for limits shared by several hosts."""
+
+    # KEYS the buckets; ARGV cost, now, then burst and rate per bucket.
+    # Returns {allowed, retry_after * 1000}
+    SCRIPT = """
+local cost, now = tonumber(ARGV[1]), tonumber(ARGV[2])
+local allowed, retry_after, remaining = 1, 0, {}
+for i, key in ipairs(KEYS) do
+    local burst, rate = tonumber(ARGV[2 * i + 1]), tonumber(ARGV[2 * i + 2])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens, updated = tonumber(bucket[1]) or burst, tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    if tokens < cost then
+        allowed, retry_after = 0, math.max(retry_after, (cost - tokens) / rate)
+    end
+    remaining[i] = tokens - cost
+end
+if allowed == 1 then
+    for i, key in ipairs(KEYS) do
+        local burst, rate = tonumber(ARGV[2 * i + 1]), tonumber(ARGV[2 * i + 2])
+        redis.call('HSET', key, 'tokens', tostring(remaining[i]), 'updated', tostring(now))
+        redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000))
+    end
+end
+return {allowed, math.ceil(retry_after * 1000)}
+"""
+
+    def __init__(self, url, prefix='dolg:ratelimit:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RATE_LIMIT_BACKEND=redis needs the redis package') from None
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def hit(self, buckets, cost=1):
+        args = [cost, time.time()]
+        for _, limit in buckets:
+            args += [limit.burst, limit.rate]
+        allowed, retry_after_ms = self._script(keys=[self.prefix + key for key, _ in buckets], args=args)
+        return bool(allowed), retry_after_ms / 1000
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            self._client.delete(key)
+
+
+# --- identities ---
+
+def remote_address():
+    """The client's address (from ``X-Forwarded-For`` behind ``TRUSTED_PROXY_COUNT`` proxies)."""
+    return request.remote_addr or 'unknown'
+
+
+def json_field(name):
+    """The JSON body's ``name`` field (case-insensitive); requests without it skip the limit."""
+    def key():
+        data = request.get_json(silent=True)
+        value = data.get(name) if isinstance(data, dict) else None
+        return str(value).strip().lower() if value else None
+    key.__name__ = f'json_{name}'
+    return key
+
+
+def jwt_identity():
+    """The verified JWT's user (``user_type:sub``); requests without a valid token skip the limit."""
+    # Any string is a distinct token, so an unverified one would buy a fresh
+    # bucket per request; the view refuses those anyway
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        return None
+    identity = get_jwt_identity()
+    if identity is None:
+        return None
+    return f"{get_jwt().get('user_type', 'user')}:{identity}"
+
+
+def rate_limit(limit, key=remote_address, burst=None):
+    """Reject requests to the decorated route beyond ``limit`` per ``key()`` with 429."""
+    rule = (Limit.parse(limit, burst), key)
+
+    def decorator(fn):
+        # A rate_limit stacked directly on another joins its check
+        if getattr(fn, '_rate_limited', None) is fn:
+            fn._rate_limits.insert(0, rule)
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            backend = current_app.extensions.get('rate_limiter')
+            buckets = []
+            if backend is not None:
+                for bucket_limit, bucket_key in wrapper._rate_limits:
+                    identity = bucket_key()
+                    if identity is not None:
+                        # The limit is part of the name so two limits on one key get two buckets
+                        name = f'{request.endpoint}|{bucket_key.__name__}|{bucket_limit.count}/{bucket_limit.period}'
+                        buckets.append((f'{name}|{identity}', bucket_limit))
+            if buckets:
+                try:
+                    allowed, retry_after = backend.hit(buckets)
+                except Exception:
+                    logger.warning('Rate limit check failed for %s; letting the request through',
+                                   request.endpoint, exc_info=True)
+                    allowed = True
+                if not allowed:
+                    seconds = max(1, math.ceil(retry_after))
+                    response = jsonify({'msg': f'Too many requests, retry in {seconds} seconds'})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(seconds)
+                    return response
+            return fn(*args, **kwargs)
+        wrapper._rate_limits = [rule]
+        wrapper._rate_limited = wrapper
+        return wrapper
+    return decorator
+
+
+def init_rate_limiter(app):
+    """Create the rate limit backend described by ``app.config``."""
+    backend = app.config.get('RATE_LIMIT_BACKEND', 'shared')
+    if backend == 'none':
+        limiter = None
+    elif backend == 'shared':
+        limiter = SharedMemoryBackend(
+            app.config.get('RATE_LIMIT_FILE') or os.path.join(tempfile.gettempdir(), 'dolg-ratelimit'),
+            slots=app.config.get('RATE_LIMIT_SLOTS', 65536)
+        )
+    elif backend == 'redis':
+        limiter = RedisBackend(app.config.get('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0'))
+    elif backend == 'local':
+        limiter = LocalBackend()
+    else:
+        raise ValueError(f'Unknown RATE_LIMIT_BACKEND: {backend}')
+    app.extensions['rate_limiter'] = limiter
+    return limiter
@@ -0,0 +1,210 @@
+"""
+JWT revocation (logout) backed by the ``revoked_tokens`` table.
+
+Flask-JWT-Extended asks ``token_in_blocklist_loader`` about every token it
+accepts, so a plain lookup would add a query to every authenticated
+request. Instead, each worker keeps a Bloom filter of the revoked ``jti``
+values:
+
+* a ``jti`` the filter has never seen is certainly not revoked, so the
+  request goes on without touching the database. That covers almost every
+  request;
+* a ``jti`` the filter may contain (a revoked token, or a false positive at
+  about ``REVOCATION_BLOOM_ERROR_RATE``) is confirmed with one indexed
+  lookup.
+
+The filter is refreshed incrementally: at most every
+``REVOCATION_REFRESH_SECONDS`` a worker fetches the rows revoked since
+``REVOCATION_OVERLAP_SECONDS`` before the latest ``revoked_at`` it has
+seen. ``revoked_at`` is the database's ``now()``, so workers whose clocks
+disagree still stamp rows on one clock. It is taken when the revoking
+transaction starts, though, so rows can become visible out of order;
+re-reading that overlap picks up a row that committed after a newer one, and
+the ``jti``s already loaded from it are skipped. A token revoked in one worker
+is therefore rejected by the others within the refresh interval, and at
+once by the worker that revoked it. When the filter holds ``REVOCATION_BLOOM_CAPACITY``
+entries it is rebuilt from the unexpired rows, with room for twice as
+many. ``python manage.py prune-revoked-tokens`` deletes rows whose token
+has expired anyway.
+"""
+import datetime
+import hashlib
+import math
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from models import db, RevokedToken
+
+_table = RevokedToken.__table__
+
+
+def _utcnow():
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings (double hashing over one BLAKE2b digest)."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.size = max(64, int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """This worker's view of ``revoked_tokens``: a Bloom filter plus the latest revocation loaded."""
+
+    def __init__(self, capacity=100000, error_rate=0.001, refresh_seconds=2.0, overlap_seconds=30.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.overlap = datetime.timedelta(seconds=overlap_seconds)
+        self.filter = None
+        self.watermark = None
+        # jti -> revoked_at of the rows inside the overlap, so a re-read adds nothing twice
+        self._recent = {}
+        self.refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.db_checks = 0
+
+    def _advance(self, rows):
+        for row in rows:
+            if self.watermark is None or row.revoked_at > self.watermark:
+                self.watermark = row.revoked_at
+        if self.watermark is not None:
+            cutoff = self.watermark - self.overlap
+            self._recent = {jti: revoked_at for jti, revoked_at in self._recent.items() if revoked_at >= cutoff}
+
+    def _rebuild(self):
+        now = _utcnow()
+        rows = db.session.execute(
+            select(_table.c.jti, _table.c.revoked_at)
+            .where(or_(_table.c.expires_at.is_(None), _table.c.expires_at > now))
+        ).all()
+        self.filter = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        self.watermark = db.session.execute(select(func.max(_table.c.revoked_at))).scalar()
+        self._recent = {}
+        for row in rows:
+            self.filter.add(row.jti)
+            self._recent[row.jti] = row.revoked_at
+        self._advance([])
+
+    def refresh(self, force=False):
+        """Load the rows added since the last refresh, if it is due."""
+        if not force and self.filter is not None and time.monotonic() - self.refreshed_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if not force and self.filter is not None and time.monotonic() - self.refreshed_at < self.refresh_seconds:
+                return
+            if self.filter is None or self.filter.count >= self.filter.capacity:
+                self._rebuild()
+            else:
+                query = select(_table.c.jti, _table.c.revoked_at)
+                if self.watermark is not None:
+                    query = query.where(_table.c.revoked_at >= self.watermark - self.overlap)
+                rows = db.session.execute(query).all()
+                for row in rows:
+                    if row.jti not in self._recent:
+                        self.filter.add(row.jti)
+                        self._recent[row.jti] = row.revoked_at
+                self._advance(rows)
+            self.refreshed_at = time.monotonic()
+
+    def is_revoked(self, jti):
+        """True when the token with this ``jti`` has been revoked."""
+        if not jti:
+            return False
+        self.refresh()
+        self.checks += 1
+        if jti not in self.filter:
+            return False
+        self.db_checks += 1
+        return db.session.execute(select(_table.c.id).where(_table.c.jti == jti).limit(1)).first() is not None
+
+    def revoke(self, claims):
+        """Record the decoded token ``claims`` as revoked and commit."""
+        jti = claims.get('jti')
+        if not jti:
+            raise ValueError('Token has no jti claim and cannot be revoked')
+        expires_at = None
+        if claims.get('exp') is not None:
+            expires_at = datetime.datetime.fromtimestamp(claims['exp'], datetime.UTC).replace(tzinfo=None)
+        db.session.add(RevokedToken(
+            jti=jti,
+            token_type=claims.get('type', 'access'),
+            user_type=claims.get('user_type'),
+            identity=str(claims.get('sub')) if claims.get('sub') is not None else None,
+            expires_at=expires_at
+        ))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Already revoked (a repeated logout)
+            db.session.rollback()
+        # Seen here at once; the next refresh skips it
+        self.refresh()
+        with self._lock:
+            if jti not in self._recent:
+                self.filter.add(jti)
+                # Kept as long as the rows around it; revoked_at is on the database's clock
+                self._recent[jti] = self.watermark if self.watermark is not None else _utcnow()
+
+    def stats(self):
+        return {
+            'entries': self.filter.count if self.filter else 0,
+            'capacity': self.filter.capacity if self.filter else self.capacity,
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            'checks': self.checks,
+            'db_checks': self.db_checks,
+        }
+
+
+def prune_expired():
+    """Delete revocations of tokens that have expired; returns the number of rows removed."""
+    result = db.session.execute(delete(_table).where(_table.c.expires_at < _utcnow()))
+    db.session.commit()
+    return result.rowcount
+
+
+def revoke_token(claims):
+    """Revoke the token whose decoded ``claims`` are given."""
+    current_app.extensions['revocation'].revoke(claims)
+
+
+def init_revocation(app, jwt_manager):
+    """Create this app's ``RevocationList`` and register it as the JWT blocklist."""
+    revocation = RevocationList(
+        capacity=app.config.get('REVOCATION_BLOOM_CAPACITY', 100000),
+        error_rate=app.config.get('REVOCATION_BLOOM_ERROR_RATE', 0.001),
+        refresh_seconds=app.config.get('REVOCATION_REFRESH_SECONDS', 2.0),
+        overlap_seconds=app.config.get('REVOCATION_OVERLAP_SECONDS', 30.0)
+    )
+    app.extensions['revocation'] = revocation
+
+    @jwt_manager.token_in_blocklist_loader
+    def _token_revoked(jwt_header, jwt_payload):
+        return current_app.extensions['revocation'].is_revoked(jwt_payload.get('jti'))
+
+    return revocation
@@ -0,0 +1,77 @@
+"""
+Compiled per-model serializers behind the ``*_to_dict`` helpers.
+
+``model_serializer(model, fields)`` reads the column types from the
+SQLAlchemy mapper once, when the blueprint declaring it is imported, and
+generates a function that builds the whole dict in one literal: date, time
+and datetime columns become ``isoformat()`` strings (``None`` stays
+``None``), everything else is copied as is. Nothing is inspected per row.
+
+The generated code only uses attribute access, so the same function works
+on ORM instances and on the ``Row`` tuples returned by Core statements
+(``INSERT ... RETURNING`` in ``utils.bulk``, plain ``select`` queries).
+
+``fields`` lists column attribute names, or ``(key, attribute)`` pairs when
+the JSON key differs from the column; a column may appear under several
+keys. Serializers are cached per model and field set, so blueprints that
+declare the same shape, and the ``?fields=`` sparse fieldsets, share one
+function.
+"""
+import functools
+
+from sqlalchemy import types as sqltypes
+
+# Columns that must never be exposed, whatever the client asks for
+HIDDEN_FIELDS = frozenset({'password_hash'})
+
+_TEMPORAL_TYPES = (sqltypes.Date, sqltypes.DateTime, sqltypes.Time)
+
+
+def _normalize(model, fields):
+    columns = {attr.key: attr.columns[0] for attr in model.__mapper__.column_attrs}
+    if fields is None:
+        fields = [key for key in columns if key not in HIDDEN_FIELDS]
+    pairs = []
+    for field in fields:
+        key, attribute = (field, field) if isinstance(field, str) else field
+        if attribute not in columns:
+            raise ValueError(f'{model.__name__} has no column {attribute!r}')
+        pairs.append((key, attribute, isinstance(columns[attribute].type, _TEMPORAL_TYPES)))
+    return tuple(pairs)
+
+
+def _source(name, pairs):
+    lines = [f'def {name}(obj):', '    if obj is None:', '        return None']
+    # Temporal values are read once into a local even when several keys use them
+    temporal = {}
+    for _, attribute, is_temporal in pairs:
+        if is_temporal and attribute not in temporal:
+            temporal[attribute] = f'_t{len(temporal)}'
+            lines.append(f'    {temporal[attribute]} = obj.{attribute}')
+    items = []
+    for key, attribute, is_temporal in pairs:
+        if is_temporal:
+            local = temporal[attribute]
+            items.append(f'{key!r}: None if {local} is None else {local}.isoformat()')
+        else:
+            items.append(f'{key!r}: obj.{attribute}')
+    lines.append('    return {' + ', '.join(items) + '}')
+    return '\n'.join(lines) + '\n'
+
+
+@functools.lru_cache(maxsize=512)
+def _compile(model, pairs):
+    name = f'serialize_{model.__tablename__}'
+    namespace = {'__name__': __name__}
+    exec(compile(_source(name, pairs), f'<serializer {model.__name__}>', 'exec'), namespace)
+    return namespace[name]
+
+
+def model_serializer(model, fields=None):
+    """The compiled serializer for ``model`` and ``fields`` (every visible column by default)."""
+    return _compile(model, _normalize(model, fields))
+
+
+def serializer_source(model, fields=None):
+    """The generated source of ``model_serializer(model, fields)``, for debugging."""
+    return _source(f'serialize_{model.__tablename__}', _normalize(model, fields))
@@ -0,0 +1,84 @@
+"""
+Streaming JSON responses for large collections.
+
+Rows are pulled from the database in batches with ``yield_per`` and written
+out as the JSON array is built, so neither the full list of ORM objects nor
+the encoded body is ever held in memory at once.
+
+``iter_csv`` and ``iter_ndjson`` do the same for a Core ``select`` (used by
+the exports), reading plain rows from a server-side cursor.
+"""
+import csv
+import datetime
+import io
+
+from flask import Response, current_app, request, stream_with_context
+from models import db
+
+STREAM_BATCH_SIZE = 1000
+
+
+def wants_stream(args=None):
+    """True when the client asked for ``?stream=true``."""
+    args = request.args if args is None else args
+    return args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def iter_json_array(query, serializer, batch_size=STREAM_BATCH_SIZE):
+    """Yield the JSON array for ``query`` one batch of rows at a time."""
+    dumps = current_app.json.dumps
+    yield '['
+    first = True
+    buffer = []
+    for row in query.yield_per(batch_size):
+        encoded = dumps(serializer(row))
+        buffer.append(encoded if first else ',' + encoded)
+        first = False
+        if len(buffer) >= batch_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+    yield ']'
+
+
+def stream_json_array(query, serializer, batch_size=STREAM_BATCH_SIZE):
+    """Return a streamed ``application/json`` response for ``query``."""
+    return Response(
+        stream_with_context(iter_json_array(query, serializer, batch_size)),
+        status=200,
+        mimetype='application/json'
+    )
+
+
+def _partitions(stmt, batch_size):
+    # stream_results gives a server-side cursor on PostgreSQL; SQLite streams by default
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    return result.partitions()
+
+
+def _export_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(stmt, batch_size=STREAM_BATCH_SIZE):
+    """Yield ``stmt``'s rows as CSV, a header of the column labels first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in stmt.selected_columns])
+    for rows in _partitions(stmt, batch_size):
+        writer.writerows([_export_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(stmt, batch_size=STREAM_BATCH_SIZE):
+    """Yield ``stmt``'s rows as newline-delimited JSON objects keyed by column label."""
+    dumps = current_app.json.dumps
+    for rows in _partitions(stmt, batch_size):
+        yield ''.join(dumps(row._asdict()) + '\n' for row in rows)
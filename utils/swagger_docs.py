@@ -1433,8 +1433,6 @@ EQUIPMENT_GET = {
                         "purchase_price": {"type": "number", "format": "float"},
                         "repair_cost_to_date": {"type": "number", "format": "float"},
                         "purchased_by": {"type": "string"},
-                        "fuel_type": {"type": "string"},
-                        "oil_type": {"type": "string"},
                         "created_date": {"type": "string", "format": "date-time"}
                     }
                 }
@@ -1466,9 +1464,7 @@ EQUIPMENT_POST = {
                     "equipment_category_id": {"type": "integer", "example": 1},
                     "purchase_price": {"type": "number", "format": "float", "example": 599.99},
                     "repair_cost_to_date": {"type": "number", "format": "float", "example": 0.00},
-                    "purchased_by": {"type": "string", "example": "John Doe"},
-                    "fuel_type": {"type": "string", "example": "Gasoline"},
-                    "oil_type": {"type": "string", "example": "SAE 10W-30"}
+                    "purchased_by": {"type": "string", "example": "John Doe"}
                 },
                 "required": ["name"]
             }
@@ -1521,8 +1517,6 @@ EQUIPMENT_EQ_ID_GET = {
                     "purchase_price": {"type": "number", "format": "float"},
                     "repair_cost_to_date": {"type": "number", "format": "float"},
                     "purchased_by": {"type": "string"},
-                    "fuel_type": {"type": "string"},
-                    "oil_type": {"type": "string"},
                     "created_date": {"type": "string", "format": "date-time"}
                 }
             }
@@ -1561,9 +1555,7 @@ EQUIPMENT_EQ_ID_PUT = {
                     "equipment_category_id": {"type": "integer"},
                     "purchase_price": {"type": "number", "format": "float"},
                     "repair_cost_to_date": {"type": "number", "format": "float"},
-                    "purchased_by": {"type": "string"},
-                    "fuel_type": {"type": "string"},
-                    "oil_type": {"type": "string"}
+                    "purchased_by": {"type": "string"}
                 }
             }
         }
@@ -2754,3 +2746,284 @@ CUSTOMER_PORTAL_INVOICE_ID_GET = {
         "403": {"description": "Forbidden - Invoice doesn't belong to customer"},
         "404": {"description": "Invoice not found"}
     } }
+
+# ADMIN endpoints documentation
+ADMIN_DB_POOL_GET = {
+    "tags": ["Admin"],
+    "description": "Connection pool state and checkout statistics for the worker serving the request, with a capacity check against the database's max_connections",
+    "security": [{"Bearer": []}],
+    "responses": {
+        "200": {
+            "description": "Pool diagnostics",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "pool": {
+                        "type": "object",
+                        "properties": {
+                            "pid": {"type": "integer"},
+                            "pool_class": {"type": "string"},
+                            "size": {"type": "integer"},
+                            "checked_in": {"type": "integer"},
+                            "checked_out": {"type": "integer"},
+                            "overflow": {"type": "integer"},
+                            "max_overflow": {"type": "integer"},
+                            "timeout": {"type": "number"},
+                            "stats": {"type": "object"}
+                        }
+                    },
+                    "capacity": {
+                        "type": "object",
+                        "properties": {
+                            "workers": {"type": "integer"},
+                            "connections_per_worker": {"type": "integer"},
+                            "max_app_connections": {"type": "integer"},
+                            "server_max_connections": {"type": "integer"},
+                            "server_connections_in_use": {"type": "integer"},
+                            "fits": {"type": "boolean"}
+                        }
+                    }
+                }
+            }
+        },
+        "401": {"description": "Unauthorized"},
+        "403": {"description": "Forbidden - Admin access required"}
+    }
+}
+
+# Export endpoints documentation
+EXPORT_GET = {
+    "tags": ["Export"],
+    "description": "Stream a whole table as CSV or NDJSON for accounting and backups, with joined columns "
+                   "(customer, service and employee names). Rows are read from a server-side cursor, so "
+                   "exports of any size use constant memory.",
+    "security": [{"Bearer": []}],
+    "produces": ["text/csv", "application/x-ndjson"],
+    "parameters": [
+        {
+            "name": "entity",
+            "in": "path",
+            "type": "string",
+            "required": True,
+            "enum": ["invoices", "invoice_items", "payments", "customers", "locations", "appointments", "timelogs"]
+        },
+        {
+            "name": "format",
+            "in": "query",
+            "type": "string",
+            "enum": ["csv", "ndjson"],
+            "required": False,
+            "description": "Output format (default csv)"
+        },
+        {
+            "name": "start_date",
+            "in": "query",
+            "type": "string",
+            "required": False,
+            "description": "Only rows on or after this date or datetime (invoice creation, payment date, arrival, time in, ...)"
+        },
+        {
+            "name": "end_date",
+            "in": "query",
+            "type": "string",
+            "required": False,
+            "description": "Only rows up to this datetime, or through the end of this date"
+        }
+    ],
+    "responses": {
+        "200": {"description": "The streamed export, sent as an attachment"},
+        "400": {"description": "Invalid format or date"},
+        "401": {"description": "Unauthorized"},
+        "403": {"description": "Forbidden - Admin access required"},
+        "404": {"description": "Unknown entity"}
+    }
+}
+
+# Bulk create endpoints documentation
+def get_bulk_create_docs(tag_name, entity_name, item_schema, required):
+    """Generate Swagger docs for the batch create endpoints (see utils.bulk)"""
+    return {
+        "tags": [tag_name],
+        "description": f"Create up to 1000 {entity_name}s in one transaction. Each item is validated on its own; "
+                       "the response has a result per item. With atomic=true one invalid item rejects the batch.",
+        "security": [{"Bearer": []}],
+        "parameters": [
+            {
+                "name": "body",
+                "in": "body",
+                "required": True,
+                "schema": {
+                    "type": "array",
+                    "items": {"type": "object", "properties": item_schema, "required": required}
+                }
+            },
+            {
+                "name": "atomic",
+                "in": "query",
+                "type": "boolean",
+                "required": False,
+                "description": "Insert nothing unless every item is valid"
+            }
+        ],
+        "responses": {
+            "201": {"description": f"All {entity_name}s created", "schema": {"$ref": "#/definitions/BulkResult"}},
+            "207": {"description": "Some items created, the others rejected", "schema": {"$ref": "#/definitions/BulkResult"}},
+            "400": {"description": "Invalid body, or no item could be created"},
+            "401": {"description": "Unauthorized"},
+            "403": {"description": "Forbidden - Insufficient permissions"}
+        },
+        "definitions": {
+            "BulkResult": {
+                "type": "object",
+                "properties": {
+                    "created": {"type": "integer"},
+                    "failed": {"type": "integer"},
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "index": {"type": "integer"},
+                                "status": {"type": "string", "enum": ["created", "error", "skipped"]},
+                                "item": {"type": "object"},
+                                "error": {"type": "string"}
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+CUSTOMER_BULK_CREATE = get_bulk_create_docs("Customers", "customer", {
+    "name": {"type": "string", "example": "John Doe"},
+    "phone": {"type": "string", "example": "555-123-4567"},
+    "email": {"type": "string", "example": "john@example.com"},
+    "notes": {"type": "string"}
+}, ["name", "email"])
+
+LOCATION_BULK_CREATE = get_bulk_create_docs("Locations", "location", {
+    "customer_id": {"type": "integer", "example": 1},
+    "address": {"type": "string", "example": "123 Main St"},
+    "city": {"type": "string"},
+    "state": {"type": "string"},
+    "zip_code": {"type": "string"},
+    "point_of_contact": {"type": "string"},
+    "property_type": {"type": "string", "example": "Business"},
+    "approx_acres": {"type": "number"},
+    "notes": {"type": "string"}
+}, ["customer_id", "address"])
+
+APPOINTMENTS_BULK_POST = get_bulk_create_docs("Appointments", "appointment", {
+    "location_id": {"type": "integer", "example": 3},
+    "customer_id": {"type": "integer", "example": 1, "description": "Defaults to the location's customer"},
+    "employee_id": {"type": "integer", "example": 2},
+    "description": {"type": "string", "example": "Lawn Mowing"},
+    "start_time": {"type": "string", "format": "date-time", "example": "2023-05-15T09:00:00"},
+    "end_time": {"type": "string", "format": "date-time", "example": "2023-05-15T12:00:00"},
+    "status": {"type": "string", "example": "scheduled"},
+    "team": {"type": "string"},
+    "notes": {"type": "string"}
+}, ["location_id", "start_time", "end_time"])
+
+CUSTOMER_IMPORT = {
+    "tags": ["Customers"],
+    "description": "Import customers and their locations from a CSV (multipart field 'file', or a text/csv body). "
+                   "Customers are matched on email; each row with an address adds a location unless the customer "
+                   "already has it. Rows are committed in chunks, so a bad row only fails itself.",
+    "security": [{"Bearer": []}],
+    "consumes": ["multipart/form-data", "text/csv"],
+    "parameters": [
+        {
+            "name": "file",
+            "in": "formData",
+            "type": "file",
+            "required": False,
+            "description": "CSV with a header row: name, email, phone, notes, address, city, state, zip_code, "
+                           "point_of_contact, property_type, approx_acres, location_notes (common variants accepted)"
+        },
+        {
+            "name": "chunk_size",
+            "in": "query",
+            "type": "integer",
+            "required": False,
+            "description": "Rows per transaction (1-10000, default 1000)"
+        }
+    ],
+    "responses": {
+        "200": {
+            "description": "Import report",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "rows": {"type": "integer"},
+                    "chunks": {"type": "integer"},
+                    "customers_created": {"type": "integer"},
+                    "customers_matched": {"type": "integer"},
+                    "locations_created": {"type": "integer"},
+                    "locations_skipped": {"type": "integer"},
+                    "failed_rows": {"type": "integer"},
+                    "errors": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {"line": {"type": "integer"}, "error": {"type": "string"}}
+                        }
+                    }
+                }
+            }
+        },
+        "400": {"description": "No CSV, or no email column"},
+        "401": {"description": "Unauthorized"},
+        "403": {"description": "Forbidden - Admin access required"}
+    }
+}
+
+# Keyset pagination and streaming query parameters shared by the collection endpoints
+PAGINATION_PARAMETERS = [
+    {
+        "name": "limit",
+        "in": "query",
+        "type": "integer",
+        "required": False,
+        "description": "Page size (1-1000). When limit or cursor is given the response is {items, next_cursor}"
+    },
+    {
+        "name": "cursor",
+        "in": "query",
+        "type": "string",
+        "required": False,
+        "description": "Opaque next_cursor value returned by the previous page"
+    },
+    {
+        "name": "stream",
+        "in": "query",
+        "type": "boolean",
+        "required": False,
+        "description": "Stream the full (unpaginated) JSON array from a server-side cursor"
+    }
+]
+
+for _list_docs in (
+    CUSTOMER_LIST, LOCATION_LIST, EMPLOYEES_LIST, APPOINTMENTS_LIST, INVOICES_LIST,
+    TIMELOGS_GET, PHOTOS_GET, REVIEWS_GET, QUOTES_GET, EQUIPMENT_GET,
+    EQUIPMENT_CATEGORIES_GET, PAYMENTS_INVOICE_ID_GET
+):
+    _list_docs.setdefault("parameters", []).extend(PAGINATION_PARAMETERS)
+
+# Sparse fieldset query parameter accepted by list and detail endpoints
+FIELDS_PARAMETER = {
+    "name": "fields",
+    "in": "query",
+    "type": "string",
+    "required": False,
+    "description": "Comma-separated list of fields to select and return, e.g. id,status"
+}
+
+for _sparse_docs in (
+    CUSTOMER_LIST, LOCATION_LIST, EMPLOYEES_LIST, APPOINTMENTS_LIST, INVOICES_LIST,
+    TIMELOGS_GET, PHOTOS_GET, REVIEWS_GET, QUOTES_GET, EQUIPMENT_GET,
+    EQUIPMENT_CATEGORIES_GET, PAYMENTS_INVOICE_ID_GET,
+    CUSTOMER_GET, LOCATION_GET, PAYMENTS_PAYMENT_ID_GET
+):
+    _sparse_docs.setdefault("parameters", []).append(FIELDS_PARAMETER)
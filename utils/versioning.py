@@ -0,0 +1,140 @@
+"""
+Per-table version counters and conditional GET (ETag / If-None-Match).
+
+Every ORM flush bumps the ``table_versions`` row of each table it wrote to,
+inside the same transaction, so the counters move exactly when committed
+data changes. A route decorated with ``@conditional_get(Model, ...)`` derives
+a strong ETag from the request URL and the counters of the tables it reads;
+a poll with a matching ``If-None-Match`` gets a ``304`` after a single
+counter lookup instead of re-running the query.
+
+Writes that bypass the ORM unit of work (Core inserts, COPY) must call
+``bump_versions`` themselves, or ``bump_session_versions`` when they run
+through ``db.session``.
+"""
+import hashlib
+from functools import wraps
+
+from flask import g, has_app_context, request, make_response
+from sqlalchemy import event, select, update, insert
+from models import db, TableVersion
+from utils.compression import etag_variants
+
+_table = TableVersion.__table__
+
+
+def _upsert(connection, table_name):
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(_table).values(table_name=table_name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_table.c.table_name],
+            set_={'version': _table.c.version + 1}
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        update(_table).where(_table.c.table_name == table_name).values(version=_table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(_table).values(table_name=table_name, version=1))
+
+
+def bump_versions(connection, table_names):
+    """Increment the counters of ``table_names`` on ``connection``."""
+    for table_name in sorted(set(table_names)):
+        _upsert(connection, table_name)
+
+
+def touched_tables(session):
+    """Names of the tables written by the pending flush of ``session``."""
+    tables = set()
+    for obj in session.new:
+        tables.add(obj.__table__.name)
+    for obj in session.deleted:
+        tables.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(obj.__table__.name)
+    tables.discard(_table.name)
+    return tables
+
+
+def bump_session_versions(session, table_names):
+    """Bump ``table_names`` inside ``session``'s transaction, as a flush would.
+
+    For Core statements executed through the session (bulk inserts): the
+    response cache is invalidated when the transaction commits.
+    """
+    bump_versions(session.connection(), table_names)
+    # Remembered until the transaction ends, for after_commit listeners
+    session.info.setdefault('touched_tables', set()).update(table_names)
+    if has_app_context():
+        g.pop('_table_versions', None)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_flushed_tables(session, flush_context):
+    tables = touched_tables(session)
+    if tables:
+        bump_session_versions(session, tables)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_touched_tables(session):
+    session.info.pop('touched_tables', None)
+
+
+def table_versions(table_names):
+    """Return ``{table_name: version}`` for ``table_names`` in one query.
+
+    Results are memoized for the rest of the request so stacked decorators
+    (ETag and response cache) share a single lookup.
+    """
+    memo = g.setdefault('_table_versions', {})
+    key = tuple(sorted(table_names))
+    if key not in memo:
+        rows = db.session.execute(
+            select(_table.c.table_name, _table.c.version).where(_table.c.table_name.in_(key))
+        ).all()
+        versions = dict.fromkeys(key, 0)
+        versions.update(rows)
+        memo[key] = versions
+    return memo[key]
+
+
+def compute_etag(table_names):
+    """Strong ETag for the current request URL over ``table_names``."""
+    versions = table_versions(table_names)
+    digest = hashlib.sha1(request.full_path.encode('utf-8'))
+    for table_name in sorted(versions):
+        digest.update(f'|{table_name}={versions[table_name]}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def conditional_get(*models):
+    """Answer ``If-None-Match`` with ``304`` while ``models``' tables are unchanged."""
+    table_names = tuple(sorted({model.__table__.name for model in models}))
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(table_names)
+            # Compressed bodies carry an -<encoding> suffix (see utils.compression)
+            for candidate in etag_variants(etag):
+                if request.if_none_match.contains_weak(candidate):
+                    response = make_response('', 304)
+                    response.set_etag(candidate)
+                    return response
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator